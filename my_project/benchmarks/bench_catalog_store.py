@@ -0,0 +1,99 @@
+"""
+Benchmark the out-of-core catalog store against the in-memory loader.
+
+Loads a synthetic catalog both ways and runs the processing steps that read
+the whole catalog (relationships, table statistics, the prompt catalog
+context), reporting wall time and peak Python heap (tracemalloc) for each
+mode and checking that both produce the same results.
+
+Usage:
+    python benchmarks/bench_catalog_store.py [--tables 5000]
+"""
+import argparse
+import gc
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR / "src"))
+sys.path.insert(0, str(PROJECT_DIR / "benchmarks"))
+
+from prompt_layout import build_catalog_context, clear_context_cache
+from schema_loader import analyze_relationships, get_table_statistics, load_schema_data, stream_schema_data
+from synthetic_catalog import generate_catalog
+
+
+def run_mode(load: Callable[[], Any]) -> Tuple[Dict[str, Any], float, float, float, float]:
+    """
+    Load and process the catalog under tracemalloc.
+
+    The loaded catalog stays alive while it is processed, so the second peak
+    includes it, as it does in the pipeline.
+
+    Returns:
+        Tuple: Results, load seconds and peak MB, process seconds and peak MB
+    """
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    schema_data = load()
+    load_time = time.perf_counter() - started
+    load_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.reset_peak()
+    started = time.perf_counter()
+    result = process(schema_data)
+    process_time = time.perf_counter() - started
+    process_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    if hasattr(schema_data, "close"):
+        schema_data.close()
+    megabyte = 1024 * 1024
+    return result, load_time, load_peak / megabyte, process_time, process_peak / megabyte
+
+
+def process(schema_data: Any) -> Dict[str, Any]:
+    """The whole-catalog steps of process_schema_metadata plus the prompt context"""
+    clear_context_cache()
+    return {
+        "relationships": analyze_relationships(schema_data),
+        "statistics": get_table_statistics(schema_data),
+        "context": build_catalog_context(schema_data),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tables", type=int, default=5000, help="Tables in the synthetic catalog")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = generate_catalog(Path(tmp), args.tables)
+        db_path = Path(tmp) / "catalog.db"
+        size = (paths["tables"].stat().st_size + paths["columns"].stat().st_size) / (1024 * 1024)
+
+        memory_result, *memory_row = run_mode(lambda: load_schema_data(paths["tables"], paths["columns"]))
+        store_result, *store_row = run_mode(
+            lambda: stream_schema_data(paths["tables"], paths["columns"], db_path)
+        )
+        rows = [("in-memory", *memory_row), ("catalog store", *store_row)]
+        store_size = db_path.stat().st_size / (1024 * 1024)
+
+    print(f"Synthetic catalog: {args.tables} tables, {size:.1f} MB of CSV, store {store_size:.1f} MB on disk\n")
+    print(f"{'mode':<16} {'load s':>8} {'load MB':>9} {'process s':>10} {'process MB':>11}")
+    for mode, load_time, load_peak, process_time, process_peak in rows:
+        print(f"{mode:<16} {load_time:>8.2f} {load_peak:>9.1f} {process_time:>10.2f} {process_peak:>11.1f}")
+
+    if memory_result != store_result:
+        mismatched = [key for key in memory_result if memory_result[key] != store_result[key]]
+        print(f"\n❌ Results differ between modes: {', '.join(mismatched)}")
+        return 1
+    print("\n✅ Relationships, statistics and catalog context are identical in both modes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""
+Cold-start benchmark for the command-line entry points.
+
+Runs each offline CLI command and module import in a fresh interpreter,
+reports the median wall-clock time and compares it against a stored
+baseline. Independently of timing, it fails if an offline command imports
+a heavy dependency (the OpenAI SDK or numpy), which is the regression
+that matters most and is not subject to timing noise.
+
+Usage:
+    python benchmarks/bench_cold_start.py                    # run and compare
+    python benchmarks/bench_cold_start.py --update-baseline  # accept new numbers
+"""
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_DIR = BENCH_DIR.parent
+CLI = PROJECT_DIR / "src" / "cli.py"
+
+DEFAULT_BASELINE = BENCH_DIR / "cold_start_baseline.json"
+DEFAULT_OUTPUT = BENCH_DIR / "results" / "cold_start.json"
+
+# Top-level packages offline commands must never import
+HEAVY_MODULES = {"openai", "numpy", "httpx"}
+
+# Name -> interpreter arguments; every command here is offline
+COMMANDS: Dict[str, List[str]] = {
+    "cli --help": [str(CLI), "--help"],
+    "cli load": [str(CLI), "load"],
+    "cli stats": [str(CLI), "stats"],
+    "import prompt_utils": ["-c", "import prompt_utils"],
+    "import diagram_generator": ["-c", "import diagram_generator"],
+    "import sqlite_mcp_server": ["-c", "import sqlite_mcp_server"],
+}
+
+
+def run_once(args: List[str], work_dir: Path, importtime: bool = False) -> subprocess.CompletedProcess:
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + args
+    env = {"PYTHONPATH": str(PROJECT_DIR / "src"), "PATH": ""}
+    result = subprocess.run(command, cwd=work_dir, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} failed:\n{result.stderr}")
+    return result
+
+
+def imported_modules(importtime_output: str) -> Set[str]:
+    """Top-level package names from ``-X importtime`` output"""
+    modules = set()
+    for line in importtime_output.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            name = line.rsplit("|", 1)[1].strip()
+            modules.add(name.split(".")[0])
+    return modules
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure CLI cold-start time")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="Allowed relative slowdown before a regression is reported")
+    parser.add_argument("--min-delta", type=float, default=0.05,
+                        help="Allowed absolute slowdown in seconds")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = []
+    problems = []
+    print(f"{'command':<30} {'median':>10} {'min':>10}  heavy imports")
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        shutil.copytree(PROJECT_DIR / "data", work_dir / "data")
+        for name, command in COMMANDS.items():
+            # Warm the filesystem cache and write the processed data stats reuses
+            run_once(command, work_dir)
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                run_once(command, work_dir)
+                timings.append(time.perf_counter() - started)
+            heavy = sorted(imported_modules(run_once(command, work_dir, importtime=True).stderr) & HEAVY_MODULES)
+            if heavy:
+                problems.append(f"{name} imports {', '.join(heavy)}")
+            results.append({
+                "name": name,
+                "seconds": statistics.median(timings),
+                "min_seconds": min(timings),
+                "heavy_imports": heavy
+            })
+            print(f"{name:<30} {statistics.median(timings) * 1000:>7.1f} ms {min(timings) * 1000:>7.1f} ms  "
+                  f"{', '.join(heavy) or '-'}")
+
+    payload = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform()
+        },
+        "results": results
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    print(f"\nResults written to {args.output}")
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        print(f"Baseline updated at {args.baseline}")
+    elif args.baseline.exists():
+        baseline = {row["name"]: row for row in json.loads(args.baseline.read_text(encoding="utf-8"))["results"]}
+        for row in results:
+            base = baseline.get(row["name"])
+            if not base:
+                continue
+            if (row["seconds"] - base["seconds"] > args.min_delta
+                    and row["seconds"] > base["seconds"] * (1 + args.tolerance)):
+                problems.append(
+                    f"{row['name']}: {base['seconds'] * 1000:.1f} ms -> {row['seconds'] * 1000:.1f} ms"
+                )
+    else:
+        print("No baseline found; run with --update-baseline to create one")
+
+    if problems:
+        print("\nCold-start regressions:")
+        for line in problems:
+            print(f"  - {line}")
+        return 1
+    print("No cold-start regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""
+Benchmark dictionary encoding of columns shared across tables.
+
+Reports the size of the prompt catalog context with and without the
+common_columns section (characters and approximate tokens at four characters
+per token), and the heap held by the loaded catalog with and without the
+loader's value dictionary, on the full column export
+(data/data-view-metadata-full.csv) or a synthetic catalog. Fails if the
+encoded catalog does not decode back to the original.
+
+Usage:
+    python benchmarks/bench_common_columns.py [--tables 5000] [--min-tables 5]
+"""
+import argparse
+import csv
+import gc
+import json
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR / "src"))
+sys.path.insert(0, str(PROJECT_DIR / "benchmarks"))
+
+from prompt_layout import SAME_TABLE, canonical_json, catalog_json
+from schema_loader import load_schema_data
+from synthetic_catalog import generate_catalog
+
+FULL_EXPORT = PROJECT_DIR / "data" / "data-view-metadata-full.csv"
+COLUMN_FIELDS = [
+    "schema_name", "table_name", "column_name", "data_type", "is_primary_key", "is_foreign_key",
+    "references_schema", "references_table", "references_column", "description",
+]
+
+
+def convert_full_export(source: Path, target_dir: Path) -> Dict[str, Path]:
+    """Write the one-row-per-column export as schema_tables.csv and schema_columns.csv"""
+    paths = {"tables": target_dir / "schema_tables.csv", "columns": target_dir / "schema_columns.csv"}
+    tables = {}
+    with open(source, newline="", encoding="utf-8-sig") as f, \
+            open(paths["columns"], "w", newline="", encoding="utf-8") as columns_file:
+        writer = csv.writer(columns_file)
+        writer.writerow(COLUMN_FIELDS)
+        for row in csv.DictReader(f):
+            tables.setdefault((row["SCHEMANAME"], row["TABLE NAME"]), row["TABLE DESCRIPTION"])
+            reference = row["FOREIGNKEY"]
+            # The export names only the referenced column; CONTEXTPARENTCONTEXTID points at its own table
+            writer.writerow([
+                row["SCHEMANAME"], row["TABLE NAME"], row["COLUMNNAME"], row["DATATYPE"],
+                "true" if row["PRIMARYKEY"] else "false", "true" if reference else "false",
+                row["SCHEMANAME"] if reference else "", row["TABLE NAME"] if reference else "",
+                reference, row["DESCRIPTION"],
+            ])
+    with open(paths["tables"], "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["schema_name", "table_name", "table_description"])
+        writer.writerows([schema, table, description] for (schema, table), description in tables.items())
+    return paths
+
+
+def load_without_dictionary(tables_file: Path, columns_file: Path) -> Dict[str, Dict[str, Any]]:
+    """The catalog as the loader built it before values were dictionary-encoded"""
+    schema_data: Dict[str, Dict[str, Any]] = {}
+    with open(tables_file, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            schema_data.setdefault(row["schema_name"], {})[row["table_name"]] = {
+                "description": row.get("table_description", ""), "columns": []
+            }
+    with open(columns_file, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            schema_data[row["schema_name"]][row["table_name"]]["columns"].append(row)
+    return schema_data
+
+
+def retained_mb(load: Callable[[], Any]) -> float:
+    """Heap still held by the loaded catalog"""
+    gc.collect()
+    tracemalloc.start()
+    schema_data = load()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del schema_data
+    return current / (1024 * 1024)
+
+
+def decode(text: str) -> Dict[str, Any]:
+    """Expand the common_columns references of an encoded catalog"""
+    data = json.loads(text)
+    if "common_columns" not in data:
+        return data
+    common = data["common_columns"]
+    catalog: Dict[str, Dict[str, Any]] = {}
+    for schema_name, tables in data["catalog"].items():
+        for table_name, table in tables.items():
+            columns = []
+            for column in table["columns"]:
+                if isinstance(column, str):
+                    own = {"references_schema": schema_name, "references_table": table_name}
+                    column = {"schema_name": schema_name, "table_name": table_name, **{
+                        field: own[field] if value == SAME_TABLE else value
+                        for field, value in common[column].items()
+                    }}
+                columns.append(column)
+            catalog.setdefault(schema_name, {})[table_name] = {**table, "columns": columns}
+    return catalog
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tables", type=int, help="Use a synthetic catalog of this many tables instead")
+    parser.add_argument("--min-tables", type=int, default=5, help="Tables a definition must appear in to be shared")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.tables:
+            paths = generate_catalog(Path(tmp), args.tables)
+            source = f"synthetic catalog, {args.tables} tables"
+        else:
+            paths = convert_full_export(FULL_EXPORT, Path(tmp))
+            source = FULL_EXPORT.name
+        plain_mb = retained_mb(lambda: load_without_dictionary(paths["tables"], paths["columns"]))
+        encoded_mb = retained_mb(lambda: load_schema_data(paths["tables"], paths["columns"]))
+        schema_data = load_schema_data(paths["tables"], paths["columns"])
+
+    plain = canonical_json(schema_data)
+    encoded = catalog_json(schema_data, args.min_tables)
+    shared = len(json.loads(encoded).get("common_columns", {}))
+    columns = sum(len(table["columns"]) for tables in schema_data.values() for table in tables.values())
+
+    print(f"Source: {source}, {columns} columns, {shared} shared definitions (>= {args.min_tables} tables)\n")
+    print(f"{'':<22} {'before':>12} {'after':>12} {'saved':>8}")
+    for label, before, after in [
+        ("catalog context chars", len(plain), len(encoded)),
+        ("approx. tokens", len(plain) // 4, len(encoded) // 4),
+    ]:
+        print(f"{label:<22} {before:>12,} {after:>12,} {1 - after / before:>8.0%}")
+    print(f"{'loaded catalog MB':<22} {plain_mb:>12.1f} {encoded_mb:>12.1f} {1 - encoded_mb / plain_mb:>8.0%}")
+
+    if canonical_json(decode(encoded)) != plain:
+        print("\n❌ The encoded catalog does not decode to the original")
+        return 1
+    print("\n✅ The encoded catalog decodes to the original")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+Benchmark serial vs parallel loading of the schema CSVs.
+
+Generates a synthetic catalog, rewrites a share of the column descriptions
+to contain quoted commas, escaped quotes, embedded newlines and non-ASCII
+text (so chunk boundaries land next to records that would break a naive
+newline split), then times ``load_schema_data`` against
+``load_schema_data_parallel`` at each worker count. Every parallel result is
+checked against the serial one; the script exits non-zero on a mismatch.
+
+Usage:
+    python benchmarks/bench_csv_load.py [--tables 50000] [--workers 2 4 8] [--repeat 3]
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from schema_loader import load_schema_data, load_schema_data_parallel
+from synthetic_catalog import generate_catalog
+
+TRICKY_DESCRIPTIONS = [
+    'Amount, in "dollars", before adjustments.',
+    "First line of the note.\nSecond line, after a newline.",
+    'Quote at the end ""',
+    "Données du patient, résumé – 患者",
+    '"Fully quoted"\r\nwith a CRLF inside',
+]
+
+
+def add_tricky_fields(columns_file: Path, share: float, seed: int) -> None:
+    """Replace share of the column descriptions with hard-to-split values"""
+    rng = random.Random(seed)
+    with open(columns_file, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    for row in rows[1:]:
+        if rng.random() < share:
+            row[-1] = rng.choice(TRICKY_DESCRIPTIONS)
+    with open(columns_file, "w", newline="", encoding="utf-8-sig") as f:
+        csv.writer(f).writerows(rows)
+
+
+def time_call(func: Callable[[], Any], repeat: int) -> float:
+    """Return the best wall-clock time of repeat calls"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tables", type=int, default=50000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, os.cpu_count() or 1])
+    parser.add_argument("--tricky-share", type=float, default=0.05,
+                        help="Share of column descriptions replaced with quoted/multiline values")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = generate_catalog(Path(tmp), args.tables, seed=args.seed)
+        add_tricky_fields(paths["columns"], args.tricky_share, args.seed)
+        megabytes = paths["columns"].stat().st_size / (1024 * 1024)
+        print(f"Columns file: {megabytes:.1f} MB, {args.tables} tables, {os.cpu_count()} CPUs\n")
+
+        expected = load_schema_data(paths["tables"], paths["columns"])
+        serial = time_call(lambda: load_schema_data(paths["tables"], paths["columns"]), args.repeat)
+        print(f"{'loader':<20} {'best s':>9} {'MB/s':>9} {'speedup':>8}  identical")
+        print(f"{'serial':<20} {serial:>9.3f} {megabytes / serial:>9.1f} {1.0:>7.2f}x  -")
+
+        mismatches = 0
+        for workers in sorted(set(args.workers)):
+            def load() -> Any:
+                return load_schema_data_parallel(paths["tables"], paths["columns"], workers, min_parallel_bytes=0)
+            identical = load() == expected
+            mismatches += not identical
+            elapsed = time_call(load, args.repeat)
+            print(f"{f'parallel x{workers}':<20} {elapsed:>9.3f} {megabytes / elapsed:>9.1f} "
+                  f"{serial / elapsed:>7.2f}x  {'yes' if identical else 'NO'}")
+
+    if mismatches:
+        print("\nParallel loader output differs from the serial loader")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Benchmark the join-path planner.
+
+Loads a synthetic catalog, builds the foreign key graph, precomputes the hub
+paths and reports build and load time, the size of join_paths.json, and the
+latency of hub lookups (precomputed), shortest paths between other tables
+(breadth-first search) and k shortest paths (Yen's algorithm).
+
+Usage:
+    python benchmarks/bench_join_paths.py [--tables 5000] [--hubs 20] [-k 3]
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR / "src"))
+sys.path.insert(0, str(PROJECT_DIR / "benchmarks"))
+
+from join_paths import JoinPlanner
+from schema_loader import analyze_relationships, load_schema_data
+from synthetic_catalog import generate_catalog
+
+
+def time_calls(pairs: List[Tuple[str, str]], call: Callable[[str, str], object]) -> Tuple[float, float]:
+    """Median and 95th percentile latency in microseconds"""
+    timings = []
+    for source, target in pairs:
+        started = time.perf_counter()
+        call(source, target)
+        timings.append((time.perf_counter() - started) * 1_000_000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tables", type=int, default=5000, help="Tables in the synthetic catalog")
+    parser.add_argument("--hubs", type=int, default=20, help="Hub tables to precompute paths from")
+    parser.add_argument("-k", type=int, default=3, help="Paths per k-shortest query")
+    parser.add_argument("--pairs", type=int, default=500, help="Random table pairs per measurement")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = generate_catalog(Path(tmp), args.tables)
+        schema_data = load_schema_data(paths["tables"], paths["columns"])
+        relationships = analyze_relationships(schema_data)
+
+        started = time.perf_counter()
+        planner = JoinPlanner.from_relationships(relationships)
+        planner.precompute_hubs(args.hubs)
+        build = time.perf_counter() - started
+        path = Path(tmp) / "join_paths.json"
+        planner.save(path)
+        started = time.perf_counter()
+        planner = JoinPlanner.load(path)
+        load = time.perf_counter() - started
+        size = path.stat().st_size / (1024 * 1024)
+
+    tables = sorted(planner.adjacency)
+    hubs = list(planner.hub_paths)
+    others = [table for table in tables if table not in planner.hub_paths]
+    rng = random.Random(0)
+    hub_pairs = [(rng.choice(hubs), rng.choice(others)) for _ in range(args.pairs)]
+    other_pairs = [(rng.choice(others), rng.choice(others)) for _ in range(args.pairs)]
+
+    print(f"Synthetic catalog: {args.tables} tables, {len(tables)} joined, {len(planner.edges)} foreign keys")
+    print(f"Build + {len(hubs)} hubs {build:.2f}s, load {load * 1000:.0f} ms, {size:.1f} MB on disk\n")
+    print(f"{'query':<36} {'p50 us':>10} {'p95 us':>10}")
+    for label, pairs, call in [
+        ("hub -> table, shortest", hub_pairs, planner.shortest_path),
+        ("table -> table, shortest", other_pairs, planner.shortest_path),
+        (f"hub -> table, k={args.k}", hub_pairs, lambda a, b: planner.k_shortest_paths(a, b, args.k)),
+        (f"table -> table, k={args.k}", other_pairs, lambda a, b: planner.k_shortest_paths(a, b, args.k)),
+    ]:
+        p50, p95 = time_calls(pairs, call)
+        print(f"{label:<36} {p50:>10.1f} {p95:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
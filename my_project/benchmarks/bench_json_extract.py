@@ -0,0 +1,85 @@
+"""
+Benchmark JSON extraction from large LLM responses.
+
+Builds multi-megabyte responses in the shapes the pipeline actually sees
+(bare JSON, fenced code block wrapped in prose, top-level array, truncated
+output) and times ``extract_json`` on each.
+
+Usage:
+    python benchmarks/bench_json_extract.py [--sizes 1 4 16] [--repeat 3]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from json_extract import extract_json
+
+
+def build_domain_payload(target_bytes: int) -> Dict[str, Any]:
+    """Build a domain-analysis-shaped object of roughly target_bytes"""
+    mappings = {}
+    index = 0
+    while len(json.dumps(mappings)) < target_bytes:
+        # Grow in batches; re-serializing every entry would be quadratic
+        for _ in range(2000):
+            mappings[f"ATHENAONE.TABLE_{index}"] = {
+                "domain": f"Domain {index % 17}",
+                "reason": "Contains {braces} and [brackets] and \"quotes\" \\ in strings"
+            }
+            index += 1
+    return {"domains": [f"Domain {i}" for i in range(17)], "table_mappings": mappings}
+
+
+def build_cases(size_mb: int) -> Dict[str, str]:
+    """Build the response shapes benchmarked for one size"""
+    payload = json.dumps(build_domain_payload(size_mb * 1024 * 1024), indent=2)
+    array_payload = json.dumps(list(json.loads(payload)["table_mappings"].values()))
+    prose = "Here is the analysis you asked for (see {notes} below):\n\n"
+    return {
+        "bare": payload,
+        "fenced_with_prose": f"{prose}```json\n{payload}\n```\n\nLet me know if [anything] is unclear.",
+        "top_level_array": f"Result:\n{array_payload}",
+        "truncated": f"```json\n{payload[:len(payload) * 9 // 10]}",
+    }
+
+
+def time_call(func: Callable[[], Any], repeat: int) -> float:
+    """Return the best wall-clock time of repeat calls"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes: List[int], repeat: int) -> List[Dict[str, Any]]:
+    """Run the benchmark and print a results table"""
+    results = []
+    print(f"{'case':<20} {'size MB':>8} {'best s':>9} {'MB/s':>9}")
+    for size_mb in sizes:
+        for name, text in build_cases(size_mb).items():
+            elapsed = time_call(lambda: extract_json(text), repeat)
+            megabytes = len(text.encode("utf-8")) / (1024 * 1024)
+            results.append({
+                "case": name,
+                "megabytes": round(megabytes, 2),
+                "seconds": elapsed,
+                "mb_per_second": megabytes / elapsed if elapsed else None
+            })
+            print(f"{name:<20} {megabytes:>8.2f} {elapsed:>9.4f} {megabytes / elapsed:>9.1f}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 4, 16],
+                        help="Response sizes in megabytes")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
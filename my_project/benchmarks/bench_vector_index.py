@@ -0,0 +1,104 @@
+"""
+Benchmark the offline catalog search index.
+
+Builds the index over the full column export (data/data-view-metadata-full.csv,
+about 14.5k columns) or a synthetic catalog, then reports build, save and
+load time, index size and query latency percentiles, and prints the top hits
+of each query so ranking changes are visible.
+
+Usage:
+    python benchmarks/bench_vector_index.py [--tables 5000] [--repeat 200]
+"""
+import argparse
+import csv
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR / "src"))
+sys.path.insert(0, str(PROJECT_DIR / "benchmarks"))
+
+from schema_loader import load_schema_data
+from synthetic_catalog import generate_catalog
+from vector_index import SearchIndex
+
+FULL_EXPORT = PROJECT_DIR / "data" / "data-view-metadata-full.csv"
+
+QUERIES = [
+    "where is the insurance copay stored",
+    "patient date of birth",
+    "claim denial reason",
+    "appointment no show",
+    "provider npi number",
+    "lab result value and units",
+    "who deleted the record",
+]
+
+
+def load_full_export(path: Path) -> Dict[str, Dict[str, Any]]:
+    """Catalog in schema loader form from the one-row-per-column export"""
+    schema_data: Dict[str, Dict[str, Any]] = {}
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            tables = schema_data.setdefault(row["SCHEMANAME"], {})
+            table = tables.setdefault(row["TABLE NAME"], {"description": row["TABLE DESCRIPTION"], "columns": []})
+            table["columns"].append({
+                "column_name": row["COLUMNNAME"],
+                "data_type": row["DATATYPE"],
+                "description": row["DESCRIPTION"],
+            })
+    return schema_data
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tables", type=int, help="Use a synthetic catalog of this many tables instead")
+    parser.add_argument("--repeat", type=int, default=200, help="Timed runs per query")
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.tables:
+            paths = generate_catalog(Path(tmp), args.tables)
+            schema_data = load_schema_data(paths["tables"], paths["columns"])
+            source = f"synthetic catalog, {args.tables} tables"
+        else:
+            schema_data = load_full_export(FULL_EXPORT)
+            source = FULL_EXPORT.name
+
+        started = time.perf_counter()
+        index = SearchIndex.build(schema_data)
+        build = time.perf_counter() - started
+        index_path = Path(tmp) / "search_index.npz"
+        started = time.perf_counter()
+        index.save(index_path)
+        save = time.perf_counter() - started
+        started = time.perf_counter()
+        index = SearchIndex.load(index_path)
+        load = time.perf_counter() - started
+
+        print(f"Source: {source}, {len(index)} documents")
+        print(f"Build {build:.2f}s, save {save:.2f}s, load {load * 1000:.0f} ms, "
+              f"{index_path.stat().st_size / (1024 * 1024):.1f} MB on disk\n")
+
+    print(f"{'query':<40} {'p50 ms':>8} {'p95 ms':>8}  top hit")
+    for query in QUERIES:
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            hits = index.search(query, args.k)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        top = hits[0] if hits else None
+        name = f"{top['table']}.{top['column'] or ''}".rstrip(".") if top else "-"
+        print(f"{query:<40} {statistics.median(timings):>8.2f} "
+              f"{timings[int(len(timings) * 0.95) - 1]:>8.2f}  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
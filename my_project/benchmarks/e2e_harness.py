@@ -0,0 +1,126 @@
+"""
+End-to-end pipeline harness against the local stub LLM server.
+
+Runs ``main.main()`` in a scratch working directory with the OpenAI client
+pointed at an in-process stub server, then reports wall-clock time, the
+number of LLM calls the pipeline made versus HTTP requests the server saw
+(the difference is client retries), peak server-side concurrency and the
+status-code mix.
+
+Usage:
+    python benchmarks/e2e_harness.py --tables 200 --latency lognormal:-1,0.5 \\
+        --rate-limit-rate 0.1 --error-rate 0.05
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_DIR = BENCH_DIR.parent
+sys.path.insert(0, str(PROJECT_DIR / "src"))
+sys.path.insert(0, str(BENCH_DIR))
+
+from stub_llm_server import StubLLMServer, build_arg_parser, config_from_args
+from synthetic_catalog import generate_catalog
+
+
+def prepare_workdir(work_dir: Path, num_tables: Optional[int], seed: int) -> None:
+    """Populate work_dir/data with a synthetic catalog or the bundled sample"""
+    data_dir = work_dir / "data"
+    if num_tables:
+        generate_catalog(data_dir, num_tables, seed=seed)
+    else:
+        data_dir.mkdir(parents=True)
+        for name in ("schema_tables.csv", "schema_columns.csv"):
+            shutil.copy(PROJECT_DIR / "data" / name, data_dir / name)
+
+
+def run_pipeline(server: StubLLMServer, work_dir: Path) -> Dict[str, Any]:
+    """Run main.main() against the stub and collect the measurements"""
+    os.environ["OPENAI_API_BASE"] = server.base_url
+    os.environ["OPENAI_API_KEY"] = "stub"
+    os.environ["PIPELINE_TRACE"] = str(work_dir / "outputs" / "logs" / "trace.json")
+
+    previous_cwd = os.getcwd()
+    os.chdir(work_dir)
+    exit_code = 0
+    try:
+        # Imported here so the client picks up the stub's base URL
+        import tracing
+        tracing.enable_tracing()
+        import main as pipeline
+
+        started = time.perf_counter()
+        try:
+            pipeline.main([])
+        except SystemExit as e:
+            exit_code = e.code or 0
+        wall_clock = time.perf_counter() - started
+
+        import prompt_utils
+        hedges = prompt_utils.hedging.snapshot()
+        llm_spans = [span for span in tracing.tracer.spans if span.name == "llm.query"]
+        diagrams = sorted(path.name for path in (work_dir / "outputs" / "latest" / "final").glob("*.md"))
+    finally:
+        os.chdir(previous_cwd)
+
+    stats = server.stats.snapshot()
+    return {
+        "exit_code": exit_code,
+        "wall_clock_seconds": round(wall_clock, 3),
+        "llm_calls": len(llm_spans),
+        "llm_calls_failed": sum(1 for span in llm_spans if "error" in span.attributes),
+        "http_requests": stats["requests"],
+        "client_retries": max(0, stats["requests"] - len(llm_spans) - hedges["hedges_sent"]),
+        "max_concurrency": stats["max_in_flight"],
+        "status_counts": stats["status_counts"],
+        "server_latency_p50": stats["latency_p50"],
+        "server_latency_p95": stats["latency_p95"],
+        "hedging": hedges,
+        "diagrams_written": diagrams
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_arg_parser()
+    parser.description = "Run the full pipeline against the stub LLM server"
+    parser.set_defaults(port=0)
+    parser.add_argument("--tables", type=int,
+                        help="Generate a synthetic catalog with this many tables (default: bundled sample)")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch working directory")
+    parser.add_argument("--report", type=Path, help="Write the report as JSON to this path")
+    args = parser.parse_args(argv)
+
+    server = StubLLMServer(args.host, args.port, config_from_args(args)).start()
+    work_dir = Path(tempfile.mkdtemp(prefix="e2e_"))
+    try:
+        prepare_workdir(work_dir, args.tables, args.seed or 42)
+        report = run_pipeline(server, work_dir)
+    finally:
+        server.stop()
+        if not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    report["stub"] = {
+        "latency": args.latency,
+        "error_rate": args.error_rate,
+        "rate_limit_rate": args.rate_limit_rate
+    }
+    if args.keep:
+        report["work_dir"] = str(work_dir)
+
+    print("\nEnd-to-end report")
+    print(json.dumps(report, indent=2))
+    if args.report:
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        args.report.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0 if report["exit_code"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
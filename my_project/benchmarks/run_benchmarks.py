@@ -0,0 +1,299 @@
+"""
+Scaling benchmark suite for the metadata pipeline.
+
+Generates synthetic catalogs at several sizes, then times and memory-profiles
+the loader, relationship analysis, statistics, prompt construction and every
+SQLiteMetadataServer query method. Results are written as JSON and compared
+against a stored baseline; the process exits non-zero on regression.
+
+Usage:
+    python benchmarks/run_benchmarks.py                    # run and compare
+    python benchmarks/run_benchmarks.py --tables 100 1000 100000
+    python benchmarks/run_benchmarks.py --update-baseline  # accept new numbers
+"""
+import argparse
+import csv
+import json
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "src"))
+sys.path.insert(0, str(BENCH_DIR))
+
+
+from catalog_stats import compute_catalog_statistics
+from diagram_generator import SCHEMA_ARTIFACTS, DiagramGenerator
+from join_paths import JoinPlanner
+from schema_loader import load_schema_data, analyze_relationships, get_table_statistics
+from prompt_utils import generate_domain_classification_prompt, generate_pattern_narration_prompt
+from prompt_layout import clear_context_cache
+from schema_patterns import analyze_structure
+from sqlite_mcp_server import SQLiteMetadataServer
+from synthetic_catalog import generate_catalog
+from vector_index import SearchIndex
+
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+DEFAULT_OUTPUT = BENCH_DIR / "results" / "latest.json"
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Tuple[float, float, Any]:
+    """
+    Time a callable and record its peak traced allocation.
+
+    The timed runs happen without tracemalloc, which would distort them; one
+    extra traced run gives the memory figure.
+
+    Args:
+        func (Callable[[], Any]): Operation to measure
+        repeat (int): Number of timed runs; the best one is reported
+
+    Returns:
+        Tuple[float, float, Any]: Best seconds, peak MiB and the last result
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak / (1024 * 1024), result
+
+
+def populate_server(server: SQLiteMetadataServer, schema_data: Dict[str, Any], descriptions: Path) -> None:
+    """Fill the server's tables from a loaded catalog and its description file"""
+    categories = {}
+    with open(descriptions, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            categories[(row["SCHEMANAME"], row["TABLE NAME"])] = (row["CATEGORY"], row["DataModel"])
+
+    with server.conn:
+        server.conn.executemany(
+            "INSERT OR REPLACE INTO tables VALUES (?, ?, ?, ?, ?)",
+            ((schema, table, data["description"], *categories.get((schema, table), (None, None)))
+             for schema, tables in schema_data.items() for table, data in tables.items())
+        )
+        server.conn.executemany(
+            "INSERT OR REPLACE INTO columns VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            ((c["schema_name"], c["table_name"], c["column_name"], c["data_type"],
+              c["is_primary_key"] == "true", c["is_foreign_key"] == "true",
+              c["references_schema"] or None, c["references_table"] or None,
+              c["references_column"] or None, c["description"])
+             for tables in schema_data.values() for data in tables.values() for c in data["columns"])
+        )
+        domains = sorted({category for category, _ in categories.values() if category})
+        server.conn.executemany(
+            "INSERT OR REPLACE INTO domains VALUES (?, ?)",
+            ((domain, f"Tables related to {domain}") for domain in domains)
+        )
+        server.conn.executemany(
+            "INSERT OR REPLACE INTO table_domains VALUES (?, ?, ?)",
+            ((schema, table, category) for (schema, table), (category, _) in categories.items() if category)
+        )
+        server.refresh_materialized()
+
+
+def run_size(num_tables: int, args: argparse.Namespace, work_dir: Path) -> List[Dict[str, Any]]:
+    """Benchmark every operation against one catalog size"""
+    catalog_dir = work_dir / f"catalog_{num_tables}"
+    paths = generate_catalog(
+        catalog_dir, num_tables, args.columns_per_table, args.fk_density, args.hub_skew, args.seed
+    )
+    repeat = args.repeat if num_tables <= 10000 else 1
+    results = []
+
+    def record(name: str, func: Callable[[], Any]) -> Any:
+        seconds, peak_mb, result = measure(func, repeat)
+        results.append({
+            "tables": num_tables,
+            "name": name,
+            "seconds": seconds,
+            "peak_mb": round(peak_mb, 3)
+        })
+        print(f"{num_tables:>8} {name:<40} {seconds * 1000:>11.2f} ms {peak_mb:>10.2f} MiB")
+        return result
+
+    schema_data = record("load_schema_data", lambda: load_schema_data(paths["tables"], paths["columns"]))
+    relationships = record("analyze_relationships", lambda: analyze_relationships(schema_data))
+    statistics = record("get_table_statistics", lambda: get_table_statistics(schema_data))
+    catalog_statistics = record("compute_catalog_statistics", lambda: compute_catalog_statistics(schema_data))
+    pattern_data = record("analyze_structure", lambda: analyze_structure(schema_data, relationships))
+
+    processed = {"schema_data": schema_data, "relationships": relationships, "statistics": statistics}
+    if not args.skip_prompts:
+        # Clear the memoized catalog context so each run pays for serialization
+        def domain_prompt() -> str:
+            clear_context_cache()
+            return generate_domain_classification_prompt(processed)
+
+        generator = DiagramGenerator(catalog_dir / "final")
+
+        def diagram_prompt() -> str:
+            # The first schema diagram is the one that serializes the catalog context
+            clear_context_cache()
+            return generator.build_prompt(SCHEMA_ARTIFACTS[0], schema_data)
+
+        record("prompt.domain_classification", domain_prompt)
+        record("prompt.diagram", diagram_prompt)
+        record(
+            "prompt.pattern_narration",
+            lambda: generate_pattern_narration_prompt(pattern_data, statistics=catalog_statistics)
+        )
+
+    if not args.skip_server:
+        server = SQLiteMetadataServer(str(catalog_dir / "schema_metadata.db"))
+        populate_server(server, schema_data, paths["descriptions"])
+        hub = next(iter(next(iter(schema_data.values()))))
+        leaf = list(next(iter(schema_data.values())))[-1]
+        domain = server.conn.execute("SELECT domain_name FROM domains LIMIT 1").fetchone()[0]
+        # The pipeline's statistics, search index and join paths, as the server loads them
+        with open(catalog_dir / "catalog_statistics.json", "w", encoding="utf-8") as f:
+            json.dump(catalog_statistics, f)
+        server.load_statistics(catalog_dir / "catalog_statistics.json")
+        SearchIndex.build(schema_data).save(catalog_dir / "search_index.npz")
+        server.load_search_index(catalog_dir / "search_index.npz")
+        planner = JoinPlanner.from_relationships(relationships)
+        planner.precompute_hubs()
+        planner.save(catalog_dir / "join_paths.json")
+        server.load_join_paths(catalog_dir / "join_paths.json")
+        hub_table = planner.hubs(1)[0]
+
+        record("server.get_table_info", lambda: server.get_table_info(hub))
+        record("server.get_domain_tables", lambda: server.get_domain_tables(domain))
+
+        def last_domain_page() -> Dict[str, Any]:
+            # Keyset pages cost the same at any depth; follow the cursors to the end
+            page = server.get_domain_tables(domain, limit=20, fields=["schema", "name"])
+            while page["next_cursor"]:
+                page = server.get_domain_tables(domain, limit=20, cursor=page["next_cursor"], fields=["schema", "name"])
+            return page
+
+        record("server.get_domain_tables.all_pages", last_domain_page)
+        record("server.search_tables", lambda: server.search_tables("NOTE"))
+        record("server.get_related_tables", lambda: server.get_related_tables(leaf, depth=2))
+        record("server.analyze_table_usage", lambda: server.analyze_table_usage())
+        record("server.get_table_statistics", lambda: server.get_table_statistics(hub))
+        record("server.get_domain_statistics", lambda: server.get_domain_statistics())
+        record("server.semantic_search", lambda: server.semantic_search("patient insurance copay"))
+        record("server.find_join_paths", lambda: server.find_join_paths(leaf, hub_table))
+        server.conn.close()
+
+    return results
+
+
+def compare(
+    results: List[Dict[str, Any]],
+    baseline: List[Dict[str, Any]],
+    tolerance: float,
+    min_delta: float
+) -> List[str]:
+    """
+    Compare results with a baseline.
+
+    A measurement regresses when it is both ``tolerance`` (relative) and
+    ``min_delta`` seconds (absolute) slower than the baseline; the absolute
+    floor keeps sub-millisecond noise from failing the run.
+
+    Returns:
+        List[str]: Human-readable regression descriptions
+    """
+    expected = {(row["tables"], row["name"]): row for row in baseline}
+    regressions = []
+    for row in results:
+        base = expected.get((row["tables"], row["name"]))
+        if not base:
+            continue
+        slower_by = row["seconds"] - base["seconds"]
+        if slower_by > min_delta and row["seconds"] > base["seconds"] * (1 + tolerance):
+            regressions.append(
+                f"{row['name']} @ {row['tables']} tables: "
+                f"{base['seconds'] * 1000:.2f} ms -> {row['seconds'] * 1000:.2f} ms"
+            )
+    return regressions
+
+
+def write_json(path: Path, payload: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the scaling benchmark suite")
+    parser.add_argument("--tables", type=int, nargs="+", default=[100, 1000, 5000],
+                        help="Catalog sizes to benchmark (up to 100000)")
+    parser.add_argument("--columns-per-table", type=int, default=14)
+    parser.add_argument("--fk-density", type=float, default=0.1)
+    parser.add_argument("--hub-skew", type=float, default=1.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-prompts", action="store_true")
+    parser.add_argument("--skip-server", action="store_true")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="Allowed relative slowdown before a regression is reported")
+    parser.add_argument("--min-delta", type=float, default=0.005,
+                        help="Allowed absolute slowdown in seconds")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    print(f"{'tables':>8} {'operation':<40} {'best time':>14} {'peak mem':>14}")
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for num_tables in args.tables:
+            results.extend(run_size(num_tables, args, Path(work_dir)))
+
+    payload = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sqlite": sqlite3.sqlite_version,
+            "columns_per_table": args.columns_per_table,
+            "fk_density": args.fk_density,
+            "hub_skew": args.hub_skew,
+            "seed": args.seed
+        },
+        "results": results
+    }
+    write_json(args.output, payload)
+    print(f"\nResults written to {args.output}")
+
+    if args.update_baseline:
+        write_json(args.baseline, payload)
+        print(f"Baseline updated at {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print("No baseline found; run with --update-baseline to create one")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.tolerance, args.min_delta)
+    if regressions:
+        print("\nPerformance regressions:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+    print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
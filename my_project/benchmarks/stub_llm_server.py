@@ -0,0 +1,448 @@
+"""
+Local OpenAI-compatible stub LLM server for end-to-end load and latency tests.
+
+Serves ``POST /v1/chat/completions`` (streaming and non-streaming) with
+configurable latency, 5xx error, 429 rate-limit and broken-Mermaid injection. Responses are
+either canned (from a JSON file) or derived from the schema embedded in the
+prompt, so the pipeline's JSON parsing and diagram saving run for real.
+``GET /stats`` reports request counts, status codes and peak concurrency.
+Repeated ``cache_control`` prefixes are reported as cached prompt tokens.
+
+Point the pipeline at it with:
+    OPENAI_API_BASE=http://127.0.0.1:8765/v1 OPENAI_API_KEY=stub python src/main.py
+
+Usage:
+    python benchmarks/stub_llm_server.py --port 8765 --latency lognormal:-0.5,0.6 \\
+        --error-rate 0.02 --rate-limit-rate 0.05
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+BATCH_DIAGRAM_PATTERN = re.compile(r"^Diagram `([a-z_]+)`", re.MULTILINE)
+TABLE_NAME_PATTERN = re.compile(r"""['"]table_name['"]:\s*['"]([A-Za-z0-9_]+)['"]""")
+FK_PATTERN = re.compile(
+    r"""['"]table_name['"]:\s*['"]([A-Za-z0-9_]+)['"].{0,400}?"""
+    r"""['"]references_table['"]:\s*['"]([A-Za-z0-9_]+)['"]""",
+    re.DOTALL
+)
+
+DOMAIN_KEYWORDS = {
+    "Patients": ("PATIENT", "ALLERGY", "VACCINE"),
+    "Encounters": ("APPOINTMENT", "ENCOUNTER", "CHART"),
+    "Clinical Documentation": ("DOCUMENT", "DIAGNOSIS", "MEDICATION", "ORDER"),
+    "Billing": ("CLAIM", "PAYMENT", "INSURANCE", "FEESCHEDULE", "TRANSACTION"),
+    "Providers": ("PROVIDER", "DEPARTMENT"),
+}
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Build a latency sampler from a spec string.
+
+    Supported specs: ``fixed:S``, ``uniform:LO,HI``, ``exponential:MEAN``,
+    ``lognormal:MU,SIGMA`` and ``pareto:SCALE,ALPHA`` (heavy tail). All values
+    are seconds.
+
+    Args:
+        spec (str): Distribution spec
+
+    Returns:
+        Callable[[random.Random], float]: Function returning a delay in seconds
+    """
+    kind, _, params = spec.partition(":")
+    values = [float(value) for value in params.split(",") if value]
+    if kind == "fixed":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "exponential":
+        return lambda rng: rng.expovariate(1.0 / values[0])
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(values[0], values[1])
+    if kind == "pareto":
+        return lambda rng: values[0] * rng.paretovariate(values[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def _domain_for(table_name: str) -> str:
+    for domain, keywords in DOMAIN_KEYWORDS.items():
+        if any(keyword in table_name for keyword in keywords):
+            return domain
+    return "Reference Data"
+
+
+def schema_derived_response(prompt: str, max_tables: int = 40) -> str:
+    """
+    Build a plausible response from the schema embedded in a prompt.
+
+    Domain and pattern prompts get JSON in the shape the pipeline expects;
+    diagram prompts get an ``erDiagram`` over the tables in the prompt, and
+    batched diagram prompts get one BEGIN/END section per requested diagram.
+
+    Args:
+        prompt (str): The user message sent by the pipeline
+        max_tables (int): Cap on tables included in diagrams
+
+    Returns:
+        str: Response content
+    """
+    tables = list(dict.fromkeys(TABLE_NAME_PATTERN.findall(prompt)))
+    edges = list(dict.fromkeys(
+        (source, target) for source, target in FK_PATTERN.findall(prompt) if source != target
+    ))
+
+    batch_keys = BATCH_DIAGRAM_PATTERN.findall(prompt)
+    if batch_keys:
+        diagram = schema_derived_response(prompt.replace("Diagram `", "Diagram "), max_tables)
+        return "\n\n".join(
+            f"=== BEGIN {key} ===\n{diagram}\n=== END {key} ===" for key in batch_keys
+        )
+
+    if "Mermaid" in prompt:
+        shown = set(tables[:max_tables])
+        lines = ["```mermaid", "erDiagram"]
+        for table in tables[:max_tables]:
+            lines.append(f"    {table} {{")
+            lines.append(f"        NUMBER {table}ID PK")
+            lines.append("    }")
+        for source, target in edges:
+            if source in shown and target in shown:
+                lines.append(f"    {target} ||--o{{ {source} : references")
+        lines.append("```")
+        return "\n".join(lines)
+
+    if "key_paths" in prompt:
+        return json.dumps({
+            "patterns": [{"name": "Hub lookup", "tables": tables[:5]}],
+            "hierarchies": [{"table": table, "column": "CONTEXTPARENTCONTEXTID"} for table in tables[:3]],
+            "key_paths": [{"from": source, "to": target} for source, target in edges[:20]]
+        })
+
+    mappings = {table: _domain_for(table) for table in tables}
+    return json.dumps({
+        "domains": sorted(set(mappings.values())),
+        "table_mappings": mappings,
+        "relationships": [
+            {"from": _domain_for(source), "to": _domain_for(target)}
+            for source, target in edges[:50]
+            if _domain_for(source) != _domain_for(target)
+        ]
+    })
+
+
+def corrupt_diagram(content: str) -> str:
+    """Break the Mermaid in a response by dropping its first entity's closing brace"""
+    return content.replace("\n    }\n", "\n", 1)
+
+
+def message_text(content: Any) -> Tuple[str, str]:
+    """
+    Flatten message content into its text and its cache_control prefix.
+
+    Content is either a plain string or a list of content parts; the prefix is
+    the text up to and including the last part marked with cache_control.
+    """
+    if not isinstance(content, list):
+        return str(content or ""), ""
+    texts = [str(part.get("text", "")) for part in content if isinstance(part, dict)]
+    marked = [i for i, part in enumerate(content) if isinstance(part, dict) and part.get("cache_control")]
+    prefix = "".join(texts[:marked[-1] + 1]) if marked else ""
+    return "".join(texts), prefix
+
+
+class StubConfig:
+    """Behaviour knobs shared by all request handlers"""
+
+    def __init__(
+        self,
+        latency: str = "fixed:0",
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 0.1,
+        canned: Optional[Dict[str, str]] = None,
+        stream_chunk_chars: int = 200,
+        seed: Optional[int] = None,
+        prompt_cache: bool = True,
+        invalid_diagram_rate: float = 0.0
+    ):
+        self.latency_spec = latency
+        self.sample_latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        # Maps a substring of the prompt to the canned response for it; the
+        # key "*" is the fallback
+        self.canned = canned or {}
+        self.stream_chunk_chars = stream_chunk_chars
+        # Share of diagram responses returned with a Mermaid syntax error
+        self.invalid_diagram_rate = invalid_diagram_rate
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        # Hashes of cache_control prefixes seen so far; a repeat is reported
+        # as cached prompt tokens, as a provider prompt cache would
+        self.prompt_cache = prompt_cache
+        self.cached_prefixes: Set[str] = set()
+
+    def cached_tokens_for(self, prefix: str) -> int:
+        if not prefix or not self.prompt_cache:
+            return 0
+        digest = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+        with self.rng_lock:
+            if digest in self.cached_prefixes:
+                return len(prefix) // 4
+            self.cached_prefixes.add(digest)
+        return 0
+
+    def respond_to(self, prompt: str) -> str:
+        for needle, response in self.canned.items():
+            if needle != "*" and needle in prompt:
+                return response
+        if "*" in self.canned:
+            return self.canned["*"]
+        return schema_derived_response(prompt)
+
+
+class StubStats:
+    """Thread-safe request counters"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.status_counts: Dict[int, int] = {}
+        self.latencies: List[float] = []
+
+    def start(self) -> None:
+        with self.lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def finish(self, status: int, latency: float) -> None:
+        with self.lock:
+            self.in_flight -= 1
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+            self.latencies.append(latency)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            latencies = sorted(self.latencies)
+            def percentile(p: float) -> Optional[float]:
+                if not latencies:
+                    return None
+                return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+            return {
+                "requests": self.requests,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "status_counts": {str(code): count for code, count in sorted(self.status_counts.items())},
+                "latency_p50": percentile(0.5),
+                "latency_p95": percentile(0.95),
+                "latency_max": latencies[-1] if latencies else None
+            }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    server_version = "StubLLM/1.0"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Keep load tests quiet; per-request data is available from /stats
+        pass
+
+    def do_GET(self) -> None:
+        if self.path.rstrip("/").endswith("/stats"):
+            self._send_json(200, self.server.stats.snapshot())
+        elif self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "stub", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": "Not found"}})
+
+    def do_POST(self) -> None:
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "Not found"}})
+            return
+
+        config: StubConfig = self.server.config
+        stats: StubStats = self.server.stats
+        started = time.perf_counter()
+        stats.start()
+        status = 200
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            texts, prefixes = [], []
+            for message in request.get("messages", []):
+                text, prefix = message_text(message.get("content", ""))
+                texts.append(text)
+                prefixes.append(prefix)
+            prompt = "\n".join(texts)
+            cache_prefix = next((prefix for prefix in prefixes if prefix), "")
+
+            with config.rng_lock:
+                delay = max(0.0, config.sample_latency(config.rng))
+                roll = config.rng.random()
+                corrupt_roll = config.rng.random()
+            time.sleep(delay)
+
+            if roll < config.rate_limit_rate:
+                status = 429
+                self._send_json(429, {"error": {"message": "Rate limit exceeded", "type": "rate_limit"}},
+                                {"Retry-After": str(config.retry_after)})
+                return
+            if roll < config.rate_limit_rate + config.error_rate:
+                status = 500
+                self._send_json(500, {"error": {"message": "Injected server error", "type": "server_error"}})
+                return
+
+            content = config.respond_to(prompt)
+            if corrupt_roll < config.invalid_diagram_rate:
+                content = corrupt_diagram(content)
+            model = request.get("model", "stub")
+            usage = {
+                "prompt_tokens": len(prompt) // 4,
+                "completion_tokens": len(content) // 4,
+                "total_tokens": (len(prompt) + len(content)) // 4,
+                "prompt_tokens_details": {"cached_tokens": config.cached_tokens_for(cache_prefix)}
+            }
+            if request.get("stream"):
+                self._send_stream(model, content, usage)
+            else:
+                self._send_json(200, {
+                    "id": f"chatcmpl-{uuid.uuid4().hex}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop"
+                    }],
+                    "usage": usage
+                })
+        finally:
+            stats.finish(status, time.perf_counter() - started)
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, model: str, content: str, usage: Dict[str, int]) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        size = self.server.config.stream_chunk_chars
+        pieces = [content[i:i + size] for i in range(0, len(content), size)] or [""]
+        for index, piece in enumerate(pieces):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "delta": {"role": "assistant", "content": piece} if index == 0 else {"content": piece},
+                    "finish_reason": None
+                }]
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+        final = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            "usage": usage
+        }
+        self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, config: Optional[StubConfig] = None):
+        super().__init__((host, port), StubHandler)
+        self.config = config or StubConfig()
+        self.stats = StubStats()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StubLLMServer":
+        """Serve in a background thread"""
+        self._thread = threading.Thread(target=self.serve_forever, name="stub-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Run a local OpenAI-compatible stub LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="fixed:0",
+                        help="fixed:S | uniform:LO,HI | exponential:MEAN | lognormal:MU,SIGMA | pareto:SCALE,ALPHA")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=0.1)
+    parser.add_argument("--canned", type=Path,
+                        help="JSON file mapping prompt substrings to responses ('*' is the fallback)")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--invalid-diagram-rate", type=float, default=0.0,
+                        help="Share of diagram responses returned with broken Mermaid")
+    parser.add_argument("--no-prompt-cache", action="store_true",
+                        help="Never report cached prompt tokens for repeated cache_control prefixes")
+    return parser
+
+
+def config_from_args(args: argparse.Namespace) -> StubConfig:
+    canned = None
+    if getattr(args, "canned", None):
+        with open(args.canned, encoding="utf-8") as f:
+            canned = json.load(f)
+    return StubConfig(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        canned=canned,
+        seed=args.seed,
+        prompt_cache=not getattr(args, "no_prompt_cache", False),
+        invalid_diagram_rate=getattr(args, "invalid_diagram_rate", 0.0)
+    )
+
+
+if __name__ == "__main__":
+    args = build_arg_parser().parse_args()
+    server = StubLLMServer(args.host, args.port, config_from_args(args))
+    print(f"Stub LLM server listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down stub server...")
+        server.server_close()
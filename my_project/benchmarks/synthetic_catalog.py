@@ -0,0 +1,247 @@
+"""
+Synthetic schema catalog generator shaped like the athenaOne metadata export.
+
+Writes ``schema_tables.csv`` and ``schema_columns.csv`` in the format read by
+``schema_loader.load_schema_data``, plus ``tabledescriptions.csv`` with the
+export's CATEGORY / RELEASE / DataModel columns. Every table carries the
+CONTEXTID / CONTEXTNAME / CONTEXTPARENTCONTEXTID columns and audit columns seen
+in the real export, and foreign keys point at hub tables with a Zipf-like skew,
+so a handful of tables (PATIENT, PROVIDER, DEPARTMENT, ...) collect most of the
+inbound references.
+
+Usage:
+    python benchmarks/synthetic_catalog.py --tables 10000 --out /tmp/catalog
+"""
+import argparse
+import bisect
+import csv
+import random
+from itertools import accumulate
+from pathlib import Path
+from typing import Dict, List, Optional
+
+SCHEMA_NAME = "ATHENAONE"
+
+# Hub stems in descending order of how often the real export references them
+HUB_STEMS = [
+    "PATIENT", "PROVIDER", "DEPARTMENT", "DOCUMENT", "CHART", "CLAIM",
+    "APPOINTMENT", "INSURANCEPACKAGE", "CLINICALENCOUNTER", "MEDICATION",
+    "FEESCHEDULE", "PAYMENTBATCH", "TRANSACTION", "ORDERTYPE", "DIAGNOSIS",
+    "PROCEDURECODE", "REFERRINGPROVIDER", "ALLERGY", "VACCINE", "PATIENTCASE",
+]
+
+SUFFIXES = [
+    "NOTE", "HISTORY", "STATUS", "DETAIL", "AUDIT", "INSURANCE", "ITEM",
+    "RESULT", "ACTION", "REASON", "TYPE", "LINK", "SNAPSHOT", "QUEUE", "RULE",
+]
+
+CATEGORIES = ["Collector", "Clinicals", "General", "Patient Experience", "Datamart", ""]
+CATEGORY_WEIGHTS = [286, 267, 56, 25, 6, 275]
+DATA_MODELS = ["Simple", "Complex", "Governed / Analytical", ""]
+DATA_MODEL_WEIGHTS = [493, 140, 7, 275]
+RELEASES = ["19.7", "20.10", "24.3", "24.7", ""]
+
+# Declared type mix of the real export's non-key columns
+DATA_TYPES = [
+    "VARCHAR(16777216)", "NUMBER(12,0)", "TIMESTAMP_NTZ(9)", "NUMBER(38,0)",
+    "NUMBER(12,2)", "DATE", "NUMBER(1,0)", "VARCHAR(10)",
+]
+DATA_TYPE_WEIGHTS = [6716, 3744, 2879, 329, 131, 93, 87, 29]
+
+CONTEXT_COLUMNS = [
+    ("CONTEXTID", "NUMBER(12,0)", "The ID of the tablespace this record comes from."),
+    ("CONTEXTNAME", "VARCHAR(16777216)", "The name of the tablespace this record comes from"),
+    ("CONTEXTPARENTCONTEXTID", "NUMBER(12,0)",
+     "The Parent tablespace ID of the tablespace this record comes from"),
+]
+
+AUDIT_COLUMNS = [
+    ("CREATEDBY", "VARCHAR(16777216)", "The user who created the record."),
+    ("CREATEDDATETIME", "TIMESTAMP_NTZ(9)", "The date and time, in US/Eastern, the record was created."),
+    ("DELETEDBY", "VARCHAR(16777216)", "The user who deleted the record."),
+    ("DELETEDDATETIME", "TIMESTAMP_NTZ(9)", "The date and time, in US/Eastern, the record was deleted."),
+    ("LASTUPDATED", "TIMESTAMP_NTZ(9)", "The date and time the record was last updated."),
+]
+
+TABLE_COLUMNS = [
+    "schema_name", "table_name", "table_description",
+]
+COLUMN_COLUMNS = [
+    "schema_name", "table_name", "column_name", "data_type", "is_primary_key",
+    "is_foreign_key", "references_schema", "references_table", "references_column",
+    "description",
+]
+DESCRIPTION_COLUMNS = [
+    "TABLEID", "SCHEMANAME", "TABLE DESCRIPTION", "TABLE NAME", "COMMENTS",
+    "CATEGORY", "RELEASE", "DataModel",
+]
+
+
+def make_table_names(num_tables: int) -> List[str]:
+    """
+    Build unique, export-like table names with the hubs first.
+
+    Args:
+        num_tables (int): Number of tables
+
+    Returns:
+        List[str]: Table names; index order is hub rank order
+    """
+    names = HUB_STEMS[:num_tables]
+    combos = [stem + suffix for stem in HUB_STEMS for suffix in SUFFIXES]
+    names += combos[:max(0, num_tables - len(names))]
+    index = 0
+    while len(names) < num_tables:
+        names.append(f"{combos[index % len(combos)]}{index // len(combos) + 2}")
+        index += 1
+    return names
+
+
+def _pk_column(table_name: str) -> str:
+    return f"{table_name}ID"
+
+
+def generate_catalog(
+    out_dir: Path,
+    num_tables: int = 1000,
+    columns_per_table: int = 14,
+    fk_density: float = 0.1,
+    hub_skew: float = 1.2,
+    seed: int = 42
+) -> Dict[str, Path]:
+    """
+    Write a synthetic catalog to out_dir.
+
+    Rows are streamed to disk table by table, so 100k-table catalogs do not
+    need to be held in memory.
+
+    Args:
+        out_dir (Path): Directory to write the CSV files into
+        num_tables (int): Number of tables
+        columns_per_table (int): Mean number of columns per table
+        fk_density (float): Fraction of a table's columns that are foreign keys
+        hub_skew (float): Zipf exponent for choosing FK targets; higher values
+            concentrate references on the top hub tables
+        seed (int): Random seed, so catalogs are reproducible
+
+    Returns:
+        Dict[str, Path]: Paths of the written ``tables``, ``columns`` and
+            ``descriptions`` files
+    """
+    rng = random.Random(seed)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    names = make_table_names(num_tables)
+    cum_weights = list(accumulate(1.0 / (rank + 1) ** hub_skew for rank in range(num_tables)))
+    total_weight = cum_weights[-1]
+
+    def pick_target() -> str:
+        return names[bisect.bisect_left(cum_weights, rng.random() * total_weight)]
+
+    paths = {
+        "tables": out_dir / "schema_tables.csv",
+        "columns": out_dir / "schema_columns.csv",
+        "descriptions": out_dir / "tabledescriptions.csv",
+    }
+    with open(paths["tables"], "w", newline="", encoding="utf-8") as tables_file, \
+            open(paths["columns"], "w", newline="", encoding="utf-8") as columns_file, \
+            open(paths["descriptions"], "w", newline="", encoding="utf-8") as descriptions_file:
+        tables_writer = csv.writer(tables_file)
+        columns_writer = csv.writer(columns_file)
+        descriptions_writer = csv.writer(descriptions_file)
+        tables_writer.writerow(TABLE_COLUMNS)
+        columns_writer.writerow(COLUMN_COLUMNS)
+        descriptions_writer.writerow(DESCRIPTION_COLUMNS)
+
+        for table_id, table_name in enumerate(names, 1):
+            title = table_name.title()
+            tables_writer.writerow([SCHEMA_NAME, table_name, title])
+            descriptions_writer.writerow([
+                table_id, SCHEMA_NAME, title, table_name,
+                f"Table that contains {title.lower()} data.",
+                rng.choices(CATEGORIES, CATEGORY_WEIGHTS)[0],
+                rng.choice(RELEASES),
+                rng.choices(DATA_MODELS, DATA_MODEL_WEIGHTS)[0],
+            ])
+
+            width = max(6, int(rng.gauss(columns_per_table, columns_per_table / 3)))
+            rows = _table_columns(rng, table_name, width, fk_density, pick_target)
+            columns_writer.writerows(rows)
+
+    return paths
+
+
+def _table_columns(
+    rng: random.Random,
+    table_name: str,
+    width: int,
+    fk_density: float,
+    pick_target
+) -> List[List[str]]:
+    """Build the column rows for one table"""
+    rows = []
+    for column_name, data_type, description in CONTEXT_COLUMNS:
+        is_parent = column_name == "CONTEXTPARENTCONTEXTID"
+        rows.append([
+            SCHEMA_NAME, table_name, column_name, data_type,
+            "true" if column_name == "CONTEXTID" else "false",
+            "true" if is_parent else "false",
+            SCHEMA_NAME if is_parent else "",
+            table_name if is_parent else "",
+            "CONTEXTID" if is_parent else "",
+            description,
+        ])
+
+    rows.append([
+        SCHEMA_NAME, table_name, _pk_column(table_name), "NUMBER(12,0)", "true", "false",
+        "", "", "", f"The athena-assigned ID for the {table_name.lower()} record.",
+    ])
+
+    used = {row[2] for row in rows}
+    for _ in range(int(round(width * fk_density))):
+        target = pick_target()
+        column_name = _pk_column(target)
+        if target == table_name or column_name in used:
+            continue
+        used.add(column_name)
+        rows.append([
+            SCHEMA_NAME, table_name, column_name, "NUMBER(12,0)", "false", "true",
+            SCHEMA_NAME, target, column_name, f"The ID of the related {target.lower()}.",
+        ])
+
+    audit = AUDIT_COLUMNS[:rng.randint(2, len(AUDIT_COLUMNS))]
+    for index in range(max(0, width - len(rows) - len(audit))):
+        data_type = rng.choices(DATA_TYPES, DATA_TYPE_WEIGHTS)[0]
+        rows.append([
+            SCHEMA_NAME, table_name, f"ATTRIBUTE{index + 1}", data_type, "false", "false",
+            "", "", "", f"Attribute {index + 1} of the {table_name.lower()}." if rng.random() < 0.9 else "",
+        ])
+
+    for column_name, data_type, description in audit:
+        rows.append([
+            SCHEMA_NAME, table_name, column_name, data_type, "false", "false",
+            "", "", "", description,
+        ])
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic athenaOne-shaped catalog")
+    parser.add_argument("--out", type=Path, required=True, help="Output directory")
+    parser.add_argument("--tables", type=int, default=1000)
+    parser.add_argument("--columns-per-table", type=int, default=14)
+    parser.add_argument("--fk-density", type=float, default=0.1)
+    parser.add_argument("--hub-skew", type=float, default=1.2)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    paths = generate_catalog(
+        args.out, args.tables, args.columns_per_table, args.fk_density, args.hub_skew, args.seed
+    )
+    for kind, path in paths.items():
+        print(f"{kind:<13} {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import atexit
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+
+DEFAULT_LOG_FILE = Path("outputs/logs/activity_log.jsonl")
+
+
+class ActivityLogger:
+    """
+    Buffered JSONL event log with a content-addressed blob store.
+
+    Events are appended to an in-memory buffer and written by a background
+    thread, so callers on the hot path never touch the disk. String fields
+    longer than ``blob_threshold`` (prompts, responses) are written once to
+    ``blobs/<sha256>`` and the event only carries the hash, which keeps the
+    log size flat no matter how large the catalog in the prompt is. Hashing
+    and writing blobs also happen at flush time, off the caller's thread.
+    """
+
+    def __init__(
+        self,
+        log_file: Path = DEFAULT_LOG_FILE,
+        level: str = "INFO",
+        blob_threshold: int = 2048,
+        flush_interval: float = 1.0,
+        max_buffer: int = 500,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5
+    ):
+        """
+        Initialize the logger and start its background flush thread.
+
+        Args:
+            log_file (Path): Path of the JSONL event log
+            level (str): Minimum level written (DEBUG, INFO, WARNING, ERROR)
+            blob_threshold (int): String fields longer than this many characters
+                are moved to the blob store
+            flush_interval (float): Seconds between background flushes
+            max_buffer (int): Number of buffered events that triggers an early flush
+            max_bytes (int): Size at which the log file is rotated
+            backup_count (int): Number of rotated files to keep
+        """
+        # Resolved up front: the flush thread must not follow later chdir calls
+        self.log_file = Path(log_file).absolute()
+        self.blob_dir = self.log_file.parent / "blobs"
+        self.level = LEVELS[level.upper()]
+        self.blob_threshold = blob_threshold
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+
+        # Serialized events, plus the long string fields still to be moved to the blob store
+        self._buffer: List[Tuple[str, Optional[Dict[str, str]]]] = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._known_blobs: set = set()
+
+        self._thread = threading.Thread(
+            target=self._flush_loop, name="activity-log-flush", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log(self, message: str, level: str = "INFO", **fields: Any) -> None:
+        """
+        Record an event.
+
+        Args:
+            message (str): Human-readable event message
+            level (str): Event level
+            **fields: Structured attributes; long strings are stored as blobs
+        """
+        level = level.upper()
+        if LEVELS[level] < self.level:
+            return
+
+        event: Dict[str, Any] = {"ts": datetime.now().isoformat(), "level": level}
+        blobs: Dict[str, str] = {}
+        for key, value in {"message": message, **fields}.items():
+            if isinstance(value, str) and len(value) > self.blob_threshold:
+                # Hashed and stored by the flush thread; the event keeps a placeholder
+                blobs[key] = value
+                value = {"blob": None, "chars": len(value)}
+            event[key] = value
+
+        line = json.dumps(event, default=str)
+        with self._lock:
+            self._buffer.append((line, blobs or None))
+            should_wake = len(self._buffer) >= self.max_buffer
+        if should_wake:
+            self._wake.set()
+
+    def store_blob(self, content: str) -> str:
+        """
+        Write content to the blob store if it is not already there.
+
+        Args:
+            content (str): Text to store
+
+        Returns:
+            str: The SHA-256 hex digest that addresses the content
+        """
+        data = content.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in self._known_blobs:
+            return digest
+
+        path = self.blob_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        self._known_blobs.add(digest)
+        return digest
+
+    def blob_path(self, digest: str) -> Path:
+        """Path of the blob with the given digest"""
+        return self.blob_dir / digest[:2] / digest
+
+    def load_blob(self, digest: str) -> str:
+        """
+        Read a blob back from the store.
+
+        Args:
+            digest (str): SHA-256 hex digest returned by store_blob
+
+        Returns:
+            str: The stored content
+        """
+        return self.blob_path(digest).read_text(encoding="utf-8")
+
+    def flush(self) -> None:
+        """Write all buffered events to disk"""
+        # Taking the batch and writing it under one lock keeps concurrent
+        # flushes from appending their batches out of order; log() only
+        # waits for the buffer swap
+        with self._write_lock:
+            with self._lock:
+                events, self._buffer = self._buffer, []
+            if not events:
+                return
+
+            # Blobs are stored before the lines that reference them are written
+            lines = [self._externalize(line, blobs) if blobs else line for line, blobs in events]
+            payload = "\n".join(lines) + "\n"
+            self.log_file.parent.mkdir(parents=True, exist_ok=True)
+            self._rotate_if_needed(len(payload.encode("utf-8")))
+            with open(self.log_file, "a", encoding="utf-8") as f:
+                f.write(payload)
+
+    def close(self) -> None:
+        """Stop the background thread and flush remaining events"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush()
+
+    def _externalize(self, line: str, blobs: Dict[str, str]) -> str:
+        """Store an event's long string fields and fill in their blob references"""
+        event = json.loads(line)
+        for key, value in blobs.items():
+            event[key]["blob"] = self.store_blob(value)
+        return json.dumps(event, default=str)
+
+    def _flush_loop(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def _rotate_if_needed(self, incoming_bytes: int) -> None:
+        try:
+            size = self.log_file.stat().st_size
+        except FileNotFoundError:
+            return
+        if size + incoming_bytes <= self.max_bytes:
+            return
+
+        for index in range(self.backup_count - 1, 0, -1):
+            source = self.log_file.with_name(f"{self.log_file.name}.{index}")
+            if source.exists():
+                os.replace(source, self.log_file.with_name(f"{self.log_file.name}.{index + 1}"))
+        if self.backup_count > 0:
+            os.replace(self.log_file, self.log_file.with_name(f"{self.log_file.name}.1"))
+        else:
+            self.log_file.unlink()
+
+
+_loggers: Dict[Path, ActivityLogger] = {}
+_loggers_lock = threading.Lock()
+_default_log_file = DEFAULT_LOG_FILE
+
+
+def set_default_log_file(log_file: Path) -> None:
+    """Send log_activity calls without an explicit file to log_file"""
+    global _default_log_file
+    _default_log_file = Path(log_file)
+
+
+def get_activity_logger(log_file: Optional[Path] = None) -> ActivityLogger:
+    """
+    Get the shared logger for a log file, creating it on first use.
+
+    The level is read from the ``ACTIVITY_LOG_LEVEL`` environment variable.
+
+    Args:
+        log_file (Optional[Path]): Path of the JSONL log; defaults to the
+            file set with set_default_log_file, initially
+            outputs/logs/activity_log.jsonl
+
+    Returns:
+        ActivityLogger: The logger for that file
+    """
+    path = (Path(log_file) if log_file else _default_log_file).absolute()
+    with _loggers_lock:
+        if path not in _loggers:
+            _loggers[path] = ActivityLogger(
+                path, level=os.getenv("ACTIVITY_LOG_LEVEL", "INFO")
+            )
+        return _loggers[path]
@@ -0,0 +1,210 @@
+import contextlib
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from run_manifest import atomic_write_json
+from run_paths import RunPaths, open_run
+
+DEFAULT_LLM_CONCURRENCY = 8
+
+
+def catalog_output_dirs(catalogs: List[Path], output_root: Path) -> Dict[Path, Path]:
+    """
+    Give every catalog its own output directory under output_root.
+
+    Directories are named after the catalog directory; catalogs that share a
+    name (e.g. ``a/export`` and ``b/export``) get a numeric suffix.
+
+    Args:
+        catalogs (List[Path]): Catalog directories
+        output_root (Path): Parent of the per-catalog output directories
+
+    Returns:
+        Dict[Path, Path]: Catalog directory -> output directory
+    """
+    run_dirs = {}
+    used = set()
+    for catalog in catalogs:
+        name = Path(catalog).resolve().name or "catalog"
+        candidate, suffix = name, 2
+        while candidate in used:
+            candidate, suffix = f"{name}-{suffix}", suffix + 1
+        used.add(candidate)
+        run_dirs[Path(catalog)] = Path(output_root) / candidate
+    return run_dirs
+
+
+def _init_worker(llm_slots: Any) -> None:
+    """Process pool initializer: join the shared LLM concurrency budget"""
+    from prompt_utils import set_llm_concurrency
+    set_llm_concurrency(llm_slots)
+
+
+def _run_catalog(paths: RunPaths, resume: bool, batch_size: Optional[int]) -> Dict[str, Any]:
+    """
+    Run the full pipeline for one catalog inside a worker process.
+
+    Console output goes to ``logs/console.log`` in the run directory so
+    parallel runs do not interleave; usage and hedging counters are reset
+    first because a worker process can handle several catalogs in turn. The
+    catalog's latest pointer moves to the run only if every artifact was
+    generated.
+
+    Returns:
+        Dict[str, Any]: Status, duration and LLM usage of the run
+    """
+    from activity_log import get_activity_logger, set_default_log_file
+    from llm_usage import usage_ledger
+    from main import report_usage, run_pipeline
+    from prompt_utils import hedging, log_activity
+    from tracing import tracer
+
+    data_dir = paths.data_dir
+    paths.logs_dir.mkdir(parents=True, exist_ok=True)
+    set_default_log_file(paths.activity_log)
+    usage_ledger.reset()
+    hedging.reset()
+    tracer.reset()
+
+    result = {
+        "catalog": str(data_dir),
+        "run_id": paths.run_id,
+        "output_dir": str(paths.run_dir),
+        "status": "complete",
+        "failed_artifacts": [],
+        "error": None
+    }
+    started = time.perf_counter()
+    with open(paths.logs_dir / "console.log", "w", encoding="utf-8") as console, \
+            contextlib.redirect_stdout(console):
+        try:
+            log_activity("Starting catalog run", catalog=str(data_dir), pid=os.getpid(), resume=resume)
+            manifest = run_pipeline(paths, resume, batch_size)
+            result["failed_artifacts"] = manifest.pending("artifacts")
+            if result["failed_artifacts"]:
+                result["status"] = "partial"
+            else:
+                paths.publish()
+        except Exception as e:
+            result["status"] = "failed"
+            result["error"] = str(e)
+            print(f"\n❌ Error in catalog run: {str(e)}")
+            log_activity(f"Error in catalog run: {str(e)}", level="ERROR", traceback=traceback.format_exc())
+        finally:
+            report_usage(paths.intermediate_dir)
+            if tracer.enabled and tracer.spans:
+                tracer.export_chrome_trace(paths.logs_dir / "trace.json")
+            paths.finish()
+    get_activity_logger().flush()
+
+    totals = usage_ledger.summary()["totals"]
+    result.update(
+        seconds=time.perf_counter() - started,
+        llm_calls=totals["calls"],
+        cost=totals["cost"],
+        pid=os.getpid()
+    )
+    return result
+
+
+def run_batch(
+    catalogs: List[Path],
+    output_root: Path = Path("outputs/catalogs"),
+    workers: Optional[int] = None,
+    llm_concurrency: Optional[int] = None,
+    resume: bool = False,
+    batch_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Run the pipeline for several catalogs in parallel.
+
+    Each catalog runs in its own worker process, so schema loading and
+    analysis for different catalogs use separate cores, and writes to its
+    own run directory. All workers share one semaphore that bounds the LLM
+    requests in flight, keeping the provider's rate limit the same whether
+    one catalog or fifty are running.
+
+    Args:
+        catalogs (List[Path]): Catalog directories, each with
+            schema_tables.csv and schema_columns.csv
+        output_root (Path): Parent of the per-catalog output directories
+        workers (Optional[int]): Worker processes, defaults to the CPU count
+            (never more than the number of catalogs)
+        llm_concurrency (Optional[int]): LLM requests in flight across all
+            workers, defaults to LLM_CONCURRENCY or 8
+        resume (bool): Resume each catalog's most recently finished run
+        batch_size (Optional[int]): Schema diagrams per batched request
+
+    Returns:
+        Dict[str, Any]: Batch summary, also written to
+            ``<output_root>/batch_summary.json``
+    """
+    catalog_dirs = catalog_output_dirs(catalogs, output_root)
+    missing = [
+        str(catalog) for catalog in catalog_dirs
+        if not (catalog / "schema_tables.csv").exists() or not (catalog / "schema_columns.csv").exists()
+    ]
+    if missing:
+        raise FileNotFoundError(f"Catalog CSVs not found in: {', '.join(missing)}")
+    # Runs of the same catalog from concurrent batches get separate run directories
+    runs = {catalog: open_run(catalog, output_dir, resume=resume) for catalog, output_dir in catalog_dirs.items()}
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(runs)))
+    llm_concurrency = llm_concurrency or int(os.getenv("LLM_CONCURRENCY", str(DEFAULT_LLM_CONCURRENCY)))
+    batch_size = batch_size or int(os.getenv("DIAGRAM_BATCH_SIZE", "0")) or None
+
+    print(f"\n🚀 Running {len(runs)} catalogs on {workers} workers "
+          f"({llm_concurrency} LLM requests in flight at most)...")
+    # Spawn rather than fork: the parent may already run logger and client threads
+    context = multiprocessing.get_context("spawn")
+    llm_slots = context.Semaphore(llm_concurrency)
+    started = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=context, initializer=_init_worker, initargs=(llm_slots,)
+    ) as pool:
+        futures = {
+            pool.submit(_run_catalog, paths, resume, batch_size): catalog
+            for catalog, paths in runs.items()
+        }
+        for future in as_completed(futures):
+            catalog = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker itself died; the run directory may be incomplete
+                runs[catalog].finish()
+                result = {
+                    "catalog": str(catalog), "run_id": runs[catalog].run_id,
+                    "output_dir": str(runs[catalog].run_dir),
+                    "status": "failed", "failed_artifacts": [], "error": str(e),
+                    "seconds": None, "llm_calls": 0, "cost": 0.0, "pid": None
+                }
+            results.append(result)
+            icon = {"complete": "✅", "partial": "⚠️ "}.get(result["status"], "❌")
+            detail = result["error"] or (
+                f"{len(result['failed_artifacts'])} artifact(s) failed" if result["failed_artifacts"] else
+                f"{result['seconds']:.1f}s, {result['llm_calls']} LLM calls"
+            )
+            print(f"{icon} {catalog}: {result['status']} ({detail}) -> {result['output_dir']}")
+
+    order = {str(catalog): index for index, catalog in enumerate(runs)}
+    results.sort(key=lambda row: order[row["catalog"]])
+    summary = {
+        "completed_at": datetime.now().isoformat(),
+        "seconds": time.perf_counter() - started,
+        "workers": workers,
+        "llm_concurrency": llm_concurrency,
+        "catalogs": results
+    }
+    atomic_write_json(Path(output_root) / "batch_summary.json", summary)
+    complete = sum(1 for row in results if row["status"] == "complete")
+    print(f"\n✨ {complete}/{len(results)} catalogs complete in {summary['seconds']:.1f}s; "
+          f"summary written to {Path(output_root) / 'batch_summary.json'}")
+    return summary
@@ -0,0 +1,348 @@
+import hashlib
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from catalog_stats import UNASSIGNED_DOMAIN, domain_lookup
+from prompt_layout import canonical_json
+from run_manifest import atomic_write_json
+
+# Tables each schema-based artifact depicts: domains from the domain analysis
+# and table names, matched case-insensitively. Tables the domain analysis has
+# not mapped yet (e.g. added in a new release) are matched by name alone.
+ARTIFACT_SCOPES: Dict[str, Dict[str, Any]] = {
+    "patient_domain": {
+        "domains": r"patient|demographic|person",
+        "tables": r"PATIENT|PERSON|DEMOGRAPH|GUARANTOR",
+    },
+    "encounters_domain": {
+        "domains": r"encounter|appointment|schedul|visit",
+        "tables": r"ENCOUNTER|APPOINTMENT|SCHEDUL|VISIT",
+    },
+    "clinical_documentation": {
+        "domains": r"clinical|document|diagnos|result|order|medication",
+        "tables": r"DOCUMENT|DIAGNOS|RESULT|CHART|CLINICAL|NOTE|ORDER|MEDICATION",
+    },
+    "billing_domain": {
+        "domains": r"billing|claim|payment|insurance|financ|fee",
+        "tables": r"CLAIM|PAYMENT|INSURANCE|FEE|CHARGE|TRANSACTION|BILL",
+    },
+    "patient_encounter_path": {
+        "domains": r"patient|demographic|encounter|appointment|diagnos",
+        "tables": r"PATIENT|ENCOUNTER|APPOINTMENT|DIAGNOS",
+    },
+    "claim_payment_path": {
+        "domains": r"encounter|billing|claim|payment|insurance",
+        "tables": r"ENCOUNTER|CLAIM|PAYMENT|INSURANCE|CHARGE",
+    },
+    "audit_quality": {
+        "domains": r"audit|quality|compliance|security",
+        "tables": r"AUDIT|HISTORY|LOG|QUALITY",
+    },
+    "patient_timeline": {
+        "domains": r"patient|encounter|appointment|clinical|document|billing|claim",
+        "tables": r"PATIENT|ENCOUNTER|APPOINTMENT|DOCUMENT|CLAIM",
+    },
+    # Depicts the foreign keys of the whole catalog
+    "relationship_heatmap": {"relationships": True},
+}
+
+
+def _digest(data: Any) -> str:
+    return hashlib.sha256(canonical_json(data).encode("utf-8")).hexdigest()
+
+
+def _reference(column: Dict[str, Any]) -> Optional[str]:
+    """``SCHEMA.TABLE.COLUMN`` a foreign key column references, if any"""
+    if column.get("is_foreign_key") != "true":
+        return None
+    parts = [column.get("references_schema"), column.get("references_table"), column.get("references_column")]
+    return ".".join(parts) if all(parts) else None
+
+
+def fingerprint_catalog(schema_data: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Hash every table and column of a catalog.
+
+    A table's hash covers its description and the hashes of its columns
+    (sorted, so a reordered export is not a change); a column's hash covers
+    every field of the column row. Comparing two fingerprints therefore only
+    needs the column hashes of tables whose table hash differs.
+
+    Args:
+        schema_data (Dict[str, Dict[str, Any]]): Catalog from the schema loader
+
+    Returns:
+        Dict[str, Dict[str, Any]]: ``SCHEMA.TABLE`` -> ``hash``,
+            ``description`` hash, ``columns`` (name -> hash) and
+            ``foreign_keys`` (column name -> referenced column)
+    """
+    fingerprints = {}
+    for schema_name, tables in schema_data.items():
+        for table_name, table_data in tables.items():
+            columns = {}
+            foreign_keys = {}
+            for column in table_data.get("columns", []):
+                name = column.get("column_name")
+                columns[name] = _digest(column)
+                reference = _reference(column)
+                if reference:
+                    foreign_keys[name] = reference
+            description = _digest(table_data.get("description") or "")
+            fingerprints[f"{schema_name}.{table_name}"] = {
+                "hash": _digest([description, sorted(columns.items())]),
+                "description": description,
+                "columns": columns,
+                "foreign_keys": foreign_keys,
+            }
+    return fingerprints
+
+
+def _columns_by_name(schema_data: Dict[str, Dict[str, Any]], table_key: str) -> Dict[str, Dict[str, Any]]:
+    schema_name, table_name = table_key.split(".", 1)
+    columns = schema_data.get(schema_name, {}).get(table_name, {}).get("columns", [])
+    return {column.get("column_name"): column for column in columns}
+
+
+def diff_catalogs(
+    old_schema: Dict[str, Dict[str, Any]],
+    new_schema: Dict[str, Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Compare two releases of a catalog.
+
+    Args:
+        old_schema (Dict[str, Dict[str, Any]]): Previous release
+        new_schema (Dict[str, Dict[str, Any]]): New release
+
+    Returns:
+        Dict[str, Any]: ``summary`` counts plus added, removed and changed
+            ``tables``, ``columns`` (changed ones with the fields that
+            differ) and ``foreign_keys`` (``from`` -> ``to`` column)
+    """
+    old = fingerprint_catalog(old_schema)
+    new = fingerprint_catalog(new_schema)
+    tables = {
+        "added": sorted(set(new) - set(old)),
+        "removed": sorted(set(old) - set(new)),
+        "changed": [],
+    }
+    columns: Dict[str, List[Any]] = {"added": [], "removed": [], "changed": []}
+    foreign_keys: Dict[str, List[Dict[str, str]]] = {"added": [], "removed": []}
+
+    def fk_edges(table_key: str, fingerprint: Dict[str, Any]) -> set:
+        return {(f"{table_key}.{name}", target) for name, target in fingerprint["foreign_keys"].items()}
+
+    for table_key in tables["added"]:
+        columns["added"].extend(f"{table_key}.{name}" for name in new[table_key]["columns"])
+        foreign_keys["added"].extend({"from": a, "to": b} for a, b in sorted(fk_edges(table_key, new[table_key])))
+    for table_key in tables["removed"]:
+        columns["removed"].extend(f"{table_key}.{name}" for name in old[table_key]["columns"])
+        foreign_keys["removed"].extend({"from": a, "to": b} for a, b in sorted(fk_edges(table_key, old[table_key])))
+
+    for table_key in sorted(set(old) & set(new)):
+        before, after = old[table_key], new[table_key]
+        if before["hash"] == after["hash"]:
+            continue
+        tables["changed"].append(table_key)
+        columns["added"].extend(f"{table_key}.{name}" for name in after["columns"] if name not in before["columns"])
+        columns["removed"].extend(f"{table_key}.{name}" for name in before["columns"] if name not in after["columns"])
+        changed = [
+            name for name, digest in after["columns"].items()
+            if name in before["columns"] and before["columns"][name] != digest
+        ]
+        if changed:
+            old_columns = _columns_by_name(old_schema, table_key)
+            new_columns = _columns_by_name(new_schema, table_key)
+            for name in changed:
+                old_column, new_column = old_columns[name], new_columns[name]
+                fields = sorted(
+                    str(field) for field in set(old_column) | set(new_column)
+                    if old_column.get(field) != new_column.get(field)
+                )
+                columns["changed"].append({"column": f"{table_key}.{name}", "fields": fields})
+        old_edges, new_edges = fk_edges(table_key, before), fk_edges(table_key, after)
+        foreign_keys["added"].extend({"from": a, "to": b} for a, b in sorted(new_edges - old_edges))
+        foreign_keys["removed"].extend({"from": a, "to": b} for a, b in sorted(old_edges - new_edges))
+
+    summary = {
+        "tables_added": len(tables["added"]),
+        "tables_removed": len(tables["removed"]),
+        "tables_changed": len(tables["changed"]),
+        "columns_added": len(columns["added"]),
+        "columns_removed": len(columns["removed"]),
+        "columns_changed": len(columns["changed"]),
+        "foreign_keys_added": len(foreign_keys["added"]),
+        "foreign_keys_removed": len(foreign_keys["removed"]),
+    }
+    return {"summary": summary, "tables": tables, "columns": columns, "foreign_keys": foreign_keys}
+
+
+def artifact_scopes(
+    schema_data: Dict[str, Dict[str, Any]],
+    domain_data: Optional[Dict[str, Any]] = None
+) -> Dict[str, List[str]]:
+    """
+    Tables each schema-based artifact depicts.
+
+    An artifact whose patterns match no table at all (a catalog that does not
+    follow the usual naming) depends on every table, so changes are never
+    missed.
+
+    Args:
+        schema_data (Dict[str, Dict[str, Any]]): Catalog
+        domain_data (Optional[Dict[str, Any]]): Domain analysis result
+
+    Returns:
+        Dict[str, List[str]]: Artifact key -> sorted ``SCHEMA.TABLE`` keys
+    """
+    table_keys = sorted(f"{schema}.{table}" for schema, tables in schema_data.items() for table in tables)
+    domains = domain_lookup(domain_data, table_keys)
+    scopes = {}
+    for key, scope in ARTIFACT_SCOPES.items():
+        if scope.get("relationships"):
+            scopes[key] = table_keys
+            continue
+        domain_pattern = re.compile(scope["domains"], re.IGNORECASE)
+        table_pattern = re.compile(scope["tables"], re.IGNORECASE)
+        matched = [
+            table_key for table_key in table_keys
+            if table_pattern.search(table_key.split(".", 1)[-1])
+            or (domains[table_key] != UNASSIGNED_DOMAIN and domain_pattern.search(domains[table_key]))
+        ]
+        scopes[key] = matched or table_keys
+    return scopes
+
+
+def write_artifact_scopes(
+    schema_data: Dict[str, Dict[str, Any]],
+    domain_data: Optional[Dict[str, Any]],
+    scopes_dir: Path
+) -> Dict[str, Path]:
+    """
+    Save the fingerprint of every schema-based artifact's scope.
+
+    Artifacts depend on these files in the run manifest instead of on the
+    whole processed catalog, so after a new release only the artifacts whose
+    tables (or, for the heatmap, foreign keys) changed are regenerated.
+
+    Args:
+        schema_data (Dict[str, Dict[str, Any]]): Catalog
+        domain_data (Optional[Dict[str, Any]]): Domain analysis result
+        scopes_dir (Path): Directory for the ``<artifact>.json`` files
+
+    Returns:
+        Dict[str, Path]: Artifact key -> scope file
+    """
+    fingerprints = fingerprint_catalog(schema_data)
+    files = {}
+    for key, table_keys in artifact_scopes(schema_data, domain_data).items():
+        if ARTIFACT_SCOPES[key].get("relationships"):
+            scope = {table_key: fingerprints[table_key]["foreign_keys"] for table_key in table_keys}
+        else:
+            scope = {table_key: fingerprints[table_key]["hash"] for table_key in table_keys}
+        files[key] = Path(scopes_dir) / f"{key}.json"
+        atomic_write_json(files[key], scope)
+    return files
+
+
+def affected_artifacts(
+    diff: Dict[str, Any],
+    old_schema: Dict[str, Dict[str, Any]],
+    new_schema: Dict[str, Dict[str, Any]],
+    old_domains: Optional[Dict[str, Any]] = None,
+    new_domains: Optional[Dict[str, Any]] = None
+) -> Dict[str, List[str]]:
+    """
+    Artifacts a release diff makes stale, with the reason for each.
+
+    Mirrors what the scope files make the run manifest regenerate: a schema
+    artifact is stale when a table in its old or new scope was added,
+    removed or changed, the heatmap when a foreign key was added or removed,
+    and the ecosystem overview when the domain analysis changed.
+
+    Args:
+        diff (Dict[str, Any]): Result of ``diff_catalogs``
+        old_schema (Dict[str, Dict[str, Any]]): Previous release
+        new_schema (Dict[str, Dict[str, Any]]): New release
+        old_domains (Optional[Dict[str, Any]]): Domain analysis of the previous release
+        new_domains (Optional[Dict[str, Any]]): Domain analysis for the new release,
+            defaults to the previous one
+
+    Returns:
+        Dict[str, List[str]]: Artifact key -> reasons, only for stale artifacts
+    """
+    new_domains = old_domains if new_domains is None else new_domains
+    tables = diff["tables"]
+    touched = {
+        **{table_key: "added" for table_key in tables["added"]},
+        **{table_key: "removed" for table_key in tables["removed"]},
+        **{table_key: "changed" for table_key in tables["changed"]},
+    }
+    old_scopes = artifact_scopes(old_schema, old_domains)
+    new_scopes = artifact_scopes(new_schema, new_domains)
+
+    affected: Dict[str, List[str]] = {}
+    if _digest(old_domains or {}) != _digest(new_domains or {}):
+        affected["ecosystem_overview"] = ["domain analysis changed"]
+    for key, scope in ARTIFACT_SCOPES.items():
+        if scope.get("relationships"):
+            reasons = [
+                f"foreign key {change} {fk['from']} -> {fk['to']}"
+                for change in ("added", "removed") for fk in diff["foreign_keys"][change]
+            ]
+        else:
+            in_scope = set(old_scopes[key]) | set(new_scopes[key])
+            reasons = [f"{touched[table_key]} {table_key}" for table_key in sorted(in_scope & set(touched))]
+        if reasons:
+            affected[key] = reasons
+    return affected
+
+
+def carry_forward_domains(
+    domain_data: Dict[str, Any],
+    diff: Dict[str, Any],
+    new_schema: Dict[str, Dict[str, Any]],
+    assignments: Optional[Dict[str, Dict[str, Any]]] = None
+) -> Dict[str, Any]:
+    """
+    Reuse a previous release's domain analysis for the new release.
+
+    Mappings of removed tables are dropped (bare-name mappings only when no
+    table of that name remains). Added tables take their rule-based domain
+    when it is confident and otherwise stay unmapped until the domain
+    analysis is rerun.
+
+    Args:
+        domain_data (Dict[str, Any]): Domain analysis of the previous release
+        diff (Dict[str, Any]): Result of ``diff_catalogs``
+        new_schema (Dict[str, Dict[str, Any]]): New release
+        assignments (Optional[Dict[str, Dict[str, Any]]]): Rule-based
+            assignments of the new release (``domain_rules.preclassify_domains``)
+
+    Returns:
+        Dict[str, Any]: Domain analysis for the new release
+    """
+    mappings = domain_data.get("table_mappings")
+    if not isinstance(mappings, dict):
+        return domain_data
+    removed = diff["tables"]["removed"]
+    remaining = {table for tables in new_schema.values() for table in tables}
+    dropped = set(removed) | {
+        table_key.split(".", 1)[-1] for table_key in removed
+        if table_key.split(".", 1)[-1] not in remaining
+    }
+    added = {
+        table_key: assignments[table_key]["domain"]
+        for table_key in diff["tables"]["added"]
+        if assignments and table_key in assignments and assignments[table_key]["confident"]
+    }
+    if not dropped and not added:
+        return domain_data
+    return {
+        **domain_data,
+        "table_mappings": {
+            **{name: value for name, value in mappings.items() if name not in dropped},
+            **added
+        },
+    }
@@ -0,0 +1,324 @@
+import re
+from typing import Any, Dict, List, Optional
+
+# Declared type, optional length/precision and scale, e.g. VARCHAR(255) or
+# NUMBER(12,0). The closing parenthesis is optional because exports that do
+# not quote "NUMBER(12,0)" split it across two CSV fields.
+TYPE_PATTERN = re.compile(r"^\s*([A-Za-z_][A-Za-z0-9_ ]*?)\s*(?:\(\s*(\d+)\s*(?:,\s*(-?\d+)\s*)?\)?)?\s*$")
+
+TEXT_TYPES = {"VARCHAR", "VARCHAR2", "NVARCHAR", "NVARCHAR2", "CHAR", "NCHAR", "CHARACTER VARYING", "TEXT", "STRING"}
+NUMERIC_TYPES = {"NUMBER", "NUMERIC", "DECIMAL"}
+
+UNASSIGNED_DOMAIN = "Unassigned"
+
+
+def parse_data_type(data_type: str) -> Dict[str, Any]:
+    """
+    Split a declared type into base type, length/precision and scale.
+
+    Args:
+        data_type (str): Declared type, e.g. ``NUMBER(12,0)``
+
+    Returns:
+        Dict[str, Any]: ``base`` (upper case, ``UNKNOWN`` if unparseable),
+            ``length`` and ``scale`` (None when not declared)
+    """
+    match = TYPE_PATTERN.match(data_type or "")
+    if not match:
+        return {"base": "UNKNOWN", "length": None, "scale": None}
+    base, length, scale = match.groups()
+    return {
+        "base": base.upper(),
+        "length": int(length) if length else None,
+        "scale": int(scale) if scale else None
+    }
+
+
+class ColumnarCatalog:
+    """
+    The catalog as parallel NumPy arrays, one element per column.
+
+    Table, data type and referenced table are stored as integer codes into
+    ``tables`` and ``types``, so every group-by is a ``bincount`` or an
+    unbuffered ``ufunc.at`` over the codes.
+    """
+
+    def __init__(self, schema_data: Dict[str, Dict[str, Any]]):
+        """
+        Flatten the catalog in one pass over its columns.
+
+        Args:
+            schema_data (Dict[str, Dict[str, Any]]): Schema data as returned
+                by load_schema_data
+        """
+        import numpy as np
+
+        self.tables: List[str] = []
+        columns = []
+        for schema_name, schema_tables in schema_data.items():
+            for table_name, table_data in schema_tables.items():
+                self.tables.append(f"{schema_name}.{table_name}")
+                columns.append(table_data["columns"])
+        rows = [column for table_columns in columns for column in table_columns]
+        table_index = {table: code for code, table in enumerate(self.tables)}
+
+        self.table = np.repeat(np.arange(len(self.tables)), [len(table_columns) for table_columns in columns])
+        self.is_pk = np.array([row.get("is_primary_key") == "true" for row in rows], dtype=bool)
+        self.is_fk = np.array([row.get("is_foreign_key") == "true" for row in rows], dtype=bool)
+        self.described = np.array([bool((row.get("description") or "").strip()) for row in rows], dtype=bool)
+        # Only references to tables in the catalog count, as in analyze_relationships
+        self.ref_table = np.array([
+            table_index.get(f"{row.get('references_schema')}.{row.get('references_table')}", -1) if fk else -1
+            for row, fk in zip(rows, self.is_fk)
+        ], dtype=np.int64)
+
+        # A catalog has a few dozen distinct declared types, so parse each once
+        declared: Dict[str, int] = {}
+        declared_codes = np.array(
+            [declared.setdefault(row.get("data_type") or "", len(declared)) for row in rows], dtype=np.int64
+        )
+        parsed = [parse_data_type(data_type) for data_type in declared]
+        self.types: List[str] = sorted({entry["base"] for entry in parsed})
+        type_index = {base: code for code, base in enumerate(self.types)}
+        self.type = np.array([type_index[entry["base"]] for entry in parsed], dtype=np.int64)[declared_codes] \
+            if parsed else np.zeros(0, dtype=np.int64)
+        self.length = np.array(
+            [np.nan if entry["length"] is None else entry["length"] for entry in parsed], dtype=float
+        )[declared_codes] if parsed else np.zeros(0)
+        self.scale = np.array(
+            [np.nan if entry["scale"] is None else entry["scale"] for entry in parsed], dtype=float
+        )[declared_codes] if parsed else np.zeros(0)
+        self.is_text = np.isin(self.type, [type_index[base] for base in TEXT_TYPES if base in type_index])
+        self.is_numeric = np.isin(self.type, [type_index[base] for base in NUMERIC_TYPES if base in type_index])
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def count(self, mask: Optional[Any] = None, by: Optional[Any] = None, groups: Optional[int] = None) -> Any:
+        """Number of columns (where mask is set) per group, by table unless given"""
+        import numpy as np
+        by = self.table if by is None else by
+        return np.bincount(by if mask is None else by[mask], minlength=len(self.tables) if groups is None else groups)
+
+    def group_max(self, values: Any, mask: Any) -> Any:
+        """Per-table maximum of values where mask is set, NaN for tables without any"""
+        import numpy as np
+        result = np.full(len(self.tables), np.nan)
+        np.fmax.at(result, self.table[mask], values[mask])
+        return result
+
+
+def domain_lookup(domain_data: Optional[Dict[str, Any]], table_keys: List[str]) -> Dict[str, str]:
+    """
+    Map every table to its domain from a domain analysis result.
+
+    Mappings may be keyed by ``SCHEMA.TABLE`` or by bare table name, and the
+    domain may be a string, a list (the first entry wins) or an object with a
+    ``domain`` field. Unmapped tables go to ``Unassigned``.
+
+    Args:
+        domain_data (Optional[Dict[str, Any]]): Domain analysis result
+        table_keys (List[str]): ``SCHEMA.TABLE`` keys of the catalog
+
+    Returns:
+        Dict[str, str]: Table key -> domain name
+    """
+    mappings = (domain_data or {}).get("table_mappings") or {}
+    if not isinstance(mappings, dict):
+        mappings = {}
+
+    def domain_name(value: Any) -> Optional[str]:
+        if isinstance(value, list):
+            value = value[0] if value else None
+        if isinstance(value, dict):
+            value = value.get("domain")
+        return str(value) if value else None
+
+    lookup = {}
+    for key in table_keys:
+        value = mappings.get(key, mappings.get(key.split(".", 1)[-1]))
+        lookup[key] = domain_name(value) or UNASSIGNED_DOMAIN
+    return lookup
+
+
+def _optional_ints(values: Any) -> List[Optional[int]]:
+    return [None if value != value else int(value) for value in values.tolist()]
+
+
+def _type_counts(matrix: Any, types: List[str]) -> List[Dict[str, int]]:
+    """Rows of a group x type count matrix as {type: count} without zeros"""
+    return [
+        {types[code]: count for code, count in enumerate(row) if count}
+        for row in matrix.tolist()
+    ]
+
+
+def _coverage(described: Any, total: Any) -> List[float]:
+    return [round(d / t, 4) if t else 0.0 for d, t in zip(described.tolist(), total.tolist())]
+
+
+def compute_catalog_statistics(
+    schema_data: Dict[str, Dict[str, Any]],
+    domain_data: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Compute per-table, per-domain and catalog-wide statistics.
+
+    The catalog is flattened once into a ColumnarCatalog and every statistic
+    is a vectorized group-by over its code arrays, so the 14.5k-column
+    export takes a few milliseconds.
+
+    Args:
+        schema_data (Dict[str, Dict[str, Any]]): Schema data as returned by
+            load_schema_data
+        domain_data (Optional[Dict[str, Any]]): Domain analysis result used
+            for the domain rollups; without it every table is Unassigned
+
+    Returns:
+        Dict[str, Any]: ``totals``, ``data_types`` (catalog-wide distribution),
+            ``tables`` (per table: column, key and described counts,
+            description coverage, type distribution, max VARCHAR width, max
+            numeric precision and scale, inbound/outbound FK degree, domain)
+            and ``domains`` (the same rolled up per domain, plus FKs that stay
+            in or cross the domain boundary and the most referenced tables)
+    """
+    import numpy as np
+
+    catalog = ColumnarCatalog(schema_data)
+    num_tables = len(catalog.tables)
+    num_types = len(catalog.types)
+
+    # Per-table counts
+    total = catalog.count()
+    primary = catalog.count(catalog.is_pk)
+    foreign = catalog.count(catalog.is_fk)
+    described = catalog.count(catalog.described)
+    edges = catalog.ref_table >= 0
+    fk_out = catalog.count(edges)
+    fk_in = np.bincount(catalog.ref_table[edges], minlength=num_tables)
+    max_width = catalog.group_max(catalog.length, catalog.is_text)
+    max_precision = catalog.group_max(catalog.length, catalog.is_numeric)
+    max_scale = catalog.group_max(catalog.scale, catalog.is_numeric)
+    type_matrix = np.bincount(
+        catalog.table * num_types + catalog.type, minlength=num_tables * num_types
+    ).reshape(num_tables, num_types)
+
+    # Domain codes per table, then the same group-bys over domains
+    lookup = domain_lookup(domain_data, catalog.tables)
+    domain_names = sorted(set(lookup.values()))
+    domain_index = {name: code for code, name in enumerate(domain_names)}
+    table_domain = np.array([domain_index[lookup[table]] for table in catalog.tables], dtype=np.int64)
+    num_domains = len(domain_names)
+
+    def by_domain(values: Any) -> Any:
+        return np.bincount(table_domain, weights=values, minlength=num_domains).astype(np.int64)
+
+    edge_from = table_domain[catalog.table[edges]]
+    edge_to = table_domain[catalog.ref_table[edges]]
+    internal = edge_from == edge_to
+    domain_width = np.full(num_domains, np.nan)
+    np.fmax.at(domain_width, table_domain, max_width)
+    domain_total = by_domain(total)
+    domain_described = by_domain(described)
+    domain_types = np.zeros((num_domains, num_types), dtype=np.int64)
+    np.add.at(domain_types, table_domain, type_matrix)
+
+    # Tables in descending order of inbound references, for the hub lists
+    hub_order = np.argsort(-fk_in, kind="stable")
+
+    table_types = _type_counts(type_matrix, catalog.types)
+    tables = {
+        table: {
+            "total_columns": columns,
+            "primary_keys": pks,
+            "foreign_keys": fks,
+            "described_columns": described_count,
+            "description_coverage": coverage,
+            "max_varchar_width": width,
+            "max_numeric_precision": precision,
+            "max_numeric_scale": scale,
+            "fk_out": out_degree,
+            "fk_in": in_degree,
+            "domain": lookup[table],
+            "data_types": types
+        }
+        for table, columns, pks, fks, described_count, coverage, width, precision, scale,
+            out_degree, in_degree, types in zip(
+            catalog.tables, total.tolist(), primary.tolist(), foreign.tolist(), described.tolist(),
+            _coverage(described, total), _optional_ints(max_width), _optional_ints(max_precision),
+            _optional_ints(max_scale), fk_out.tolist(), fk_in.tolist(), table_types
+        )
+    }
+
+    domains = {}
+    for code, name, tables_count, columns, pks, fks, described_count, coverage, width, \
+            internal_fks, cross_out, cross_in, types in zip(
+            range(num_domains), domain_names, np.bincount(table_domain, minlength=num_domains).tolist(),
+            domain_total.tolist(), by_domain(primary).tolist(), by_domain(foreign).tolist(),
+            domain_described.tolist(), _coverage(domain_described, domain_total), _optional_ints(domain_width),
+            np.bincount(edge_from[internal], minlength=num_domains).tolist(),
+            np.bincount(edge_from[~internal], minlength=num_domains).tolist(),
+            np.bincount(edge_to[~internal], minlength=num_domains).tolist(),
+            _type_counts(domain_types, catalog.types)):
+        hubs = hub_order[table_domain[hub_order] == code][:5]
+        domains[name] = {
+            "tables": tables_count,
+            "total_columns": columns,
+            "primary_keys": pks,
+            "foreign_keys": fks,
+            "described_columns": described_count,
+            "description_coverage": coverage,
+            "max_varchar_width": width,
+            "internal_fks": internal_fks,
+            "fk_out_cross_domain": cross_out,
+            "fk_in_cross_domain": cross_in,
+            "data_types": types,
+            "top_hubs": [catalog.tables[table] for table in hubs.tolist() if fk_in[table]]
+        }
+
+    total_columns = len(catalog)
+    described_total = int(catalog.described.sum())
+    return {
+        "totals": {
+            "tables": num_tables,
+            "columns": total_columns,
+            "primary_keys": int(catalog.is_pk.sum()),
+            "foreign_keys": int(catalog.is_fk.sum()),
+            "fk_edges": int(edges.sum()),
+            "described_columns": described_total,
+            "description_coverage": round(described_total / total_columns, 4) if total_columns else 0.0
+        },
+        "data_types": dict(sorted(
+            _type_counts(type_matrix.sum(axis=0, keepdims=True), catalog.types)[0].items(),
+            key=lambda item: item[1], reverse=True
+        )),
+        "tables": tables,
+        "domains": domains
+    }
+
+
+def statistics_summary(statistics: Dict[str, Any], top: int = 15) -> Dict[str, Any]:
+    """
+    Compact view of the statistics for prompts.
+
+    Per-table detail scales with the catalog, so prompts get the catalog
+    totals, the type distribution, the domain rollups and the most
+    referenced tables only.
+
+    Args:
+        statistics (Dict[str, Any]): Result of compute_catalog_statistics
+        top (int): Number of hub tables to include
+
+    Returns:
+        Dict[str, Any]: ``totals``, ``data_types``, ``domains`` and ``hub_tables``
+    """
+    hubs = sorted(statistics["tables"].items(), key=lambda item: item[1]["fk_in"], reverse=True)[:top]
+    return {
+        "totals": statistics["totals"],
+        "data_types": statistics["data_types"],
+        "domains": statistics["domains"],
+        "hub_tables": {
+            table: {"fk_in": stats["fk_in"], "fk_out": stats["fk_out"], "domain": stats["domain"]}
+            for table, stats in hubs if stats["fk_in"]
+        }
+    }
@@ -0,0 +1,205 @@
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import ItemsView, Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from run_manifest import file_digest
+
+# Tables kept in memory after a lookup; iteration streams and caches nothing
+DEFAULT_CACHE_TABLES = 256
+# Tables whose columns are fetched per query while iterating
+ITER_CHUNK_TABLES = 500
+
+# Column fields of the schema_columns.csv export, in the order the store keeps them
+COLUMN_FIELDS = (
+    "schema_name", "table_name", "column_name", "data_type", "is_primary_key", "is_foreign_key",
+    "references_schema", "references_table", "references_column", "description",
+)
+
+
+def _column_row(row: Tuple[Any, ...]) -> Dict[str, str]:
+    """A stored column as the CSV loader returns it: every field a string"""
+    column = dict(zip(COLUMN_FIELDS, row))
+    column["is_primary_key"] = "true" if column["is_primary_key"] else "false"
+    column["is_foreign_key"] = "true" if column["is_foreign_key"] else "false"
+    return {field: "" if value is None else value for field, value in column.items()}
+
+
+class SchemaTables(Mapping):
+    """The tables of one schema in a ``SQLiteCatalog``, in load order"""
+
+    def __init__(self, catalog: "SQLiteCatalog", schema_name: str):
+        self._catalog = catalog
+        self.schema_name = schema_name
+        self._names: Optional[List[str]] = None
+        self._name_set: Optional[set] = None
+
+    @property
+    def names(self) -> List[str]:
+        if self._names is None:
+            self._names = [row[0] for row in self._catalog._query(
+                "SELECT table_name FROM tables WHERE schema_name = ? ORDER BY rowid", (self.schema_name,)
+            )]
+            self._name_set = set(self._names)
+        return self._names
+
+    def __getitem__(self, table_name: str) -> Dict[str, Any]:
+        if table_name not in self:
+            raise KeyError(table_name)
+        return self._catalog.table(self.schema_name, table_name)
+
+    def __contains__(self, table_name: object) -> bool:
+        self.names
+        return table_name in self._name_set
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def items(self) -> ItemsView:
+        return _StreamedItems(self)
+
+    def stream(self, names: Optional[List[str]] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Tables with their columns, a chunk of tables per query.
+
+        Streamed tables are not cached, so a full pass keeps one chunk in memory.
+
+        Args:
+            names (Optional[List[str]]): Tables to yield, in this order;
+                defaults to every table in load order
+        """
+        names = self.names if names is None else names
+        for start in range(0, len(names), ITER_CHUNK_TABLES):
+            chunk = names[start:start + ITER_CHUNK_TABLES]
+            placeholders = ",".join("?" * len(chunk))
+            descriptions = dict(self._catalog._query(
+                f"SELECT table_name, description FROM tables WHERE schema_name = ? AND table_name IN ({placeholders})",
+                (self.schema_name, *chunk)
+            ))
+            columns: Dict[str, List[Dict[str, str]]] = {name: [] for name in chunk}
+            for row in self._catalog._query(
+                f"SELECT {', '.join(COLUMN_FIELDS)} FROM columns "
+                f"WHERE schema_name = ? AND table_name IN ({placeholders}) ORDER BY rowid",
+                (self.schema_name, *chunk)
+            ):
+                columns[row[1]].append(_column_row(row))
+            for name in chunk:
+                yield name, {"description": descriptions.get(name) or "", "columns": columns[name]}
+
+
+class _StreamedItems(ItemsView):
+    """``items()`` of a ``SchemaTables`` that fetches columns in chunks"""
+
+    def __iter__(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        return self._mapping.stream()
+
+
+class SQLiteCatalog(Mapping):
+    """
+    Read-only catalog in schema loader form, backed by a SQLite store.
+
+    Behaves like the nested ``schema_data`` dict (schema -> table ->
+    ``description`` and ``columns``), but tables are read from the
+    ``tables`` and ``columns`` tables of the metadata server's schema when
+    they are used: lookups page tables through a small LRU cache, and
+    iterating with ``items()`` streams them in chunks. Memory therefore
+    stays flat however large the catalog is, and the metadata server can
+    serve the same file.
+    """
+
+    def __init__(self, db_path: Path, cache_tables: int = DEFAULT_CACHE_TABLES):
+        """
+        Open a catalog store.
+
+        Args:
+            db_path (Path): SQLite file written by ``schema_loader.stream_schema_data``
+            cache_tables (int): Tables kept in memory after a lookup
+        """
+        self.db_path = Path(db_path)
+        self.cache_tables = cache_tables
+        self._conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._schemas: Optional[Dict[str, SchemaTables]] = None
+
+    def _query(self, sql: str, params: Tuple[Any, ...] = ()) -> List[Tuple[Any, ...]]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    @property
+    def schemas(self) -> Dict[str, SchemaTables]:
+        if self._schemas is None:
+            rows = self._query("SELECT schema_name FROM tables GROUP BY schema_name ORDER BY MIN(rowid)")
+            self._schemas = {row[0]: SchemaTables(self, row[0]) for row in rows}
+        return self._schemas
+
+    def __getitem__(self, schema_name: str) -> SchemaTables:
+        return self.schemas[schema_name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.schemas)
+
+    def __len__(self) -> int:
+        return len(self.schemas)
+
+    def table(self, schema_name: str, table_name: str) -> Dict[str, Any]:
+        """One table with its columns, from the cache or the store"""
+        key = (schema_name, table_name)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            description = self._conn.execute(
+                "SELECT description FROM tables WHERE schema_name = ? AND table_name = ?", key
+            ).fetchone()
+            if description is None:
+                raise KeyError(f"{schema_name}.{table_name}")
+            columns = self._conn.execute(
+                f"SELECT {', '.join(COLUMN_FIELDS)} FROM columns "
+                "WHERE schema_name = ? AND table_name = ? ORDER BY rowid", key
+            ).fetchall()
+            table = {"description": description[0] or "", "columns": [_column_row(row) for row in columns]}
+            self._cache[key] = table
+            if len(self._cache) > self.cache_tables:
+                self._cache.popitem(last=False)
+            return table
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """The whole catalog in memory, e.g. to keep it while the store is reloaded"""
+        return {schema_name: dict(tables.items()) for schema_name, tables in self.items()}
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __repr__(self) -> str:
+        return f"SQLiteCatalog({str(self.db_path)!r})"
+
+
+def load_processed_data(path: Path) -> Dict[str, Any]:
+    """
+    Read processed_schema_data.json, opening the catalog store it points to.
+
+    In the out-of-core mode the file holds ``catalog_store`` (the SQLite
+    file, relative to the processed data) and its SHA-256 instead of
+    ``schema_data``; the returned dict has ``schema_data`` either way, and
+    ``catalog_store`` as a full path.
+
+    Raises:
+        ValueError: If the catalog store changed since the file was written
+    """
+    with open(path, encoding="utf-8") as f:
+        processed = json.load(f)
+    if "schema_data" not in processed and processed.get("catalog_store"):
+        store = Path(path).parent / processed["catalog_store"]
+        expected = processed.get("catalog_store_sha256")
+        if expected is not None and (not store.exists() or file_digest(store) != expected):
+            raise ValueError(f"Catalog store {store} does not match {path}; rerun process_schema_metadata")
+        processed["catalog_store"] = str(store)
+        processed["schema_data"] = SQLiteCatalog(store)
+    return processed
@@ -0,0 +1,563 @@
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Subcommand handlers import the pipeline modules themselves, so `--help` and
+# the offline commands never load the OpenAI client
+
+
+def _run_id(value: str) -> str:
+    from run_paths import check_run_id
+    try:
+        return check_run_id(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def _find_run(args: argparse.Namespace) -> Any:
+    """The run named by --run-id, otherwise the latest finished run, or None"""
+    from run_paths import RunPaths
+    if args.run_id:
+        paths = RunPaths(args.data_dir, args.output_dir, args.run_id)
+        return paths if paths.run_dir.is_dir() else None
+    return RunPaths.latest(args.data_dir, args.output_dir)
+
+
+def _run_paths(args: argparse.Namespace, changes: bool = False) -> Any:
+    """
+    The run a subcommand works on: --run-id, otherwise the latest run, or a
+    new run if there is none yet. Subcommands that change the run get a
+    fork of it instead when it is the published latest run, which stays as
+    it was, and refuse a run another process is still working on. main()
+    points latest at the run on success and marks it finished, unless the
+    run was only read while in progress elsewhere.
+
+    Raises:
+        RunInProgressError: If a subcommand that changes the run targets a
+            run that has not finished
+    """
+    from activity_log import set_default_log_file
+    from run_paths import RunInProgressError, RunPaths
+    paths = _find_run(args)
+    latest = RunPaths.latest(args.data_dir, args.output_dir)
+    if paths is None:
+        args.run_paths = paths = RunPaths.create(args.data_dir, args.output_dir, args.run_id)
+    elif changes and latest is not None and latest.run_id == paths.run_id:
+        previous, paths = paths, RunPaths.create(args.data_dir, args.output_dir)
+        previous.fork(paths)
+        args.run_paths = paths
+        print(f"📁 Run {paths.run_id}, from run {previous.run_id}")
+    elif paths.claim():
+        args.run_paths = paths
+    elif changes:
+        raise RunInProgressError(paths)
+    set_default_log_file(paths.activity_log)
+    return paths
+
+
+def _open_manifest(paths: Any) -> Any:
+    from run_manifest import RunManifest
+    return RunManifest.open(paths.manifest, resume=True)
+
+
+def _load_processed(manifest: Any, paths: Any) -> Dict[str, Any]:
+    """Reuse the processed schema data if it is current, otherwise rebuild it"""
+    from catalog_store import load_processed_data
+    from main import process_schema_metadata, run_stage
+    return run_stage(
+        manifest, "process_schema_metadata", paths.processed, [paths.tables_csv, paths.columns_csv],
+        lambda: process_schema_metadata(paths.data_dir, paths.intermediate_dir),
+        load=load_processed_data, extra_outputs=[paths.catalog_store]
+    )
+
+
+def _load_analysis(manifest: Any, paths: Any) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    """Processed data plus domain and pattern analysis, rerunning what is stale"""
+    from main import (
+        analyze_data_patterns, compute_statistics, load_join_paths, pattern_inputs, run_domain_analysis, run_stage
+    )
+    processed = _load_processed(manifest, paths)
+    join_planner = load_join_paths(manifest, paths, processed)
+    domain_data = run_domain_analysis(manifest, paths, processed)
+    statistics = run_stage(
+        manifest, "compute_catalog_statistics", paths.statistics, [paths.processed, paths.domain],
+        lambda: compute_statistics(processed, domain_data, paths.intermediate_dir)
+    )
+    pattern_data = run_stage(
+        manifest, "analyze_data_patterns", paths.pattern, pattern_inputs(paths),
+        lambda: analyze_data_patterns(processed, domain_data, paths.intermediate_dir, statistics, join_planner)
+    )
+    return processed, domain_data, pattern_data
+
+
+def cmd_load(args: argparse.Namespace) -> int:
+    """Load the schema CSVs and save the processed schema data"""
+    paths = _run_paths(args, changes=True)
+    manifest = _open_manifest(paths)
+    manifest.reset("stages", ["process_schema_metadata"])
+    _load_processed(manifest, paths)
+    return 0
+
+
+def cmd_stats(args: argparse.Namespace) -> int:
+    """Print catalog statistics without calling the LLM"""
+    paths = _run_paths(args)
+    processed = _load_processed(_open_manifest(paths), paths)
+    statistics = processed["statistics"]
+    relationships = processed["relationships"]
+
+    print("\n📈 Catalog statistics")
+    print(f"   Schemas:       {len(processed['schema_data'])}")
+    print(f"   Tables:        {len(statistics)}")
+    print(f"   Columns:       {sum(stats['total_columns'] for stats in statistics.values())}")
+    print(f"   Primary keys:  {sum(stats['primary_keys'] for stats in statistics.values())}")
+    print(f"   Foreign keys:  {sum(stats['foreign_keys'] for stats in statistics.values())}")
+    print(f"   Relationships: {sum(len(refs) for refs in relationships.values())}")
+
+    ranked = sorted(statistics.items(), key=lambda item: item[1]["foreign_keys"], reverse=True)
+    print(f"\n   Top {args.top} tables by foreign keys:")
+    for table, stats in ranked[:args.top]:
+        print(f"   {table:<50} {stats['foreign_keys']:>4} FK {stats['total_columns']:>5} columns")
+
+    if args.extended:
+        # Imports NumPy, so only on request
+        from catalog_stats import compute_catalog_statistics
+        extended = compute_catalog_statistics(processed["schema_data"])
+        print(f"\n   Described columns: {extended['totals']['description_coverage']:.1%}")
+        print("   Data types:        " + ", ".join(
+            f"{name} {count}" for name, count in extended["data_types"].items()
+        ))
+        hubs = sorted(extended["tables"].items(), key=lambda item: item[1]["fk_in"], reverse=True)
+        print(f"\n   Top {args.top} tables by inbound references:")
+        for table, stats in hubs[:args.top]:
+            print(f"   {table:<50} {stats['fk_in']:>4} in {stats['fk_out']:>4} out "
+                  f"{stats['description_coverage']:>7.0%} described")
+    return 0
+
+
+def cmd_search(args: argparse.Namespace) -> int:
+    """Search table and column descriptions with the local index (offline)"""
+    import time
+    from main import load_search_index
+    paths = _run_paths(args)
+    manifest = _open_manifest(paths)
+    index = load_search_index(manifest, paths, _load_processed(manifest, paths))
+
+    query = " ".join(args.query)
+    started = time.perf_counter()
+    if args.tables:
+        hits = index.search_tables(query, args.k)
+    else:
+        hits = index.search(query, args.k, kind=args.kind)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    print(f"\n🔎 {len(hits)} results for {query!r} ({elapsed:.1f} ms over {len(index)} documents)")
+    for hit in hits:
+        if args.tables:
+            columns = ", ".join(hit["columns"][:5])
+            print(f"   {hit['score']:.3f}  {hit['table']:<50} {columns}")
+        else:
+            name = f"{hit['schema']}.{hit['table']}" + (f".{hit['column']}" if hit["column"] else "")
+            print(f"   {hit['score']:.3f}  {name:<60} {(hit['description'] or '')[:60]}")
+    return 0
+
+
+def cmd_paths(args: argparse.Namespace) -> int:
+    """Print the shortest join paths between two tables (offline)"""
+    import time
+    from main import load_join_paths
+    paths = _run_paths(args)
+    manifest = _open_manifest(paths)
+    planner = load_join_paths(manifest, paths, _load_processed(manifest, paths))
+
+    started = time.perf_counter()
+    try:
+        found = planner.k_shortest_paths(args.from_table, args.to_table, args.k, args.max_hops)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        return 1
+    elapsed = (time.perf_counter() - started) * 1000
+
+    print(f"\n🧭 {len(found)} join path(s) from {args.from_table} to {args.to_table} ({elapsed:.2f} ms)")
+    for number, path in enumerate(found, 1):
+        print(f"\n   {number}. {' -> '.join(path['tables'])} ({path['hops']} joins)")
+        for line in path["sql"].splitlines():
+            print(f"      {line}")
+    return 0 if found else 1
+
+
+def cmd_analyze(args: argparse.Namespace) -> int:
+    """Run the LLM domain and pattern analysis stages"""
+    from main import report_usage
+    paths = _run_paths(args, changes=True)
+    manifest = _open_manifest(paths)
+    if not args.resume:
+        manifest.reset("stages", ["analyze_domains", "compute_catalog_statistics", "analyze_data_patterns"])
+    try:
+        _load_analysis(manifest, paths)
+    finally:
+        report_usage(paths.intermediate_dir)
+    return 0
+
+
+def cmd_diagrams(args: argparse.Namespace) -> int:
+    """Generate the Mermaid artifacts from the saved analysis results"""
+    from main import generate_artifacts, load_join_paths, load_search_index, report_usage
+    paths = _run_paths(args, changes=True)
+    manifest = _open_manifest(paths)
+    if not args.resume:
+        manifest.reset("artifacts")
+    try:
+        processed, domain_data, pattern_data = _load_analysis(manifest, paths)
+        search_index = load_search_index(manifest, paths, processed)
+        join_planner = load_join_paths(manifest, paths, processed)
+        batch_size = args.batch_size or int(os.getenv("DIAGRAM_BATCH_SIZE", "0")) or None
+        generate_artifacts(
+            processed, domain_data, pattern_data, batch_size, manifest, paths, search_index, join_planner
+        )
+    finally:
+        report_usage(paths.intermediate_dir)
+    return 1 if manifest.pending("artifacts") else 0
+
+
+def _load_catalog(data_dir: Path) -> Dict[str, Any]:
+    from schema_loader import load_schema_data_parallel
+    return load_schema_data_parallel(data_dir / "schema_tables.csv", data_dir / "schema_columns.csv")
+
+
+def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+    import json
+    if not path or not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _print_diff(diff: Dict[str, Any], affected: Dict[str, List[str]], limit: int = 10) -> None:
+    from diagram_generator import ARTIFACTS
+    summary = diff["summary"]
+    print("\n🔀 Release diff")
+    print(f"   Tables:       +{summary['tables_added']} -{summary['tables_removed']} ~{summary['tables_changed']}")
+    print(f"   Columns:      +{summary['columns_added']} -{summary['columns_removed']} ~{summary['columns_changed']}")
+    print(f"   Foreign keys: +{summary['foreign_keys_added']} -{summary['foreign_keys_removed']}")
+    for change in ("added", "removed", "changed"):
+        tables = diff["tables"][change]
+        if tables:
+            more = f" (+{len(tables) - limit} more)" if len(tables) > limit else ""
+            print(f"   {change.capitalize()} tables: {', '.join(tables[:limit])}{more}")
+    print(f"\n🎯 {len(affected)}/{len(ARTIFACTS)} artifacts affected")
+    for key, reasons in affected.items():
+        more = f" (+{len(reasons) - 3} more)" if len(reasons) > 3 else ""
+        print(f"   {ARTIFACTS[key]['name']:<28} {'; '.join(reasons[:3])}{more}")
+
+
+def cmd_diff(args: argparse.Namespace) -> int:
+    """Compare two catalog releases and list the artifacts they make stale"""
+    from catalog_diff import affected_artifacts, diff_catalogs
+    from run_manifest import atomic_write_json
+    from schema_loader import SchemaLoadError
+
+    try:
+        old_schema = _load_catalog(args.old)
+        new_schema = _load_catalog(args.new)
+    except (OSError, SchemaLoadError) as e:
+        print(f"❌ Error: {e}")
+        return 1
+    diff = diff_catalogs(old_schema, new_schema)
+    run = _find_run(args)
+    domains = _read_json(args.domains or run.domain) if args.domains or run else None
+    affected = affected_artifacts(diff, old_schema, new_schema, domains)
+    _print_diff(diff, affected)
+    if args.output:
+        atomic_write_json(args.output, {**diff, "affected_artifacts": affected})
+        print(f"\n💾 Diff written to {args.output}")
+    return 0
+
+
+def cmd_release(args: argparse.Namespace) -> int:
+    """Move a run to a new catalog release, regenerating only affected artifacts"""
+    from activity_log import set_default_log_file
+    from catalog_diff import affected_artifacts, carry_forward_domains, diff_catalogs
+    from catalog_store import load_processed_data
+    from domain_rules import DEFAULT_CONFIDENCE, load_table_metadata, preclassify_domains
+    from main import (
+        analyze_data_patterns, compute_statistics, domain_inputs, generate_artifacts, load_join_paths,
+        load_search_index, pattern_inputs, report_usage, run_stage
+    )
+    from prompt_utils import save_intermediate_result
+    from run_manifest import atomic_write_json
+    from run_paths import RunPaths
+
+    previous = _find_run(args)
+    if previous is None:
+        print(f"❌ Error: No finished run in {args.output_dir}; run the pipeline for the previous release first")
+        return 1
+    # The release run gets its own copy of the catalog store, so the old one can be read as is
+    old_processed = load_processed_data(previous.processed) if previous.processed.exists() else None
+    old_domains = _read_json(previous.domain)
+    if old_processed is None or old_domains is None:
+        print(f"❌ Error: No analyzed run in {previous.run_dir}; run the pipeline for the previous release first")
+        return 1
+
+    if any(not (args.new_data_dir / name).exists() for name in ("schema_tables.csv", "schema_columns.csv")):
+        print(f"❌ Error: Catalog CSVs not found in {args.new_data_dir}")
+        return 1
+    # The release gets its own run, seeded from the previous one, which stays as it was
+    paths = RunPaths.create(args.new_data_dir, args.output_dir)
+    previous.fork(paths)
+    set_default_log_file(paths.activity_log)
+    args.run_paths = paths
+    print(f"📁 Release run {paths.run_id}, from run {previous.run_id}")
+    manifest = _open_manifest(paths)
+    manifest.reset("stages", ["process_schema_metadata"])
+    processed = _load_processed(manifest, paths)
+    diff = diff_catalogs(old_processed["schema_data"], processed["schema_data"])
+
+    try:
+        join_planner = load_join_paths(manifest, paths, processed)
+        if args.reanalyze:
+            manifest.reset("stages", ["analyze_domains", "compute_catalog_statistics", "analyze_data_patterns"])
+            processed, domain_data, pattern_data = _load_analysis(manifest, paths)
+        else:
+            # Keep the previous domains; new tables get their rule-based domain
+            # and the statistics and patterns are recomputed locally (no LLM call)
+            threshold = float(os.getenv("DOMAIN_RULE_CONFIDENCE", str(DEFAULT_CONFIDENCE)))
+            assignments = preclassify_domains(
+                processed["schema_data"], processed["relationships"],
+                load_table_metadata(paths.table_descriptions), threshold
+            )
+            domain_data = carry_forward_domains(old_domains, diff, processed["schema_data"], assignments)
+            save_intermediate_result(domain_data, paths.domain.name, paths.intermediate_dir)
+            manifest.complete("stages", "analyze_domains", [paths.domain], domain_inputs(paths), carried_forward=True)
+            manifest.reset("stages", ["compute_catalog_statistics"])
+            statistics = run_stage(
+                manifest, "compute_catalog_statistics", paths.statistics, [paths.processed, paths.domain],
+                lambda: compute_statistics(processed, domain_data, paths.intermediate_dir)
+            )
+            manifest.reset("stages", ["analyze_data_patterns"])
+            pattern_data = run_stage(
+                manifest, "analyze_data_patterns", paths.pattern, pattern_inputs(paths),
+                lambda: analyze_data_patterns(
+                    processed, domain_data, paths.intermediate_dir, statistics, join_planner, narrate=False
+                )
+            )
+            unmapped = sum(1 for table_key in diff["tables"]["added"] if not assignments[table_key]["confident"])
+            if unmapped:
+                print(f"ℹ️  {unmapped} new table(s) have no domain yet; use --reanalyze to classify them")
+
+        affected = affected_artifacts(diff, old_processed["schema_data"], processed["schema_data"], old_domains, domain_data)
+        atomic_write_json(paths.release_diff, {
+            "previous_data_dir": str(previous.data_dir),
+            "data_dir": str(paths.data_dir),
+            **diff,
+            "affected_artifacts": affected
+        })
+        _print_diff(diff, affected)
+
+        search_index = load_search_index(manifest, paths, processed)
+        batch_size = args.batch_size or int(os.getenv("DIAGRAM_BATCH_SIZE", "0")) or None
+        generate_artifacts(
+            processed, domain_data, pattern_data, batch_size, manifest, paths, search_index, join_planner
+        )
+    finally:
+        report_usage(paths.intermediate_dir)
+    if manifest.pending("artifacts"):
+        print(f"⚠️  Some artifacts failed; finish with: cli.py --run-id {paths.run_id} diagrams --resume")
+        return 1
+    return 0
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    """Run the full pipeline"""
+    import main
+    argv = ["--data-dir", str(args.data_dir), "--output-dir", str(args.output_dir)]
+    if args.run_id:
+        argv += ["--run-id", args.run_id]
+    main.main(argv + (["--resume"] if args.resume else []))
+    return 0
+
+
+def cmd_batch(args: argparse.Namespace) -> int:
+    """Run the full pipeline for several catalogs in parallel"""
+    from batch_runner import run_batch
+    try:
+        summary = run_batch(
+            args.catalogs,
+            args.output_root,
+            workers=args.workers,
+            llm_concurrency=args.llm_concurrency,
+            resume=args.resume,
+            batch_size=args.batch_size
+        )
+    except FileNotFoundError as e:
+        print(f"❌ Error: {e}")
+        return 1
+    return 0 if all(row["status"] == "complete" for row in summary["catalogs"]) else 1
+
+
+def cmd_serve(args: argparse.Namespace) -> int:
+    """Open the SQLite metadata server and keep it running until interrupted"""
+    import threading
+    from catalog_store import load_processed_data
+    from sqlite_mcp_server import SQLiteMetadataServer
+
+    server = SQLiteMetadataServer(str(args.db))
+    if args.descriptions:
+        if not args.descriptions.exists():
+            print(f"❌ Error: File not found - {args.descriptions}")
+            return 1
+        server.load_metadata(args.descriptions)
+        print(f"✅ Loaded metadata from {args.descriptions}")
+    if args.schema:
+        if not args.schema.exists():
+            print(f"❌ Error: File not found - {args.schema}")
+            return 1
+        processed = load_processed_data(args.schema)
+        store = processed.get("catalog_store")
+        if store and Path(store).resolve() == Path(args.db).resolve():
+            print(f"✅ Tables and columns of {args.schema} are already in {args.db}")
+        else:
+            server.load_schema(processed["schema_data"])
+            print(f"✅ Loaded tables and columns from {args.schema}")
+    if args.statistics:
+        if not args.statistics.exists():
+            print(f"❌ Error: File not found - {args.statistics}")
+            return 1
+        server.load_statistics(args.statistics)
+        print(f"✅ Loaded catalog statistics from {args.statistics}")
+    if args.search_index:
+        if not args.search_index.exists():
+            print(f"❌ Error: File not found - {args.search_index}")
+            return 1
+        server.load_search_index(args.search_index)
+        print(f"✅ Loaded search index from {args.search_index}")
+    if args.join_paths:
+        if not args.join_paths.exists():
+            print(f"❌ Error: File not found - {args.join_paths}")
+            return 1
+        server.load_join_paths(args.join_paths)
+        print(f"✅ Loaded join paths from {args.join_paths}")
+
+    print(f"🗄️  Metadata server ready on {args.db} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        print("\nShutting down server...")
+    finally:
+        server.conn.close()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="cli.py",
+        description="Metadata knowledge extraction: load, inspect, analyze and diagram a schema catalog"
+    )
+    parser.add_argument("--data-dir", type=Path, default=Path("data"),
+                        help="Directory containing schema_tables.csv and schema_columns.csv")
+    parser.add_argument("--output-dir", type=Path, default=Path("outputs"),
+                        help="Directory for the run directories (runs/<run id>) and the latest pointer")
+    parser.add_argument("--run-id", type=_run_id,
+                        help="Run to work on (default: the latest finished run, or a new one if there is none)")
+    commands = parser.add_subparsers(dest="command", required=True, metavar="command")
+
+    load = commands.add_parser("load", help="Load the schema CSVs and save the processed data (offline)")
+    load.set_defaults(func=cmd_load)
+
+    stats = commands.add_parser("stats", help="Print catalog statistics (offline)")
+    stats.add_argument("--top", type=int, default=10, help="Number of hub tables to list")
+    stats.add_argument("--extended", action="store_true",
+                       help="Add data types, description coverage and FK in/out degree")
+    stats.set_defaults(func=cmd_stats)
+
+    search = commands.add_parser("search", help="Search table and column descriptions locally (offline)")
+    search.add_argument("query", nargs="+", help="Free text, e.g. insurance copay")
+    search.add_argument("-k", type=int, default=10, help="Number of results")
+    search.add_argument("--kind", choices=["table", "column"], help="Only return tables or only columns")
+    search.add_argument("--tables", action="store_true", help="Rank tables by their best matching column")
+    search.set_defaults(func=cmd_search)
+
+    join_paths = commands.add_parser("paths", help="Show the shortest join paths between two tables (offline)")
+    join_paths.add_argument("from_table", help="SCHEMA.TABLE or a bare table name")
+    join_paths.add_argument("to_table", help="SCHEMA.TABLE or a bare table name")
+    join_paths.add_argument("-k", type=int, default=3, help="Number of paths")
+    join_paths.add_argument("--max-hops", type=int, help="Leave out paths with more joins than this")
+    join_paths.set_defaults(func=cmd_paths)
+
+    analyze = commands.add_parser("analyze", help="Run the LLM domain and pattern analysis")
+    analyze.add_argument("--resume", action="store_true", help="Keep analysis results that are still current")
+    analyze.set_defaults(func=cmd_analyze)
+
+    diagrams = commands.add_parser("diagrams", help="Generate the Mermaid artifacts")
+    diagrams.add_argument("--resume", action="store_true", help="Only redo failed or missing diagrams")
+    diagrams.add_argument("--batch-size", type=int, help="Request schema diagrams this many per call")
+    diagrams.set_defaults(func=cmd_diagrams)
+
+    run = commands.add_parser("run", help="Run the full pipeline (same as src/main.py)")
+    run.add_argument("--resume", action="store_true", help="Redo only failed or missing steps")
+    run.set_defaults(func=cmd_run)
+
+    diff = commands.add_parser("diff", help="Compare two catalog releases and list the affected artifacts (offline)")
+    diff.add_argument("old", type=Path, help="Catalog directory of the previous release")
+    diff.add_argument("new", type=Path, help="Catalog directory of the new release")
+    diff.add_argument("--domains", type=Path,
+                      help="Domain analysis to map tables to artifacts (default: the run's domain_analysis.json)")
+    diff.add_argument("--output", type=Path, help="Write the full diff as JSON")
+    diff.set_defaults(func=cmd_diff)
+
+    release = commands.add_parser(
+        "release", help="Start a run for a new catalog release from the latest run, regenerating only affected diagrams"
+    )
+    release.add_argument("new_data_dir", type=Path, help="Catalog directory of the new release")
+    release.add_argument("--reanalyze", action="store_true",
+                         help="Rerun the LLM domain and pattern analysis instead of carrying it forward")
+    release.add_argument("--batch-size", type=int, help="Request schema diagrams this many per call")
+    release.set_defaults(func=cmd_release)
+
+    batch = commands.add_parser("batch", help="Run the full pipeline for several catalog directories in parallel")
+    batch.add_argument("catalogs", type=Path, nargs="+", help="Catalog directories, each with the two schema CSVs")
+    batch.add_argument("--output-root", type=Path, default=Path("outputs/catalogs"),
+                       help="Each catalog writes to <output-root>/<catalog name>/runs/<run id>")
+    batch.add_argument("--workers", type=int, help="Worker processes (default: CPU count, at most one per catalog)")
+    batch.add_argument("--llm-concurrency", type=int,
+                       help="LLM requests in flight across all catalogs (default: LLM_CONCURRENCY or 8)")
+    batch.add_argument("--batch-size", type=int, help="Request schema diagrams this many per call")
+    batch.add_argument("--resume", action="store_true", help="Redo only failed or missing steps per catalog")
+    batch.set_defaults(func=cmd_batch)
+
+    serve = commands.add_parser("serve", help="Run the SQLite metadata server (offline)")
+    serve.add_argument("--db", type=Path, default=Path("schema_metadata.db"))
+    serve.add_argument("--descriptions", type=Path, help="Table descriptions CSV to load first")
+    serve.add_argument("--schema", type=Path,
+                       help="processed_schema_data.json from a pipeline run to serve its tables and columns")
+    serve.add_argument("--statistics", type=Path,
+                       help="catalog_statistics.json from a pipeline run to serve per-table and per-domain statistics")
+    serve.add_argument("--search-index", type=Path,
+                       help="search_index.npz from a pipeline run to serve description search")
+    serve.add_argument("--join-paths", type=Path,
+                       help="join_paths.json from a pipeline run to serve join path lookups")
+    serve.set_defaults(func=cmd_serve)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    from run_paths import RunInProgressError
+    status = 1
+    try:
+        status = args.func(args)
+    except RunInProgressError as e:
+        print(f"❌ Error: {e}")
+    finally:
+        run_paths = getattr(args, "run_paths", None)
+        if run_paths is not None:
+            if status == 0:
+                run_paths.publish()
+            run_paths.finish()
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
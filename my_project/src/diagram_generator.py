@@ -1,18 +1,296 @@
+import os
+import re
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from llm_usage import usage_context
+from mermaid_validator import MermaidSyntaxError, validate_diagram
+from prompt_layout import canonical_json, layered_prompt
 from prompt_utils import query_llm, log_activity
+from run_manifest import atomic_write_text
+from tracing import span
+
+# Join paths listed per pair of consecutive steps in path diagrams
+JOIN_PATH_ALTERNATIVES = 2
+
+# Artifact specs shared by the single-artifact and batched prompts. Keys are
+# used as section names in batched responses.
+ARTIFACTS: Dict[str, Dict[str, Any]] = {
+    "ecosystem_overview": {
+        "name": "Ecosystem Overview",
+        "filename": "01_ecosystem_overview.md",
+        "label": "ecosystem overview",
+        "instruction": "Create a high-level Mermaid diagram showing the clinical data ecosystem",
+        "requirements": [
+            "Use subgraphs to represent main domains (Patient, Clinical, Billing)",
+            "Show major relationships between domains with descriptive labels",
+            "Use minimal detail, focus on clarity",
+            "Add a title 'Clinical Data Ecosystem Overview'",
+            "Include a legend explaining the diagram elements",
+            "Use consistent color coding for different domain types",
+        ],
+    },
+    "patient_domain": {
+        "name": "Patient Domain",
+        "filename": "02_patient_domain.md",
+        "label": "patient domain diagram",
+        "instruction": "Create a Mermaid diagram for the Patient & Demographics domain",
+        "requirements": [
+            "Focus on patient-related tables and attributes",
+            "Highlight primary demographic data points",
+            "Show relationships to other domains",
+            "Use clear visual hierarchy",
+            "Include data types and key indicators",
+            "Add notes for important relationships",
+        ],
+    },
+    "encounters_domain": {
+        "name": "Encounters Domain",
+        "filename": "03_encounters_domain.md",
+        "label": "encounters domain diagram",
+        "instruction": "Create a Mermaid diagram for the Encounters & Appointments domain",
+        "requirements": [
+            "Show appointment and encounter tables",
+            "Include scheduling relationships",
+            "Highlight temporal aspects",
+            "Show provider relationships",
+            "Include status tracking",
+            "Add notes for scheduling rules",
+        ],
+    },
+    "clinical_documentation": {
+        "name": "Clinical Documentation",
+        "filename": "04_clinical_documentation.md",
+        "label": "clinical documentation diagram",
+        "instruction": "Create a Mermaid diagram for the Clinical Documentation domain",
+        "requirements": [
+            "Show clinical document types and structures",
+            "Include diagnosis code relationships",
+            "Show result tracking",
+            "Highlight document versioning",
+            "Include provider annotations",
+            "Show document status workflows",
+        ],
+    },
+    "billing_domain": {
+        "name": "Billing Domain",
+        "filename": "05_billing_domain.md",
+        "label": "billing domain diagram",
+        "instruction": "Create a Mermaid diagram for the Billing & Claims domain",
+        "requirements": [
+            "Show claim processing workflow",
+            "Include insurance package relationships",
+            "Show payment tracking",
+            "Include fee schedules",
+            "Show claim status transitions",
+            "Add notes for key billing rules",
+        ],
+    },
+    "patient_encounter_path": {
+        "name": "Patient-Encounter Path",
+        "filename": "06_patient_encounter_path.md",
+        "label": "patient-encounter path diagram",
+        "instruction": "Create a Mermaid diagram showing the path from Patient to Diagnoses",
+        "requirements": [
+            "Show step-by-step path: patient → appointment → encounter → diagnosis",
+            "Include key fields for joins",
+            "Add notes for common queries",
+            "Show cardinality of relationships",
+            "Include temporal aspects",
+            "Highlight primary/foreign key relationships",
+        ],
+        # Tables the path visits, in order; the join planner supplies the joins
+        "join_steps": ["PATIENT", "APPOINTMENT", "CLINICALENCOUNTER", "CLINICALENCOUNTERDIAGNOSIS"],
+    },
+    "claim_payment_path": {
+        "name": "Claim-Payment Path",
+        "filename": "07_claim_payment_path.md",
+        "label": "claim-payment path diagram",
+        "instruction": "Create a Mermaid diagram showing the path from Encounter to Payment",
+        "requirements": [
+            "Show workflow: encounter → claim → payment batch",
+            "Include status transitions",
+            "Show payment processing steps",
+            "Include validation rules",
+            "Show error handling paths",
+            "Add notes for payment reconciliation",
+        ],
+        "join_steps": ["CLINICALENCOUNTER", "CLAIM", "TRANSACTION", "PAYMENTBATCH"],
+    },
+    "audit_quality": {
+        "name": "Audit & Quality",
+        "filename": "08_audit_quality.md",
+        "label": "audit-quality diagram",
+        "instruction": "Create a Mermaid diagram showing Data Quality & Audit relationships",
+        "requirements": [
+            "Show audit table relationships",
+            "Include data validation rules",
+            "Show quality check points",
+            "Include error tracking",
+            "Show audit log structure",
+            "Add notes for compliance requirements",
+        ],
+    },
+    "patient_timeline": {
+        "name": "Patient Timeline",
+        "filename": "09_patient_timeline.md",
+        "label": "patient timeline diagram",
+        "instruction": "Create a Mermaid diagram showing an Integrated Patient Timeline",
+        "requirements": [
+            "Show timeline of patient interactions",
+            "Include appointments, encounters, claims",
+            "Show parallel workflows",
+            "Include status changes",
+            "Show document creation points",
+            "Add notes for key events",
+        ],
+    },
+    "relationship_heatmap": {
+        "name": "Relationship Heatmap",
+        "filename": "10_relationship_heatmap.md",
+        "label": "relationship heatmap",
+        "instruction": "Create a Mermaid diagram showing Entity Relationship patterns",
+        "requirements": [
+            "Show connection intensity between entities",
+            "Use color coding for relationship types",
+            "Include relationship cardinality",
+            "Show data flow direction",
+            "Highlight central entities",
+            "Add legend for relationship types",
+        ],
+    },
+}
+
+# Artifacts built from the schema (as opposed to the domain analysis); these
+# are the ones that can share one schema upload in a batched request
+SCHEMA_ARTIFACTS = [key for key in ARTIFACTS if key != "ecosystem_overview"]
+
+SECTION_PATTERN = re.compile(
+    r"^=== BEGIN (?P<key>[a-z_]+) ===[ \t]*\n(?P<body>.*?)\n=== END (?P=key) ===[ \t]*$",
+    re.MULTILINE | re.DOTALL
+)
+
+
+def format_requirements(requirements: List[str]) -> str:
+    """Number a list of requirements one per line"""
+    return "\n".join(f"{index}. {requirement}" for index, requirement in enumerate(requirements, 1))
+
+
+def parse_batch_response(response: str) -> Dict[str, str]:
+    """
+    Split a batched response into its named diagrams.
+
+    Only sections with both BEGIN and END markers are returned, so a
+    response cut off by the token limit never yields a half diagram.
+
+    Args:
+        response (str): The LLM's batched response
+
+    Returns:
+        Dict[str, str]: Diagram content keyed by artifact key
+    """
+    return {
+        match.group("key"): match.group("body").strip()
+        for match in SECTION_PATTERN.finditer(response)
+        if match.group("body").strip()
+    }
+
 
 class DiagramGenerator:
-    def __init__(self, output_dir: Path = Path("outputs/final")):
+    def __init__(
+        self,
+        output_dir: Path = Path("outputs/final"),
+        max_repairs: Optional[int] = None,
+        search_index: Optional[Any] = None,
+        relevant_tables: Optional[int] = None,
+        join_planner: Optional[Any] = None
+    ):
         """
         Initialize the diagram generator.
         
         Args:
             output_dir (Path): Directory to save generated diagrams
+            max_repairs (Optional[int]): Re-requests allowed per artifact when
+                its Mermaid fails validation, defaults to MERMAID_MAX_REPAIRS
+                or 2
+            search_index (Optional[SearchIndex]): Catalog search index; when
+                given, schema prompts name the tables most relevant to each
+                diagram
+            relevant_tables (Optional[int]): Tables named per diagram,
+                defaults to DIAGRAM_RELEVANT_TABLES or 15 (0 disables)
+            join_planner (Optional[JoinPlanner]): Join path planner; when
+                given, path diagrams are told the join conditions between
+                their steps
         """
         self.output_dir = output_dir
+        if max_repairs is None:
+            max_repairs = int(os.getenv("MERMAID_MAX_REPAIRS", "2"))
+        self.max_repairs = max_repairs
+        if relevant_tables is None:
+            relevant_tables = int(os.getenv("DIAGRAM_RELEVANT_TABLES", "15"))
+        self.search_index = search_index
+        self.relevant_tables = relevant_tables
+        self.join_planner = join_planner
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
+    def relevant_tables_hint(self, key: str) -> str:
+        """
+        Name the tables the search index ranks highest for an artifact.
+        
+        The artifact's instruction and requirements are the query, so the
+        hint costs no LLM call; it follows the shared catalog context and
+        leaves the cacheable prefix unchanged.
+        
+        Args:
+            key (str): Artifact key in ARTIFACTS
+            
+        Returns:
+            str: A prompt line, or an empty string without an index
+        """
+        if self.search_index is None or self.relevant_tables <= 0:
+            return ""
+        spec = ARTIFACTS[key]
+        query = " ".join([spec["instruction"]] + spec["requirements"])
+        tables = [hit["table"] for hit in self.search_index.search_tables(query, self.relevant_tables)]
+        if not tables:
+            return ""
+        return f"Tables most relevant to this diagram: {', '.join(tables)}\n"
+
+    def join_paths_hint(self, key: str) -> str:
+        """
+        List the join paths between the steps of a path artifact.
+        
+        Consecutive steps are joined by the shortest path (and the runner-up,
+        so alternative join columns are visible) over the foreign keys.
+        Steps missing from the catalog are left out.
+        
+        Args:
+            key (str): Artifact key in ARTIFACTS
+            
+        Returns:
+            str: Prompt lines, or an empty string for other artifacts or
+                without a planner
+        """
+        steps = ARTIFACTS[key].get("join_steps")
+        if self.join_planner is None or not steps:
+            return ""
+        tables = []
+        for step in steps:
+            try:
+                tables.append(self.join_planner.resolve(step))
+            except ValueError:
+                continue
+        lines = []
+        for source, target in zip(tables, tables[1:]):
+            for path in self.join_planner.k_shortest_paths(source, target, k=JOIN_PATH_ALTERNATIVES):
+                conditions = ", then ".join(
+                    f"{join['from_table']}.{join['from_column']} = {join['to_table']}.{join['to_column']}"
+                    for join in path["joins"]
+                )
+                lines.append(f"- {source} -> {target}: {conditions}")
+        if not lines:
+            return ""
+        return "Join paths from the foreign keys (use these join columns):\n" + "\n".join(lines) + "\n"
+
     def save_diagram(self, content: str, filename: str) -> None:
         """
         Save a diagram to a markdown file.
@@ -27,9 +305,152 @@ class DiagramGenerator:
 {content}
 """
         filepath = self.output_dir / filename
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(formatted_content)
-        log_activity(f"Generated diagram: {filename}")
+        with span("save_diagram", artifact=filename, bytes=len(formatted_content)):
+            atomic_write_text(filepath, formatted_content)
+        log_activity(f"Generated diagram: {filename}", bytes=len(formatted_content))
+
+    def build_prompt(self, key: str, data: Dict[str, Any]) -> str:
+        """
+        Build the single-artifact prompt for an artifact.
+        
+        Schema-based prompts start with the shared catalog context, which is
+        byte-identical across artifacts so providers can cache it.
+        
+        Args:
+            key (str): Artifact key in ARTIFACTS
+            data (Dict[str, Any]): Schema data, or domain data for the overview
+            
+        Returns:
+            str: The formatted prompt
+        """
+        spec = ARTIFACTS[key]
+        if key == "ecosystem_overview":
+            return f"""
+{spec['instruction']}:
+{canonical_json(data)}
+
+Requirements:
+{format_requirements(spec['requirements'])}
+
+Return only the Mermaid diagram code wrapped in ```mermaid``` tags.
+"""
+        return layered_prompt(data, f"""
+{spec['instruction']} using the schema catalog above.
+{self.relevant_tables_hint(key)}{self.join_paths_hint(key)}
+Requirements:
+{format_requirements(spec['requirements'])}
+
+Return only the Mermaid diagram code wrapped in ```mermaid``` tags.
+""")
+
+    def build_batch_prompt(self, keys: List[str], schema_data: Dict[str, Any]) -> str:
+        """
+        Build one prompt that asks for several diagrams over a shared schema.
+        
+        Args:
+            keys (List[str]): Artifact keys to request
+            schema_data (Dict[str, Any]): Schema data sent once for all artifacts
+            
+        Returns:
+            str: The formatted prompt
+        """
+        sections = []
+        for key in keys:
+            spec = ARTIFACTS[key]
+            sections.append(
+                f"Diagram `{key}`: {spec['instruction']}.\n"
+                f"{self.relevant_tables_hint(key)}"
+                f"{self.join_paths_hint(key)}"
+                f"Requirements:\n{format_requirements(spec['requirements'])}"
+            )
+        separator = "\n\n"
+        return layered_prompt(schema_data, f"""
+Use the schema catalog above for every diagram below.
+
+Create the following {len(keys)} Mermaid diagrams.
+
+{separator.join(sections)}
+
+Return each diagram in its own section, in this exact format and nothing else:
+
+=== BEGIN <diagram name> ===
+```mermaid
+...
+```
+=== END <diagram name> ===
+""")
+
+    def build_repair_prompt(self, prompt: str, diagram: str, error: MermaidSyntaxError) -> str:
+        """
+        Build a re-request for a diagram that failed validation.
+        
+        The original prompt is kept intact as the prefix so the catalog
+        context stays cacheable.
+        
+        Args:
+            prompt (str): The prompt the diagram was generated from
+            diagram (str): The invalid response
+            error (MermaidSyntaxError): The validation error
+            
+        Returns:
+            str: The repair prompt
+        """
+        return f"""{prompt}
+Your previous answer failed Mermaid syntax checking:
+{error}
+
+Previous answer:
+{diagram}
+
+Fix the error and return the complete corrected diagram wrapped in ```mermaid``` tags.
+"""
+
+    def _generate(self, key: str, data: Dict[str, Any], response: Optional[str] = None) -> int:
+        """
+        Generate, validate and save one artifact.
+        
+        Invalid Mermaid is re-requested for this artifact alone, with the
+        parser error in the prompt, up to ``max_repairs`` times.
+        
+        Args:
+            key (str): Artifact key in ARTIFACTS
+            data (Dict[str, Any]): Schema data, or domain data for the overview
+            response (Optional[str]): A diagram already generated for this
+                artifact, e.g. from a batch; requested if not given
+            
+        Returns:
+            int: Number of repair requests that were needed
+            
+        Raises:
+            MermaidSyntaxError: If the diagram is still invalid after all repairs
+        """
+        spec = ARTIFACTS[key]
+        task = "overview" if key == "ecosystem_overview" else "diagram"
+        try:
+            with span("prompt.diagram", artifact=spec["name"]) as prompt_span:
+                prompt = self.build_prompt(key, data)
+                prompt_span.set(prompt_chars=len(prompt))
+            diagram = response if response is not None else query_llm(prompt, task=task, json_only=False)
+            for attempt in range(self.max_repairs + 1):
+                try:
+                    validate_diagram(diagram)
+                    break
+                except MermaidSyntaxError as e:
+                    if attempt == self.max_repairs:
+                        raise
+                    log_activity(
+                        f"Invalid Mermaid in {spec['label']}, re-requesting: {e}",
+                        level="WARNING",
+                        artifact=spec["name"],
+                        attempt=attempt + 1
+                    )
+                    with span("artifact.repair", artifact=spec["name"], attempt=attempt + 1):
+                        diagram = query_llm(self.build_repair_prompt(prompt, diagram, e), task=task, json_only=False)
+            self.save_diagram(diagram, spec["filename"])
+            return attempt
+        except Exception as e:
+            log_activity(f"Error generating {spec['label']}: {str(e)}", level="ERROR")
+            raise
 
     def generate_ecosystem_overview(self, domain_data: Dict[str, Any]) -> None:
         """
@@ -39,27 +460,7 @@ class DiagramGenerator:
         Args:
             domain_data (Dict[str, Any]): Domain classification data
         """
-        try:
-            prompt = f"""
-            Create a high-level Mermaid diagram showing the clinical data ecosystem:
-            {domain_data}
-
-            Requirements:
-            1. Use subgraphs to represent main domains (Patient, Clinical, Billing)
-            2. Show major relationships between domains with descriptive labels
-            3. Use minimal detail, focus on clarity
-            4. Add a title 'Clinical Data Ecosystem Overview'
-            5. Include a legend explaining the diagram elements
-            6. Use consistent color coding for different domain types
-
-            Return only the Mermaid diagram code wrapped in ```mermaid``` tags.
-            """
-            
-            diagram = query_llm(prompt)
-            self.save_diagram(diagram, "01_ecosystem_overview.md")
-        except Exception as e:
-            log_activity(f"Error generating ecosystem overview: {str(e)}")
-            raise
+        self._generate("ecosystem_overview", domain_data)
 
     def generate_patient_domain(self, schema_data: Dict[str, Any]) -> None:
         """
@@ -69,27 +470,7 @@ class DiagramGenerator:
         Args:
             schema_data (Dict[str, Any]): Schema data
         """
-        try:
-            prompt = f"""
-            Create a Mermaid diagram for the Patient & Demographics domain:
-            {schema_data}
-
-            Requirements:
-            1. Focus on patient-related tables and attributes
-            2. Highlight primary demographic data points
-            3. Show relationships to other domains
-            4. Use clear visual hierarchy
-            5. Include data types and key indicators
-            6. Add notes for important relationships
-
-            Return only the Mermaid diagram code wrapped in ```mermaid``` tags.
-            """
-            
-            diagram = query_llm(prompt)
-            self.save_diagram(diagram, "02_patient_domain.md")
-        except Exception as e:
-            log_activity(f"Error generating patient domain diagram: {str(e)}")
-            raise
+        self._generate("patient_domain", schema_data)
 
     def generate_encounters_domain(self, schema_data: Dict[str, Any]) -> None:
         """
@@ -99,27 +480,7 @@ class DiagramGenerator:
         Args:
             schema_data (Dict[str, Any]): Schema data
         """
-        try:
-            prompt = f"""
-            Create a Mermaid diagram for the Encounters & Appointments domain:
-            {schema_data}
-
-            Requirements:
-            1. Show appointment and encounter tables
-            2. Include scheduling relationships
-            3. Highlight temporal aspects
-            4. Show provider relationships
-            5. Include status tracking
-            6. Add notes for scheduling rules
-
-            Return only the Mermaid diagram code wrapped in ```mermaid``` tags.
-            """
-            
-            diagram = query_llm(prompt)
-            self.save_diagram(diagram, "03_encounters_domain.md")
-        except Exception as e:
-            log_activity(f"Error generating encounters domain diagram: {str(e)}")
-            raise
+        self._generate("encounters_domain", schema_data)
 
     def generate_clinical_documentation(self, schema_data: Dict[str, Any]) -> None:
         """
@@ -129,27 +490,7 @@ class DiagramGenerator:
         Args:
             schema_data (Dict[str, Any]): Schema data
         """
-        try:
-            prompt = f"""
-            Create a Mermaid diagram for the Clinical Documentation domain:
-            {schema_data}
-
-            Requirements:
-            1. Show clinical document types and structures
-            2. Include diagnosis code relationships
-            3. Show result tracking
-            4. Highlight document versioning
-            5. Include provider annotations
-            6. Show document status workflows
-
-            Return only the Mermaid diagram code wrapped in ```mermaid``` tags.
-            """
-            
-            diagram = query_llm(prompt)
-            self.save_diagram(diagram, "04_clinical_documentation.md")
-        except Exception as e:
-            log_activity(f"Error generating clinical documentation diagram: {str(e)}")
-            raise
+        self._generate("clinical_documentation", schema_data)
 
     def generate_billing_domain(self, schema_data: Dict[str, Any]) -> None:
         """
@@ -159,27 +500,7 @@ class DiagramGenerator:
         Args:
             schema_data (Dict[str, Any]): Schema data
         """
-        try:
-            prompt = f"""
-            Create a Mermaid diagram for the Billing & Claims domain:
-            {schema_data}
-
-            Requirements:
-            1. Show claim processing workflow
-            2. Include insurance package relationships
-            3. Show payment tracking
-            4. Include fee schedules
-            5. Show claim status transitions
-            6. Add notes for key billing rules
-
-            Return only the Mermaid diagram code wrapped in ```mermaid``` tags.
-            """
-            
-            diagram = query_llm(prompt)
-            self.save_diagram(diagram, "05_billing_domain.md")
-        except Exception as e:
-            log_activity(f"Error generating billing domain diagram: {str(e)}")
-            raise
+        self._generate("billing_domain", schema_data)
 
     def generate_patient_encounter_path(self, schema_data: Dict[str, Any]) -> None:
         """
@@ -189,27 +510,7 @@ class DiagramGenerator:
         Args:
             schema_data (Dict[str, Any]): Schema data
         """
-        try:
-            prompt = f"""
-            Create a Mermaid diagram showing the path from Patient to Diagnoses:
-            {schema_data}
-
-            Requirements:
-            1. Show step-by-step path: patient → appointment → encounter → diagnosis
-            2. Include key fields for joins
-            3. Add notes for common queries
-            4. Show cardinality of relationships
-            5. Include temporal aspects
-            6. Highlight primary/foreign key relationships
-
-            Return only the Mermaid diagram code wrapped in ```mermaid``` tags.
-            """
-            
-            diagram = query_llm(prompt)
-            self.save_diagram(diagram, "06_patient_encounter_path.md")
-        except Exception as e:
-            log_activity(f"Error generating patient-encounter path diagram: {str(e)}")
-            raise
+        self._generate("patient_encounter_path", schema_data)
 
     def generate_claim_payment_path(self, schema_data: Dict[str, Any]) -> None:
         """
@@ -219,27 +520,7 @@ class DiagramGenerator:
         Args:
             schema_data (Dict[str, Any]): Schema data
         """
-        try:
-            prompt = f"""
-            Create a Mermaid diagram showing the path from Encounter to Payment:
-            {schema_data}
-
-            Requirements:
-            1. Show workflow: encounter → claim → payment batch
-            2. Include status transitions
-            3. Show payment processing steps
-            4. Include validation rules
-            5. Show error handling paths
-            6. Add notes for payment reconciliation
-
-            Return only the Mermaid diagram code wrapped in ```mermaid``` tags.
-            """
-            
-            diagram = query_llm(prompt)
-            self.save_diagram(diagram, "07_claim_payment_path.md")
-        except Exception as e:
-            log_activity(f"Error generating claim-payment path diagram: {str(e)}")
-            raise
+        self._generate("claim_payment_path", schema_data)
 
     def generate_audit_quality(self, schema_data: Dict[str, Any]) -> None:
         """
@@ -249,27 +530,7 @@ class DiagramGenerator:
         Args:
             schema_data (Dict[str, Any]): Schema data
         """
-        try:
-            prompt = f"""
-            Create a Mermaid diagram showing Data Quality & Audit relationships:
-            {schema_data}
-
-            Requirements:
-            1. Show audit table relationships
-            2. Include data validation rules
-            3. Show quality check points
-            4. Include error tracking
-            5. Show audit log structure
-            6. Add notes for compliance requirements
-
-            Return only the Mermaid diagram code wrapped in ```mermaid``` tags.
-            """
-            
-            diagram = query_llm(prompt)
-            self.save_diagram(diagram, "08_audit_quality.md")
-        except Exception as e:
-            log_activity(f"Error generating audit-quality diagram: {str(e)}")
-            raise
+        self._generate("audit_quality", schema_data)
 
     def generate_patient_timeline(self, schema_data: Dict[str, Any]) -> None:
         """
@@ -279,27 +540,7 @@ class DiagramGenerator:
         Args:
             schema_data (Dict[str, Any]): Schema data
         """
-        try:
-            prompt = f"""
-            Create a Mermaid diagram showing an Integrated Patient Timeline:
-            {schema_data}
-
-            Requirements:
-            1. Show timeline of patient interactions
-            2. Include appointments, encounters, claims
-            3. Show parallel workflows
-            4. Include status changes
-            5. Show document creation points
-            6. Add notes for key events
-
-            Return only the Mermaid diagram code wrapped in ```mermaid``` tags.
-            """
-            
-            diagram = query_llm(prompt)
-            self.save_diagram(diagram, "09_patient_timeline.md")
-        except Exception as e:
-            log_activity(f"Error generating patient timeline diagram: {str(e)}")
-            raise
+        self._generate("patient_timeline", schema_data)
 
     def generate_relationship_heatmap(self, schema_data: Dict[str, Any]) -> None:
         """
@@ -309,27 +550,78 @@ class DiagramGenerator:
         Args:
             schema_data (Dict[str, Any]): Schema data
         """
-        try:
-            prompt = f"""
-            Create a Mermaid diagram showing Entity Relationship patterns:
-            {schema_data}
-
-            Requirements:
-            1. Show connection intensity between entities
-            2. Use color coding for relationship types
-            3. Include relationship cardinality
-            4. Show data flow direction
-            5. Highlight central entities
-            6. Add legend for relationship types
-
-            Return only the Mermaid diagram code wrapped in ```mermaid``` tags.
-            """
-            
-            diagram = query_llm(prompt)
-            self.save_diagram(diagram, "10_relationship_heatmap.md")
-        except Exception as e:
-            log_activity(f"Error generating relationship heatmap: {str(e)}")
-            raise
+        self._generate("relationship_heatmap", schema_data)
+
+    def generate_batch(
+        self,
+        schema_data: Dict[str, Any],
+        keys: Optional[List[str]] = None,
+        batch_size: Optional[int] = None
+    ) -> Dict[str, str]:
+        """
+        Generate several schema artifacts with one schema upload per batch.
+        
+        Each batch sends the schema once together with the specs of its
+        artifacts and splits the sectioned response back into the usual
+        0N_*.md files. Artifacts missing or incomplete in the batch response
+        fall back to their own single-artifact call; invalid diagrams are
+        repaired one artifact at a time.
+        
+        Args:
+            schema_data (Dict[str, Any]): Schema data
+            keys (Optional[List[str]]): Artifact keys, defaults to every
+                schema-based artifact
+            batch_size (Optional[int]): Artifacts per request, defaults to all
+                of them in one request
+        
+        Returns:
+            Dict[str, str]: How each artifact was produced: ``batch``,
+                ``repaired``, ``fallback`` or ``failed``
+        """
+        keys = list(keys or SCHEMA_ARTIFACTS)
+        batch_size = batch_size or len(keys)
+        outcome: Dict[str, str] = {}
+
+        for start in range(0, len(keys), batch_size):
+            batch = keys[start:start + batch_size]
+            diagrams: Dict[str, str] = {}
+            try:
+                with span("artifact.batch", artifacts=len(batch)):
+                    with span("prompt.diagram_batch", artifacts=len(batch)) as prompt_span:
+                        prompt = self.build_batch_prompt(batch, schema_data)
+                        prompt_span.set(prompt_chars=len(prompt))
+                    response = query_llm(prompt, task="diagram", json_only=False)
+                diagrams = parse_batch_response(response)
+            except Exception as e:
+                log_activity(f"Batched generation failed for {', '.join(batch)}: {str(e)}", level="ERROR")
+
+            for key in batch:
+                name = ARTIFACTS[key]["name"]
+                if key in diagrams:
+                    try:
+                        with usage_context(artifact=name):
+                            repairs = self._generate(key, schema_data, response=diagrams[key])
+                        outcome[key] = "repaired" if repairs else "batch"
+                    except Exception:
+                        outcome[key] = "failed"
+                    continue
+
+                log_activity(f"Batch response missing {key}; falling back to a single call", level="WARNING")
+                try:
+                    with span("artifact", artifact=name, fallback=True), usage_context(artifact=name):
+                        self._generate(key, schema_data)
+                    outcome[key] = "fallback"
+                except Exception:
+                    outcome[key] = "failed"
+
+        log_activity(
+            "Completed batched artifact generation",
+            batched=sum(1 for value in outcome.values() if value == "batch"),
+            repaired=sum(1 for value in outcome.values() if value == "repaired"),
+            fallbacks=sum(1 for value in outcome.values() if value == "fallback"),
+            failed=sum(1 for value in outcome.values() if value == "failed")
+        )
+        return outcome
 
     def generate_all_artifacts(
         self,
@@ -348,23 +640,23 @@ class DiagramGenerator:
         try:
             # 1. High-level overview
             self.generate_ecosystem_overview(domain_data)
-            
+
             # 2-5. Domain-specific diagrams
             self.generate_patient_domain(schema_data)
             self.generate_encounters_domain(schema_data)
             self.generate_clinical_documentation(schema_data)
             self.generate_billing_domain(schema_data)
-            
+
             # 6-8. Pathway and query-oriented diagrams
             self.generate_patient_encounter_path(schema_data)
             self.generate_claim_payment_path(schema_data)
             self.generate_audit_quality(schema_data)
-            
+
             # 9-10. Advanced integrative views
             self.generate_patient_timeline(schema_data)
             self.generate_relationship_heatmap(schema_data)
-            
+
             log_activity("Completed generation of all artifacts")
         except Exception as e:
-            log_activity(f"Error in artifact generation: {str(e)}")
+            log_activity(f"Error in artifact generation: {str(e)}", level="ERROR")
             raise
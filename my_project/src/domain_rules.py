@@ -0,0 +1,289 @@
+import csv
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from catalog_stats import UNASSIGNED_DOMAIN, domain_lookup
+
+DEFAULT_CONFIDENCE = 0.7
+
+# Name keywords per domain. A table votes for the domain of the keyword that
+# starts earliest in its name (PATIENTINSURANCE is a patient table); other
+# matches add a smaller vote. Keywords are long enough not to occur inside
+# unrelated words.
+DOMAIN_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "Patients": ("PATIENT", "GUARANTOR", "DEMOGRAPH", "ALLERGY", "VACCINE", "IMMUNIZATION"),
+    "Encounters": ("APPOINTMENT", "ENCOUNTER", "SCHEDUL", "VISIT", "CHECKIN"),
+    "Clinical Documentation": (
+        "DOCUMENT", "DIAGNOS", "MEDICATION", "ORDER", "RESULT", "CHART", "CLINICAL",
+        "PROBLEM", "PRESCRIPTION", "SURGICAL", "ANESTHESIA", "VITALS",
+    ),
+    "Billing": (
+        "CLAIM", "PAYMENT", "INSURANCE", "FEESCHEDULE", "TRANSACTION", "CHARGE", "ALLOWABLE",
+        "COPAY", "DENIAL", "REMITTANCE", "INVOICE", "COLLECTION", "BILLING", "PROCEDURECODE",
+    ),
+    "Providers": ("PROVIDER", "DEPARTMENT", "PRACTICE", "MEDICALGROUP", "FACILITY"),
+}
+# Tables that record changes to another table belong with auditing, whatever they track
+AUDIT_DOMAIN = "Audit & Quality"
+AUDIT_SUFFIXES = ("AUDIT", "HISTORY", "LOG")
+
+# Export CATEGORY and DataModel values with the domain they point to. They are
+# coarse (Collector also covers registration), so a name match outweighs them.
+CATEGORY_DOMAINS = {"collector": "Billing", "clinicals": "Clinical Documentation"}
+DATA_MODEL_DOMAINS = {"governed / analytical": "Analytics"}
+
+LEAD_WEIGHT = 1.0
+OTHER_WEIGHT = 0.3
+CATEGORY_WEIGHT = 0.4
+NEIGHBOUR_WEIGHT = 0.8
+NEIGHBOUR_ROUNDS = 2
+
+
+def load_table_metadata(path: Path) -> Dict[str, Dict[str, str]]:
+    """
+    Read CATEGORY and DataModel from the table descriptions export.
+
+    Args:
+        path (Path): data-view-metadata-tabledescriptions.csv
+
+    Returns:
+        Dict[str, Dict[str, str]]: ``SCHEMA.TABLE`` -> ``category`` and
+            ``data_model``; empty if the file does not exist
+    """
+    path = Path(path)
+    if not path.exists():
+        return {}
+    metadata = {}
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            schema_name = (row.get("SCHEMANAME") or "").strip()
+            table_name = (row.get("TABLE NAME") or "").strip()
+            if schema_name and table_name:
+                metadata[f"{schema_name}.{table_name}"] = {
+                    "category": (row.get("CATEGORY") or "").strip(),
+                    "data_model": (row.get("DataModel") or "").strip(),
+                }
+    return metadata
+
+
+def _name_votes(table_name: str) -> List[Tuple[str, float, str]]:
+    """(domain, weight, evidence) votes from a table name"""
+    name = table_name.upper()
+    matches = sorted(
+        (name.find(keyword), -len(keyword), keyword, domain)
+        for domain, keywords in DOMAIN_KEYWORDS.items()
+        for keyword in keywords
+        if keyword in name
+    )
+    votes = []
+    audit = next((suffix for suffix in AUDIT_SUFFIXES if name.endswith(suffix)), None)
+    if audit:
+        votes.append((AUDIT_DOMAIN, LEAD_WEIGHT, f"name suffix {audit}"))
+    seen = set()
+    covered: List[Tuple[int, int]] = []
+    for position, _, keyword, domain in matches:
+        end = position + len(keyword)
+        # SCHEDUL inside FEESCHEDULE is not a second match
+        if any(start <= position and end <= stop for start, stop in covered):
+            continue
+        covered.append((position, end))
+        if domain in seen:
+            continue
+        lead = not seen and not audit
+        votes.append((domain, LEAD_WEIGHT if lead else OTHER_WEIGHT, f"name {keyword}"))
+        seen.add(domain)
+    return votes
+
+
+def _decide(votes: List[Tuple[str, float, str]]) -> Tuple[Optional[str], float]:
+    """
+    Winning domain and its confidence.
+
+    Confidence is the winner's share of the votes, scaled down when the
+    total evidence is weaker than one leading name match.
+    """
+    scores: Counter = Counter()
+    for domain, weight, _ in votes:
+        scores[domain] += weight
+    if not scores:
+        return None, 0.0
+    (domain, top), = scores.most_common(1)
+    total = sum(scores.values())
+    return domain, round(top / total * min(1.0, total / LEAD_WEIGHT), 3)
+
+
+def preclassify_domains(
+    schema_data: Dict[str, Dict[str, Any]],
+    relationships: Dict[str, List[Dict[str, str]]],
+    table_metadata: Optional[Dict[str, Dict[str, str]]] = None,
+    threshold: float = DEFAULT_CONFIDENCE
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Assign tables to domains from their names, export metadata and foreign keys.
+
+    Each table collects votes from its name keywords, its export CATEGORY
+    and DataModel. Tables still below the threshold then take a vote from
+    the confident tables they reference or are referenced by (majority
+    share, weighted), repeated so labels spread one hop further. Nothing is
+    sent to the LLM here; callers send only the tables left below the
+    threshold.
+
+    Args:
+        schema_data (Dict[str, Dict[str, Any]]): Catalog
+        relationships (Dict[str, List[Dict[str, str]]]): Foreign keys per table
+        table_metadata (Optional[Dict[str, Dict[str, str]]]): CATEGORY and
+            DataModel per table, from ``load_table_metadata``
+        threshold (float): Confidence a table needs to skip the LLM
+
+    Returns:
+        Dict[str, Dict[str, Any]]: ``SCHEMA.TABLE`` -> ``domain`` (None if
+            there was no evidence), ``confidence``, ``confident`` and the
+            ``evidence`` behind the vote
+    """
+    table_metadata = table_metadata or {}
+    local_votes = {}
+    for schema_name, tables in schema_data.items():
+        for table_name in tables:
+            table_key = f"{schema_name}.{table_name}"
+            votes = _name_votes(table_name)
+            metadata = table_metadata.get(table_key, {})
+            category = CATEGORY_DOMAINS.get(metadata.get("category", "").lower())
+            if category:
+                votes.append((category, CATEGORY_WEIGHT, f"category {metadata['category']}"))
+            data_model = DATA_MODEL_DOMAINS.get(metadata.get("data_model", "").lower())
+            if data_model:
+                votes.append((data_model, CATEGORY_WEIGHT, f"data model {metadata['data_model']}"))
+            local_votes[table_key] = votes
+
+    neighbours: Dict[str, set] = defaultdict(set)
+    for table_key, references in relationships.items():
+        for reference in references:
+            target = f"{reference['to_schema']}.{reference['to_table']}"
+            if target != table_key:
+                neighbours[table_key].add(target)
+                neighbours[target].add(table_key)
+
+    result = {}
+    for table_key, votes in local_votes.items():
+        domain, confidence = _decide(votes)
+        result[table_key] = {
+            "domain": domain,
+            "confidence": confidence,
+            "confident": domain is not None and confidence >= threshold,
+            "evidence": [evidence for _, _, evidence in votes],
+        }
+
+    for _ in range(NEIGHBOUR_ROUNDS):
+        updates = {}
+        for table_key, entry in result.items():
+            if entry["confident"]:
+                continue
+            labels = Counter(
+                result[neighbour]["domain"] for neighbour in neighbours.get(table_key, ())
+                if neighbour in result and result[neighbour]["confident"]
+            )
+            if not labels:
+                continue
+            count = sum(labels.values())
+            # Few neighbours are weaker evidence than many
+            weight = NEIGHBOUR_WEIGHT * min(1.0, count / 3)
+            votes = local_votes[table_key] + [
+                (domain, weight * n / count, f"fk neighbours {n}/{count} {domain}")
+                for domain, n in labels.most_common()
+            ]
+            domain, confidence = _decide(votes)
+            updates[table_key] = {
+                "domain": domain,
+                "confidence": confidence,
+                "confident": confidence >= threshold,
+                "evidence": [evidence for _, _, evidence in votes],
+            }
+        if not updates:
+            break
+        result.update(updates)
+    return result
+
+
+def domain_relationships(
+    relationships: Dict[str, List[Dict[str, str]]],
+    mappings: Dict[str, str],
+    limit: int = 50
+) -> List[Dict[str, Any]]:
+    """Domain pairs ranked by the foreign keys that cross between them"""
+    counts: Counter = Counter()
+    for table_key, references in relationships.items():
+        for reference in references:
+            source = mappings.get(table_key)
+            target = mappings.get(f"{reference['to_schema']}.{reference['to_table']}")
+            if source and target and source != target:
+                counts[(source, target)] += 1
+    return [
+        {"from": source, "to": target, "foreign_keys": n}
+        for (source, target), n in counts.most_common(limit)
+    ]
+
+
+def merge_domain_analysis(
+    assignments: Dict[str, Dict[str, Any]],
+    llm_data: Optional[Dict[str, Any]],
+    relationships: Dict[str, List[Dict[str, str]]],
+    threshold: float = DEFAULT_CONFIDENCE
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Combine rule-based assignments with the LLM's answer for the other tables.
+
+    Args:
+        assignments (Dict[str, Dict[str, Any]]): Result of ``preclassify_domains``
+        llm_data (Optional[Dict[str, Any]]): The LLM's domain analysis of the
+            uncertain tables, None if it was not needed
+        relationships (Dict[str, List[Dict[str, str]]]): Foreign keys per table
+        threshold (float): Confidence threshold that was used
+
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, Any]]: The domain analysis, in the
+            shape of an LLM-only one (``domains``, ``table_mappings`` keyed
+            by ``SCHEMA.TABLE``, ``relationships``), and a report of where
+            each table's domain came from and why
+    """
+    llm_data = llm_data or {}
+    uncertain = [table_key for table_key, entry in assignments.items() if not entry["confident"]]
+    llm_domains = domain_lookup(llm_data, uncertain)
+
+    mappings = {}
+    sources = {}
+    for table_key, entry in assignments.items():
+        if entry["confident"]:
+            mappings[table_key], sources[table_key] = entry["domain"], "rules"
+        elif llm_domains.get(table_key, UNASSIGNED_DOMAIN) != UNASSIGNED_DOMAIN:
+            mappings[table_key], sources[table_key] = llm_domains[table_key], "llm"
+        elif entry["domain"]:
+            # The LLM was not asked or did not answer; keep the best guess
+            mappings[table_key], sources[table_key] = entry["domain"], "rules (low confidence)"
+
+    domains = list(llm_data.get("domains") or [])
+    named = {domain.get("name") if isinstance(domain, dict) else domain for domain in domains}
+    for domain in sorted(set(mappings.values()) - named):
+        domains.append({"name": domain} if domains and isinstance(domains[0], dict) else domain)
+
+    domain_data = {
+        **{key: value for key, value in llm_data.items() if key not in ("domains", "table_mappings")},
+        "domains": domains,
+        "table_mappings": mappings,
+        "relationships": llm_data.get("relationships") or domain_relationships(relationships, mappings),
+    }
+    source_counts = Counter(sources.get(table_key, "unassigned") for table_key in assignments)
+    report = {
+        "threshold": threshold,
+        "sources": dict(source_counts),
+        "tables": {
+            table_key: {
+                "domain": mappings.get(table_key),
+                "source": sources.get(table_key, "unassigned"),
+                "confidence": entry["confidence"],
+                "evidence": entry["evidence"],
+            }
+            for table_key, entry in assignments.items()
+        },
+    }
+    return domain_data, report
@@ -0,0 +1,310 @@
+import contextlib
+import contextvars
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class HedgeCancelled(Exception):
+    """Raised inside an attempt that lost the race and was told to stop"""
+    pass
+
+
+class LatencyTracker:
+    """Rolling window of recent request latencies per model"""
+
+    def __init__(self, window: int = 100):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, key: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def count(self, key: str) -> int:
+        with self._lock:
+            return len(self._samples.get(key, ()))
+
+    def percentile(self, key: str, p: float) -> Optional[float]:
+        """
+        Nearest-rank percentile of the window for a key.
+
+        Args:
+            key (str): Model name
+            p (float): Percentile as a fraction, e.g. 0.95
+
+        Returns:
+            Optional[float]: Latency in seconds, or None without samples
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(p * len(samples)))]
+
+
+class _Attempt:
+    """One launched request; ``started`` is set once it holds a concurrency slot"""
+
+    def __init__(self):
+        self.cancel = threading.Event()
+        self.ready = threading.Event()
+        self.started: Optional[float] = None
+
+
+class _Race:
+    """Shared state between query_llm and its in-flight attempts"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.decided = False
+        self.results: "queue.Queue[Tuple[str, Any, Optional[BaseException], float]]" = queue.Queue()
+
+
+class HedgingPolicy:
+    """
+    Send a duplicate request when an LLM call runs longer than usual.
+
+    The hedge fires once the primary attempt exceeds a rolling latency
+    percentile for its model. Whichever attempt succeeds first is used and
+    the other is told to cancel. Hedges are capped at a share of all
+    requests so a slow provider cannot double the bill.
+
+    Time spent waiting for a shared concurrency slot (``gate``) counts
+    neither toward the hedge delay nor toward the tracked latencies: the
+    clock of an attempt starts once it holds its slot, so a saturated queue
+    does not make every request look slow and trigger hedges that would
+    only lengthen it.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        percentile: float = 0.95,
+        budget: float = 0.1,
+        min_delay: float = 1.0,
+        default_delay: float = 30.0,
+        min_samples: int = 5,
+        window: int = 100
+    ):
+        """
+        Initialize the hedging policy.
+
+        Args:
+            enabled (bool): Whether to hedge at all
+            percentile (float): Latency percentile after which a hedge is sent
+            budget (float): Maximum hedges as a fraction of requests; at
+                least one hedge is always allowed
+            min_delay (float): Never hedge sooner than this many seconds
+            default_delay (float): Hedge delay while a model has fewer than
+                ``min_samples`` observations
+            min_samples (int): Observations needed before the percentile is used
+            window (int): Latencies kept per model
+        """
+        self.enabled = enabled
+        self.percentile = percentile
+        self.budget = budget
+        self.min_delay = min_delay
+        self.default_delay = default_delay
+        self.min_samples = min_samples
+        self.tracker = LatencyTracker(window)
+        self._lock = threading.Lock()
+        self.reset()
+
+    @classmethod
+    def from_env(cls) -> "HedgingPolicy":
+        """
+        Build the policy from LLM_HEDGING (on/off) and the LLM_HEDGE_* settings.
+
+        Returns:
+            HedgingPolicy: The configured policy
+        """
+        return cls(
+            enabled=os.getenv("LLM_HEDGING", "on").lower() not in ("off", "false", "0"),
+            percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95")),
+            budget=float(os.getenv("LLM_HEDGE_BUDGET", "0.1")),
+            min_delay=float(os.getenv("LLM_HEDGE_MIN_DELAY", "1.0")),
+            default_delay=float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "30.0"))
+        )
+
+    def reset(self) -> None:
+        with self._lock:
+            self.metrics = {
+                "requests": 0,
+                "hedges_sent": 0,
+                "hedge_wins": 0,
+                "primary_wins": 0,
+                "budget_denied": 0,
+                "losers_cancelled": 0
+            }
+
+    def hedge_delay(self, model: str) -> float:
+        """Seconds to wait on the primary attempt before hedging"""
+        if self.tracker.count(model) < self.min_samples:
+            return max(self.min_delay, self.default_delay)
+        return max(self.min_delay, self.tracker.percentile(model, self.percentile))
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.metrics[name] += 1
+
+    def _acquire_hedge(self) -> bool:
+        with self._lock:
+            allowed = max(1.0, self.budget * self.metrics["requests"])
+            if self.metrics["hedges_sent"] + 1 > allowed:
+                self.metrics["budget_denied"] += 1
+                return False
+            self.metrics["hedges_sent"] += 1
+            return True
+
+    def _launch(
+        self,
+        race: _Race,
+        role: str,
+        attempt: Callable[[Optional[threading.Event]], T],
+        on_discard: Optional[Callable[[T], None]],
+        gate: Any
+    ) -> _Attempt:
+        launched = _Attempt()
+        # Attempts run in the caller's context so usage_context attribution holds
+        context = contextvars.copy_context()
+
+        def target() -> None:
+            try:
+                with gate or contextlib.nullcontext():
+                    if launched.cancel.is_set():
+                        # Lost the race while still queued for a slot; never sent
+                        raise HedgeCancelled(f"{role} attempt cancelled before it was sent")
+                    launched.started = time.perf_counter()
+                    launched.ready.set()
+                    value = context.run(attempt, launched.cancel)
+                elapsed = time.perf_counter() - launched.started
+            except BaseException as e:
+                race.results.put((role, None, e, 0.0))
+                launched.ready.set()
+                return
+            with race.lock:
+                discarded = race.decided
+                if not discarded:
+                    race.results.put((role, value, None, elapsed))
+            if discarded and on_discard:
+                context.run(on_discard, value)
+
+        threading.Thread(target=target, name=f"llm-{role}", daemon=True).start()
+        return launched
+
+    def run(
+        self,
+        model: str,
+        attempt: Callable[[Optional[threading.Event]], T],
+        on_discard: Optional[Callable[[T], None]] = None,
+        gate: Any = None
+    ) -> Tuple[T, str]:
+        """
+        Run an LLM request with hedging.
+
+        Args:
+            model (str): Model the request goes to; latencies are tracked per model
+            attempt (Callable[[Optional[threading.Event]], T]): Performs one
+                request. It receives an event that is set when the attempt has
+                lost and should stop (raising HedgeCancelled), or None when
+                hedging is disabled.
+            on_discard (Optional[Callable[[T], None]]): Called with the result
+                of an attempt that completed after the race was decided, e.g.
+                to account for its tokens
+            gate (Any): Context manager (e.g. a semaphore) every attempt holds
+                while it runs, or None; its wait is not timed
+
+        Returns:
+            Tuple[T, str]: The first successful result and which attempt
+                produced it (``primary`` or ``hedge``)
+
+        Raises:
+            Exception: The primary's error when no attempt succeeds
+        """
+        if not self.enabled:
+            with gate or contextlib.nullcontext():
+                started = time.perf_counter()
+                value = attempt(None)
+                self.tracker.observe(model, time.perf_counter() - started)
+            return value, "primary"
+
+        self._count("requests")
+        race = _Race()
+        inflight = {"primary": self._launch(race, "primary", attempt, on_discard, gate)}
+        delay = self.hedge_delay(model)
+        hedge_considered = False
+        hedge_sent = False
+        first_error: Optional[BaseException] = None
+
+        while inflight:
+            wait = None
+            if not hedge_considered:
+                primary = inflight["primary"]
+                # The hedge clock starts once the primary holds its slot
+                primary.ready.wait()
+                if primary.started is not None:
+                    wait = max(0.0, primary.started + delay - time.perf_counter())
+            try:
+                role, value, error, elapsed = race.results.get(timeout=wait)
+            except queue.Empty:
+                hedge_considered = True
+                if self._acquire_hedge():
+                    hedge_sent = True
+                    inflight["hedge"] = self._launch(race, "hedge", attempt, on_discard, gate)
+                continue
+
+            del inflight[role]
+            if error is None:
+                self.tracker.observe(model, elapsed)
+                with race.lock:
+                    race.decided = True
+                    finished = []
+                    while not race.results.empty():
+                        finished.append(race.results.get_nowait())
+                for other, other_value, other_error, _ in finished:
+                    inflight.pop(other, None)
+                    if other_error is None and on_discard:
+                        on_discard(other_value)
+                for loser in inflight.values():
+                    loser.cancel.set()
+                    self._count("losers_cancelled")
+                    # The loser's latency is at least this long; record the
+                    # lower bound so slow calls still move the percentile.
+                    # A loser still queued for a slot was never sent.
+                    if loser.started is not None:
+                        self.tracker.observe(model, time.perf_counter() - loser.started)
+                if hedge_sent:
+                    self._count("hedge_wins" if role == "hedge" else "primary_wins")
+                return value, role
+
+            if isinstance(error, HedgeCancelled):
+                continue
+            if first_error is None:
+                first_error = error
+            if role == "primary" and not hedge_considered:
+                # Transport-level retries already happened inside the client;
+                # a hedge is for slow calls, not failed ones
+                break
+
+        raise first_error
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Hedging counters plus derived rates.
+
+        ``hedge_wins`` and ``primary_wins`` only count requests where a hedge
+        was sent.
+        """
+        with self._lock:
+            metrics = dict(self.metrics)
+        sent = metrics["hedges_sent"]
+        metrics["hedge_win_rate"] = metrics["hedge_wins"] / sent if sent else None
+        metrics["hedge_rate"] = sent / metrics["requests"] if metrics["requests"] else None
+        return metrics
@@ -0,0 +1,257 @@
+import heapq
+import json
+from collections import Counter, deque
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from run_manifest import atomic_write_json
+
+DEFAULT_HUBS = 20
+
+# An edge is one foreign key: (table with the FK, its column, referenced table, referenced column)
+Edge = Tuple[str, str, str, str]
+
+
+class JoinPlanner:
+    """
+    Join paths between tables over the foreign key graph.
+
+    Every foreign key is an edge that can be walked in either direction,
+    and parallel foreign keys between the same two tables (e.g. a claim's
+    PATIENTID and GUARANTORID) are separate edges, so alternative join
+    columns come back as separate paths. Shortest paths from the most
+    connected (hub) tables to every other table are precomputed and saved
+    with the run, so those lookups are a dictionary access; any other pair
+    is answered with a bidirectional breadth-first search, and k shortest
+    paths with Yen's algorithm.
+    """
+
+    def __init__(self, edges: List[Edge], hub_paths: Optional[Dict[str, Dict[str, List[int]]]] = None):
+        """
+        Initialize the planner.
+
+        Args:
+            edges (List[Edge]): Foreign keys of the catalog
+            hub_paths (Optional[Dict[str, Dict[str, List[int]]]]): Hub table
+                -> reachable table -> edge indexes of the shortest path
+        """
+        self.edges = [tuple(edge) for edge in edges]
+        self.hub_paths = hub_paths or {}
+        self.adjacency: Dict[str, List[Tuple[int, str]]] = {}
+        for index, (source, _, target, _) in enumerate(self.edges):
+            self.adjacency.setdefault(source, []).append((index, target))
+            self.adjacency.setdefault(target, []).append((index, source))
+        by_name: Dict[str, List[str]] = {}
+        for table in self.adjacency:
+            by_name.setdefault(table.split(".", 1)[-1], []).append(table)
+        self._by_name = by_name
+
+    @classmethod
+    def from_relationships(cls, relationships: Dict[str, List[Dict[str, str]]]) -> "JoinPlanner":
+        """Build the graph from the relationships found by the schema loader"""
+        edges = sorted(
+            (table_key, reference["from_column"],
+             f"{reference['to_schema']}.{reference['to_table']}", reference["to_column"])
+            for table_key, references in relationships.items()
+            for reference in references
+            # A self-reference (e.g. a parent ID) never shortens a join path
+            if f"{reference['to_schema']}.{reference['to_table']}" != table_key
+        )
+        return cls(edges)
+
+    @classmethod
+    def load(cls, path: Path) -> "JoinPlanner":
+        """Load a planner written by ``save``"""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["edges"], data["hub_paths"])
+
+    def save(self, path: Path) -> None:
+        atomic_write_json(path, {"edges": self.edges, "hub_paths": self.hub_paths})
+
+    def hubs(self, count: int = DEFAULT_HUBS) -> List[str]:
+        """The tables with the most foreign keys to or from them"""
+        degree = Counter({table: len(neighbours) for table, neighbours in self.adjacency.items()})
+        return [table for table, _ in sorted(degree.items(), key=lambda item: (-item[1], item[0]))[:count]]
+
+    def precompute_hubs(self, count: int = DEFAULT_HUBS) -> None:
+        """Store the shortest path from each of the top hubs to every reachable table"""
+        self.hub_paths = {}
+        for hub in self.hubs(count):
+            parents: Dict[str, Optional[Tuple[int, str]]] = {hub: None}
+            queue = deque([hub])
+            while queue:
+                table = queue.popleft()
+                for edge, neighbour in self.adjacency[table]:
+                    if neighbour not in parents:
+                        parents[neighbour] = (edge, table)
+                        queue.append(neighbour)
+            self.hub_paths[hub] = {table: self._walk(parents, table)[::-1] for table in parents}
+
+    def resolve(self, table: str) -> str:
+        """
+        Full ``SCHEMA.TABLE`` key for a table name.
+
+        Raises:
+            ValueError: If the table has no foreign keys, or a bare name
+                matches tables in several schemas
+        """
+        if table in self.adjacency:
+            return table
+        matches = self._by_name.get(table, [])
+        if len(matches) == 1:
+            return matches[0]
+        if matches:
+            raise ValueError(f"Table name {table} is ambiguous: {', '.join(sorted(matches))}")
+        raise ValueError(f"Table {table} has no foreign key relationships")
+
+    def _bfs(
+        self,
+        source: str,
+        target: str,
+        banned_nodes: Set[str],
+        banned_edges: Set[int]
+    ) -> Optional[List[int]]:
+        """
+        Edge indexes of a shortest path avoiding the banned nodes and edges.
+
+        Searches from both ends a level at a time, always growing the smaller
+        frontier, so hub tables with hundreds of neighbours are expanded
+        from one side at most.
+        """
+        if source == target:
+            return []
+        forward: Dict[str, Optional[Tuple[int, str]]] = {source: None}
+        backward: Dict[str, Optional[Tuple[int, str]]] = {target: None}
+        forward_frontier, backward_frontier = [source], [target]
+        while forward_frontier and backward_frontier:
+            growing_forward = len(forward_frontier) <= len(backward_frontier)
+            parents, others = (forward, backward) if growing_forward else (backward, forward)
+            frontier = forward_frontier if growing_forward else backward_frontier
+            next_frontier = []
+            meeting = None
+            for table in frontier:
+                for edge, neighbour in self.adjacency.get(table, ()):
+                    if neighbour in parents or neighbour in banned_nodes or edge in banned_edges:
+                        continue
+                    parents[neighbour] = (edge, table)
+                    next_frontier.append(neighbour)
+                    if neighbour in others and meeting is None:
+                        meeting = neighbour
+            if meeting is not None:
+                # Every node of the other frontier is at the same depth, so the
+                # first meeting found is a shortest path
+                return self._walk(forward, meeting)[::-1] + self._walk(backward, meeting)
+            if growing_forward:
+                forward_frontier = next_frontier
+            else:
+                backward_frontier = next_frontier
+        return None
+
+    @staticmethod
+    def _walk(parents: Dict[str, Optional[Tuple[int, str]]], table: str) -> List[int]:
+        """Edges from a table back to the root of a search"""
+        edges = []
+        while parents[table] is not None:
+            edge, table = parents[table]
+            edges.append(edge)
+        return edges
+
+    def _nodes(self, source: str, edges: List[int]) -> List[str]:
+        nodes = [source]
+        for edge in edges:
+            a, _, b, _ = self.edges[edge]
+            nodes.append(b if nodes[-1] == a else a)
+        return nodes
+
+    def _shortest(self, source: str, target: str) -> Optional[List[int]]:
+        if source in self.hub_paths:
+            return self.hub_paths[source].get(target)
+        if target in self.hub_paths:
+            edges = self.hub_paths[target].get(source)
+            return None if edges is None else edges[::-1]
+        return self._bfs(source, target, set(), set())
+
+    def describe(self, source: str, edges: List[int]) -> Dict[str, Any]:
+        """Tables, join conditions and a FROM/JOIN clause for a path"""
+        nodes = self._nodes(source, edges)
+        joins = []
+        for edge, (left, right) in zip(edges, zip(nodes, nodes[1:])):
+            fk_table, fk_column, ref_table, ref_column = self.edges[edge]
+            if left == fk_table:
+                joins.append({"from_table": left, "from_column": fk_column, "to_table": right, "to_column": ref_column})
+            else:
+                joins.append({"from_table": left, "from_column": ref_column, "to_table": right, "to_column": fk_column})
+        sql = [f"FROM {source}"] + [
+            f"JOIN {join['to_table']} ON {join['from_table']}.{join['from_column']} = "
+            f"{join['to_table']}.{join['to_column']}"
+            for join in joins
+        ]
+        return {"tables": nodes, "hops": len(joins), "joins": joins, "sql": "\n".join(sql)}
+
+    def shortest_path(self, source: str, target: str) -> Optional[Dict[str, Any]]:
+        """
+        One shortest join path, from the hub cache when either end is a hub.
+
+        Args:
+            source (str): ``SCHEMA.TABLE`` or a bare table name
+            target (str): ``SCHEMA.TABLE`` or a bare table name
+
+        Returns:
+            Optional[Dict[str, Any]]: The path, or None if the tables are not connected
+        """
+        source, target = self.resolve(source), self.resolve(target)
+        edges = self._shortest(source, target)
+        return None if edges is None else self.describe(source, edges)
+
+    def k_shortest_paths(
+        self,
+        source: str,
+        target: str,
+        k: int = 3,
+        max_hops: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        The k shortest join paths between two tables (Yen's algorithm).
+
+        Paths never visit a table twice; parallel foreign keys make distinct
+        paths. Ties are broken by the order of the tables and columns, so the
+        result is deterministic.
+
+        Args:
+            source (str): ``SCHEMA.TABLE`` or a bare table name
+            target (str): ``SCHEMA.TABLE`` or a bare table name
+            k (int): Number of paths
+            max_hops (Optional[int]): Drop paths with more joins than this
+
+        Returns:
+            List[Dict[str, Any]]: Paths, shortest first (see ``describe``)
+        """
+        source, target = self.resolve(source), self.resolve(target)
+        if source == target:
+            return [self.describe(source, [])]
+        first = self._shortest(source, target)
+        if first is None:
+            return []
+        found = [first]
+        candidates: List[Tuple[int, List[str], List[int]]] = []
+        seen = {tuple(first)}
+        while len(found) < k:
+            previous = found[-1]
+            previous_nodes = self._nodes(source, previous)
+            for spur_index in range(len(previous)):
+                root_edges = previous[:spur_index]
+                root_nodes = previous_nodes[:spur_index + 1]
+                banned_edges = {path[spur_index] for path in found if path[:spur_index] == root_edges}
+                spur = self._bfs(root_nodes[-1], target, set(root_nodes[:-1]), banned_edges)
+                if spur is None:
+                    continue
+                path = root_edges + spur
+                if tuple(path) not in seen:
+                    seen.add(tuple(path))
+                    heapq.heappush(candidates, (len(path), self._nodes(source, path), path))
+            if not candidates:
+                break
+            found.append(heapq.heappop(candidates)[2])
+        paths = [self.describe(source, edges) for edges in found]
+        return [path for path in paths if max_hops is None or path["hops"] <= max_hops]
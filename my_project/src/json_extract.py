@@ -0,0 +1,213 @@
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+# Scanner states jump straight to the next structurally interesting character,
+# so each byte of the response is visited once and skipped at C speed.
+_OPEN_PATTERN = re.compile(r'[\[{]')
+# A string literal is consumed in one match (unrolled-loop form, so it stays
+# linear); group 1 is empty when the text ends before the closing quote.
+_STRUCTURE_PATTERN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*("?)|[\[\]{}]', re.DOTALL)
+_TOKEN_BOUNDARIES = frozenset(' \t\r\n,:[]{}"')
+
+_CLOSERS = {'{': '}', '[': ']'}
+
+# How many times an unrepairable truncated span (usually a stray brace in
+# prose) is skipped to rescan the text after it
+_MAX_RESCANS = 3
+
+
+class JSONSpan:
+    """A bracket-balanced (or truncated) region of the scanned text"""
+
+    __slots__ = ('start', 'end', 'open_stack', 'in_string', 'escape')
+
+    def __init__(
+        self,
+        start: int,
+        end: int,
+        open_stack: Optional[List[str]] = None,
+        in_string: bool = False,
+        escape: bool = False
+    ):
+        self.start = start
+        self.end = end
+        # Non-empty only for a span cut off by the end of the text
+        self.open_stack = open_stack or []
+        self.in_string = in_string
+        self.escape = escape
+
+    @property
+    def truncated(self) -> bool:
+        return bool(self.open_stack)
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+
+def scan_json_spans(text: str, pos: int = 0) -> List[JSONSpan]:
+    """
+    Find every top-level balanced {...} or [...] region in a single pass.
+
+    String literals and escape sequences inside a candidate are honoured, so
+    brackets inside strings never affect nesting. A mismatched closing bracket
+    abandons the current candidate and scanning resumes at that position, which
+    keeps the whole scan O(n).
+
+    Args:
+        text (str): Text to scan, typically a raw LLM response
+        pos (int): Offset to start scanning from
+
+    Returns:
+        List[JSONSpan]: Non-overlapping candidate spans in text order. The last
+            span may be truncated if the text ends inside an open structure.
+    """
+    spans: List[JSONSpan] = []
+    length = len(text)
+
+    while pos < length:
+        match = _OPEN_PATTERN.search(text, pos)
+        if not match:
+            break
+
+        start = match.start()
+        stack = [text[start]]
+        pos = start + 1
+
+        while stack:
+            match = _STRUCTURE_PATTERN.search(text, pos)
+            if not match:
+                spans.append(JSONSpan(start, length, stack))
+                return spans
+
+            char = match.group()[0]
+            pos = match.end()
+            if char == '"':
+                if not match.group(1):
+                    # Ended inside a string; a trailing lone backslash means
+                    # the escape sequence itself was cut off
+                    escape = pos < length and text[pos] == '\\'
+                    spans.append(JSONSpan(start, length, stack, True, escape))
+                    return spans
+            elif char in _CLOSERS:
+                stack.append(char)
+            elif _CLOSERS[stack[-1]] == char:
+                stack.pop()
+            else:
+                # Mismatched bracket: this was prose, not JSON
+                break
+        else:
+            spans.append(JSONSpan(start, pos))
+
+    return spans
+
+
+def repair_truncated_json(fragment: str, span: JSONSpan) -> str:
+    """
+    Close a JSON fragment that was cut off mid-structure.
+
+    Handles the common ways a response gets truncated by a token limit: an
+    unterminated string, a dangling comma or colon, an object key without a
+    value and a partially written literal or number.
+
+    Args:
+        fragment (str): Text of a truncated span
+        span (JSONSpan): The span describing the fragment's open state
+
+    Returns:
+        str: A best-effort completed JSON document
+    """
+    text = fragment
+    if span.in_string:
+        if span.escape:
+            text = text[:-1]
+        text += '"'
+    else:
+        # Drop a partially written literal or number, keeping it if it is
+        # already complete; walking back touches only the token itself
+        text = text.rstrip()
+        index = len(text)
+        while index > 0 and text[index - 1] not in _TOKEN_BOUNDARIES:
+            index -= 1
+        if index < len(text):
+            try:
+                json.loads(text[index:])
+            except json.JSONDecodeError:
+                text = text[:index]
+
+    text = text.rstrip()
+    while text.endswith(','):
+        text = text[:-1].rstrip()
+
+    if text.endswith(':'):
+        text += 'null'
+    elif text.endswith('"') and span.open_stack[-1] == '{' and _is_object_key(text):
+        text += ':null'
+
+    closers = ''.join(_CLOSERS[char] for char in reversed(span.open_stack))
+    return text + closers
+
+
+def _is_object_key(text: str) -> bool:
+    """Check whether the string literal ending ``text`` sits in key position"""
+    index = len(text) - 2
+    while index >= 0:
+        if text[index] == '"':
+            backslashes = 0
+            probe = index - 1
+            while probe >= 0 and text[probe] == '\\':
+                backslashes += 1
+                probe -= 1
+            if backslashes % 2 == 0:
+                break
+        index -= 1
+    preceding = text[:max(index, 0)].rstrip()
+    return preceding.endswith(('{', ','))
+
+
+def extract_json(text: str, repair: bool = True) -> Any:
+    """
+    Extract the largest valid JSON object or array embedded in text.
+
+    Candidates come from a single linear scan; because top-level spans never
+    overlap, decoding them largest-first is also linear in the text length.
+    Rescans after an unrepairable truncated span are capped, so the bound
+    holds even for adversarial input.
+
+    Args:
+        text (str): Text that contains JSON, possibly wrapped in prose or
+            markdown code fences
+        repair (bool): Whether to attempt closing a truncated trailing structure
+
+    Returns:
+        Any: The decoded JSON object or array
+
+    Raises:
+        ValueError: If no valid JSON object or array can be found
+    """
+    offset = 0
+    for _ in range(_MAX_RESCANS + 1):
+        spans = scan_json_spans(text, offset)
+        candidates: List[Tuple[int, str]] = []
+        for span in spans:
+            fragment = text[span.start:span.end]
+            if span.truncated:
+                if not repair:
+                    continue
+                fragment = repair_truncated_json(fragment, span)
+            candidates.append((len(span), fragment))
+
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+        for _, fragment in candidates:
+            try:
+                return json.loads(fragment)
+            except json.JSONDecodeError:
+                continue
+
+        # A truncated span that cannot be repaired may be an unclosed bracket
+        # in prose swallowing the real JSON; rescan just past its opener
+        if not spans or not spans[-1].truncated:
+            break
+        offset = spans[-1].start + 1
+
+    raise ValueError("Could not find valid JSON in response: No JSON object or array found")
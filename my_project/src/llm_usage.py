@@ -0,0 +1,249 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from run_manifest import atomic_write_json
+
+# USD per million tokens as (prompt, completion, cached prompt); override or
+# extend with a JSON file named by LLM_PRICING_FILE, e.g.
+# {"vendor/model": [0.5, 1.5, 0.05]}. Without a cached price, cached prompt
+# tokens are billed at the prompt price.
+DEFAULT_PRICING: Dict[str, Tuple[float, ...]] = {
+    "anthropic/claude-2": (8.0, 24.0, 0.8),
+    "anthropic/claude-3-haiku": (0.25, 1.25, 0.03),
+    "anthropic/claude-3.5-sonnet": (3.0, 15.0, 0.30),
+    "openai/gpt-4o-mini": (0.15, 0.60, 0.075),
+}
+
+# Rough characters-per-token ratio used when a provider omits usage data
+CHARS_PER_TOKEN = 4
+
+_context: ContextVar[Dict[str, Optional[str]]] = ContextVar(
+    "llm_usage_context", default={"stage": None, "artifact": None}
+)
+
+
+@contextmanager
+def usage_context(stage: Optional[str] = None, artifact: Optional[str] = None) -> Iterator[None]:
+    """
+    Attribute LLM calls made inside the block to a pipeline stage and artifact.
+
+    Args:
+        stage (Optional[str]): Pipeline stage, e.g. ``domain_analysis``
+        artifact (Optional[str]): Artifact name, e.g. ``Patient Domain``
+    """
+    current = _context.get()
+    token = _context.set({
+        "stage": stage or current["stage"],
+        "artifact": artifact or current["artifact"]
+    })
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def current_usage_context() -> Dict[str, Optional[str]]:
+    """Stage and artifact the current LLM call is attributed to"""
+    return dict(_context.get())
+
+
+def load_pricing() -> Dict[str, Tuple[float, ...]]:
+    """
+    Get the model price table, applying LLM_PRICING_FILE overrides.
+
+    Returns:
+        Dict[str, Tuple[float, ...]]: Prompt, completion and (optionally)
+            cached prompt USD per million tokens
+    """
+    pricing = dict(DEFAULT_PRICING)
+    pricing_file = os.getenv("LLM_PRICING_FILE")
+    if pricing_file:
+        with open(pricing_file, encoding="utf-8") as f:
+            pricing.update({model: tuple(prices) for model, prices in json.load(f).items()})
+    return pricing
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count for text when the API reports none"""
+    return max(1, len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+class UsageLedger:
+    """
+    Per-call record of tokens, latency and estimated cost for a run.
+
+    Every ``query_llm`` call adds one record tagged with the active
+    ``usage_context``; summaries aggregate the records per stage, artifact
+    and model.
+    """
+
+    def __init__(self, pricing: Optional[Dict[str, Tuple[float, ...]]] = None):
+        self._pricing = pricing
+        self.records: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def pricing(self) -> Dict[str, Tuple[float, ...]]:
+        # Loaded on first use so LLM_PRICING_FILE from .env is honoured
+        if self._pricing is None:
+            self._pricing = load_pricing()
+        return self._pricing
+
+    def estimate_cost(
+        self, model: str, prompt_tokens: int, completion_tokens: int, cached_prompt_tokens: int = 0
+    ) -> Optional[float]:
+        """
+        Estimate the USD cost of a call.
+
+        Args:
+            model (str): Model that served the call
+            prompt_tokens (int): Prompt tokens, including the cached ones
+            completion_tokens (int): Completion tokens
+            cached_prompt_tokens (int): Prompt tokens read from the
+                provider's prompt cache, billed at the cached price
+
+        Returns:
+            Optional[float]: Cost, or None when the model has no known price
+        """
+        prices = self.pricing.get(model)
+        if prices is None:
+            return None
+        cached_price = prices[2] if len(prices) > 2 else prices[0]
+        cached = min(cached_prompt_tokens, prompt_tokens)
+        return (
+            (prompt_tokens - cached) * prices[0] + cached * cached_price + completion_tokens * prices[1]
+        ) / 1_000_000
+
+    def record(
+        self,
+        model: str,
+        task: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        latency: float,
+        estimated: bool = False,
+        **extra: Any
+    ) -> Dict[str, Any]:
+        """
+        Add one LLM call to the ledger.
+
+        Args:
+            model (str): Model that served the call
+            task (str): Routing task type of the call
+            prompt_tokens (int): Prompt tokens billed
+            completion_tokens (int): Completion tokens billed
+            latency (float): Wall-clock seconds of the call
+            estimated (bool): Whether token counts are estimates rather than
+                provider-reported usage
+            **extra: Additional attributes stored with the record
+
+        Returns:
+            Dict[str, Any]: The stored record
+        """
+        record = {
+            **current_usage_context(),
+            "model": model,
+            "task": task,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "latency": latency,
+            "cost": self.estimate_cost(
+                model, prompt_tokens, completion_tokens, extra.get("cached_prompt_tokens") or 0
+            ),
+            "estimated_tokens": estimated,
+            **extra
+        }
+        with self._lock:
+            self.records.append(record)
+        return record
+
+    def aggregate(self, key: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Total calls, tokens, latency and cost grouped by a record field.
+
+        Args:
+            key (str): ``stage``, ``artifact``, ``model`` or ``task``
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Totals per group value
+        """
+        groups: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            records = list(self.records)
+        for record in records:
+            name = record.get(key) or "(none)"
+            group = groups.setdefault(name, {
+                "calls": 0, "prompt_tokens": 0, "cached_prompt_tokens": 0, "completion_tokens": 0,
+                "latency": 0.0, "max_latency": 0.0, "cost": 0.0, "unpriced_calls": 0
+            })
+            group["calls"] += 1
+            group["prompt_tokens"] += record["prompt_tokens"]
+            group["cached_prompt_tokens"] += record.get("cached_prompt_tokens", 0)
+            group["completion_tokens"] += record["completion_tokens"]
+            group["latency"] += record["latency"]
+            group["max_latency"] = max(group["max_latency"], record["latency"])
+            if record["cost"] is None:
+                group["unpriced_calls"] += 1
+            else:
+                group["cost"] += record["cost"]
+        return groups
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Build the run-level usage report.
+
+        Returns:
+            Dict[str, Any]: Totals plus breakdowns by stage, artifact and model
+        """
+        totals = self.aggregate("task")
+        return {
+            "totals": {
+                field: sum(group[field] for group in totals.values())
+                for field in (
+                    "calls", "prompt_tokens", "cached_prompt_tokens", "completion_tokens",
+                    "latency", "cost", "unpriced_calls"
+                )
+            },
+            "by_stage": self.aggregate("stage"),
+            "by_artifact": self.aggregate("artifact"),
+            "by_model": self.aggregate("model"),
+            "calls": list(self.records)
+        }
+
+    def format_summary(self) -> str:
+        """
+        Render per-stage and per-model usage as a text table.
+
+        Returns:
+            str: The formatted table
+        """
+        lines = [
+            f"{'group':<40} {'calls':>6} {'prompt tok':>11} {'cached':>9} {'uncached':>9} "
+            f"{'compl tok':>10} {'latency s':>10} {'cost $':>9}"
+        ]
+        for label, key in (("stage", "stage"), ("artifact", "artifact"), ("model", "model")):
+            for name, group in sorted(self.aggregate(key).items()):
+                lines.append(
+                    f"{(label + ': ' + name)[:40]:<40} {group['calls']:>6} {group['prompt_tokens']:>11} "
+                    f"{group['cached_prompt_tokens']:>9} "
+                    f"{group['prompt_tokens'] - group['cached_prompt_tokens']:>9} "
+                    f"{group['completion_tokens']:>10} {group['latency']:>10.2f} {group['cost']:>9.4f}"
+                )
+        return "\n".join(lines)
+
+    def save(self, path: Path) -> None:
+        """Write the usage summary as JSON"""
+        atomic_write_json(path, self.summary())
+
+    def reset(self) -> None:
+        with self._lock:
+            self.records = []
+
+
+# Process-wide ledger that query_llm records into
+usage_ledger = UsageLedger()
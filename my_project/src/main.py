@@ -1,26 +1,45 @@
+import argparse
 import json
+import os
 from pathlib import Path
-from typing import Dict, Any
+from typing import Callable, Dict, Any, List, Optional, Sequence
 import sys
 import traceback
 
-from schema_loader import load_schema_data, analyze_relationships, get_table_statistics
+from schema_loader import load_schema_data_parallel, analyze_relationships, get_table_statistics, stream_schema_data
 from prompt_utils import (
+    hedging,
     log_activity,
     query_llm,
     save_intermediate_result,
     generate_domain_classification_prompt,
-    generate_relationship_analysis_prompt,
+    generate_pattern_narration_prompt,
     parse_llm_json_response
 )
-from diagram_generator import DiagramGenerator
+from catalog_diff import write_artifact_scopes
+from catalog_store import load_processed_data
+from catalog_stats import compute_catalog_statistics
+from join_paths import DEFAULT_HUBS, JoinPlanner
+from domain_rules import DEFAULT_CONFIDENCE, load_table_metadata, merge_domain_analysis, preclassify_domains
+from diagram_generator import ARTIFACTS, SCHEMA_ARTIFACTS, DiagramGenerator
+from llm_usage import usage_context, usage_ledger
+from activity_log import set_default_log_file
+from run_manifest import RunManifest, file_digest
+from run_paths import LATEST, RunInProgressError, RunPaths, open_run
+from schema_patterns import DEFAULT_KEY_PATHS, analyze_structure
+from tracing import span, tracer
+from vector_index import SearchIndex
 
-def process_schema_metadata(data_dir: Path = Path("data")) -> Dict[str, Any]:
+def process_schema_metadata(
+    data_dir: Path = Path("data"),
+    intermediate_dir: Path = Path("outputs/intermediate")
+) -> Dict[str, Any]:
     """
     Process the schema metadata from CSV files.
     
     Args:
         data_dir (Path): Directory containing the CSV files
+        intermediate_dir (Path): Directory for the processed data
         
     Returns:
         Dict[str, Any]: Processed schema data
@@ -43,19 +62,39 @@ def process_schema_metadata(data_dir: Path = Path("data")) -> Dict[str, Any]:
     
     # Load schema data
     print("📊 Loading schema data from CSV files...")
-    schema_data = load_schema_data(tables_path, columns_path)
+    # CATALOG_STORE=on streams the catalog into a SQLite file next to the
+    # processed data rather than holding it in memory; later stages read it
+    # through a dict-like view
+    catalog_store = intermediate_dir / "catalog_store.db"
+    out_of_core = os.getenv("CATALOG_STORE", "off").lower() in ("on", "true", "1")
+    with span("load_schema_data") as load_span:
+        if out_of_core:
+            intermediate_dir.mkdir(parents=True, exist_ok=True)
+            schema_data = stream_schema_data(tables_path, columns_path, catalog_store)
+        else:
+            # Large exports are parsed in parallel; SCHEMA_LOAD_WORKERS=1 forces the serial loader
+            workers = int(os.getenv("SCHEMA_LOAD_WORKERS", "0")) or None
+            schema_data = load_schema_data_parallel(tables_path, columns_path, workers)
+        load_span.set(
+            bytes=tables_path.stat().st_size + columns_path.stat().st_size,
+            rows=sum(len(tables) for tables in schema_data.values())
+        )
     print(f"✅ Loaded data for {len(schema_data)} schemas")
     log_activity("Loaded schema data from CSV files")
     
     # Analyze relationships
     print("🔗 Analyzing table relationships...")
-    relationships = analyze_relationships(schema_data)
+    with span("analyze_relationships") as relationships_span:
+        relationships = analyze_relationships(schema_data)
+        relationships_span.set(rows=len(relationships))
     print(f"✅ Found relationships for {len(relationships)} tables")
     log_activity("Analyzed table relationships")
     
     # Get table statistics
     print("📈 Generating table statistics...")
-    statistics = get_table_statistics(schema_data)
+    with span("get_table_statistics") as statistics_span:
+        statistics = get_table_statistics(schema_data)
+        statistics_span.set(rows=len(statistics))
     print(f"✅ Generated statistics for {len(statistics)} tables")
     log_activity("Generated table statistics")
     
@@ -63,11 +102,17 @@ def process_schema_metadata(data_dir: Path = Path("data")) -> Dict[str, Any]:
     print("💾 Saving processed data...")
     save_intermediate_result(
         {
-            "schema_data": schema_data,
+            # The store is referenced rather than copied into the JSON; its hash
+            # lets readers detect a store that changed after this file was written
+            **({
+                "catalog_store": catalog_store.name,
+                "catalog_store_sha256": file_digest(catalog_store)
+            } if out_of_core else {"schema_data": schema_data}),
             "relationships": relationships,
             "statistics": statistics
         },
-        "processed_schema_data.json"
+        "processed_schema_data.json",
+        intermediate_dir
     )
     print("✅ Saved processed data")
     
@@ -77,12 +122,24 @@ def process_schema_metadata(data_dir: Path = Path("data")) -> Dict[str, Any]:
         "statistics": statistics
     }
 
-def analyze_domains(processed_data: Dict[str, Any]) -> Dict[str, Any]:
+def analyze_domains(
+    processed_data: Dict[str, Any],
+    intermediate_dir: Path = Path("outputs/intermediate"),
+    table_metadata: Optional[Dict[str, Dict[str, str]]] = None
+) -> Dict[str, Any]:
     """
-    Analyze and classify domains using LLM.
+    Analyze and classify domains.
+    
+    Tables are first classified locally from their names, export CATEGORY
+    and DataModel and their foreign key neighbours; only the tables below
+    DOMAIN_RULE_CONFIDENCE (default 0.7) are sent to the LLM, and the LLM
+    is not called at all when every table is confident.
     
     Args:
         processed_data (Dict[str, Any]): Processed schema data
+        intermediate_dir (Path): Directory for the analysis results
+        table_metadata (Optional[Dict[str, Dict[str, str]]]): CATEGORY and
+            DataModel per table, from the table descriptions export
         
     Returns:
         Dict[str, Any]: Domain classification results
@@ -90,39 +147,185 @@ def analyze_domains(processed_data: Dict[str, Any]) -> Dict[str, Any]:
     print("\n🧠 Starting domain analysis...")
     log_activity("Starting domain analysis")
     
-    # Generate and send prompt for domain classification
-    print("📝 Generating domain classification prompt...")
-    prompt = generate_domain_classification_prompt(processed_data)
-    print("🤖 Querying LLM for domain classification...")
-    try:
-        response = query_llm(prompt)
-        print("✅ Received LLM response")
-    except Exception as e:
-        print(f"❌ LLM query failed: {str(e)}")
-        raise
+    # Classify what the names and metadata make obvious without the LLM
+    threshold = float(os.getenv("DOMAIN_RULE_CONFIDENCE", str(DEFAULT_CONFIDENCE)))
+    with span("preclassify_domains") as rules_span:
+        assignments = preclassify_domains(
+            processed_data["schema_data"], processed_data["relationships"], table_metadata, threshold
+        )
+        uncertain = [table_key for table_key, entry in assignments.items() if not entry["confident"]]
+        rules_span.set(rows=len(assignments), uncertain=len(uncertain))
+    print(f"🧮 Classified {len(assignments) - len(uncertain)}/{len(assignments)} tables from names, "
+          f"metadata and foreign keys")
+    log_activity("Pre-classified domains", tables=len(assignments), uncertain=len(uncertain))
     
-    # Parse and save results
+    domain_data = None
+    if uncertain:
+        # Generate and send prompt for domain classification
+        print(f"📝 Generating domain classification prompt for {len(uncertain)} tables...")
+        known_domains: Dict[str, List[str]] = {}
+        for table_key, entry in assignments.items():
+            if entry["confident"] and len(known_domains.setdefault(entry["domain"], [])) < 10:
+                known_domains[entry["domain"]].append(table_key)
+        with span("prompt.domain_classification") as prompt_span:
+            if len(uncertain) == len(assignments):
+                prompt = generate_domain_classification_prompt(processed_data)
+            else:
+                prompt = generate_domain_classification_prompt(processed_data, uncertain, known_domains)
+            prompt_span.set(prompt_chars=len(prompt))
+        print("🤖 Querying LLM for domain classification...")
+        try:
+            with usage_context(stage="domain_analysis"):
+                response = query_llm(prompt, task="classification")
+            print("✅ Received LLM response")
+        except Exception as e:
+            print(f"❌ LLM query failed: {str(e)}")
+            raise
+        
+        try:
+            domain_data = parse_llm_json_response(response)
+        except ValueError as e:
+            print(f"❌ Failed to parse LLM response: {str(e)}")
+            raise
+    else:
+        print("⏭️  All tables classified locally; skipping the LLM")
+    
+    # Merge and save results
     print("📊 Processing domain analysis results...")
-    try:
-        domain_data = parse_llm_json_response(response)
-        save_intermediate_result(domain_data, "domain_analysis.json")
-        print("✅ Saved domain analysis results")
-    except ValueError as e:
-        print(f"❌ Failed to parse LLM response: {str(e)}")
-        raise
+    domain_data, report = merge_domain_analysis(assignments, domain_data, processed_data["relationships"], threshold)
+    save_intermediate_result(report, "domain_classification.json", intermediate_dir)
+    save_intermediate_result(domain_data, "domain_analysis.json", intermediate_dir)
+    print(f"✅ Saved domain analysis results ({report['sources'].get('rules', 0)} by rules, "
+          f"{report['sources'].get('llm', 0)} by the LLM)")
     
     return domain_data
 
+def domain_inputs(paths: RunPaths) -> List[Path]:
+    """Files the domain analysis is built from"""
+    return [paths.processed, paths.table_descriptions]
+
+def run_domain_analysis(manifest: RunManifest, paths: RunPaths, processed_data: Dict[str, Any]) -> Dict[str, Any]:
+    """The run's domain analysis, redone if its inputs changed"""
+    return run_stage(
+        manifest, "analyze_domains", paths.domain, domain_inputs(paths),
+        lambda: analyze_domains(processed_data, paths.intermediate_dir, load_table_metadata(paths.table_descriptions))
+    )
+
+def compute_statistics(
+    processed_data: Dict[str, Any],
+    domain_data: Optional[Dict[str, Any]] = None,
+    intermediate_dir: Path = Path("outputs/intermediate")
+) -> Dict[str, Any]:
+    """
+    Compute the extended catalog statistics and save them.
+    
+    Args:
+        processed_data (Dict[str, Any]): Processed schema data
+        domain_data (Optional[Dict[str, Any]]): Domain classification data
+            for the per-domain rollups
+        intermediate_dir (Path): Directory for the statistics
+        
+    Returns:
+        Dict[str, Any]: Catalog statistics (see catalog_stats.compute_catalog_statistics)
+    """
+    print("\n📐 Computing catalog statistics...")
+    with span("compute_catalog_statistics") as stats_span:
+        statistics = compute_catalog_statistics(processed_data["schema_data"], domain_data)
+        stats_span.set(rows=statistics["totals"]["columns"])
+    save_intermediate_result(statistics, "catalog_statistics.json", intermediate_dir)
+    totals = statistics["totals"]
+    print(
+        f"✅ Computed statistics for {totals['tables']} tables in {len(statistics['domains'])} domains "
+        f"({totals['description_coverage']:.0%} of columns described)"
+    )
+    log_activity("Computed catalog statistics", **totals)
+    return statistics
+
+def build_search_index(processed_data: Dict[str, Any], index_path: Path) -> SearchIndex:
+    """
+    Build and save the offline search index over table and column descriptions.
+    
+    Args:
+        processed_data (Dict[str, Any]): Processed schema data
+        index_path (Path): Where to save the index
+        
+    Returns:
+        SearchIndex: The index
+    """
+    print("\n🔎 Building catalog search index...")
+    with span("build_search_index") as index_span:
+        index = SearchIndex.build(processed_data["schema_data"])
+        index.save(index_path)
+        index_span.set(rows=len(index))
+    print(f"✅ Indexed {len(index)} tables and columns")
+    log_activity("Built catalog search index", documents=len(index))
+    return index
+
+def load_search_index(manifest: RunManifest, paths: RunPaths, processed_data: Dict[str, Any]) -> SearchIndex:
+    """The run's search index, rebuilt if the processed data changed"""
+    return run_stage(
+        manifest, "build_search_index", paths.search_index, [paths.processed],
+        lambda: build_search_index(processed_data, paths.search_index),
+        load=SearchIndex.load
+    )
+
+def plan_join_paths(processed_data: Dict[str, Any], join_paths_path: Path) -> JoinPlanner:
+    """
+    Build the foreign key join graph and precompute shortest paths from its hubs.
+    
+    Args:
+        processed_data (Dict[str, Any]): Processed schema data
+        join_paths_path (Path): Where to save the graph and hub paths
+        
+    Returns:
+        JoinPlanner: The planner
+    """
+    print("\n🧭 Precomputing join paths...")
+    hubs = int(os.getenv("JOIN_PATH_HUBS", str(DEFAULT_HUBS)))
+    with span("plan_join_paths") as plan_span:
+        planner = JoinPlanner.from_relationships(processed_data["relationships"])
+        planner.precompute_hubs(hubs)
+        planner.save(join_paths_path)
+        plan_span.set(rows=len(planner.edges))
+    print(f"✅ Precomputed join paths from {len(planner.hub_paths)} hub tables over {len(planner.edges)} foreign keys")
+    log_activity("Precomputed join paths", hubs=len(planner.hub_paths), foreign_keys=len(planner.edges))
+    return planner
+
+def load_join_paths(manifest: RunManifest, paths: RunPaths, processed_data: Dict[str, Any]) -> JoinPlanner:
+    """The run's join planner, rebuilt if the processed data changed"""
+    return run_stage(
+        manifest, "plan_join_paths", paths.join_paths, [paths.processed],
+        lambda: plan_join_paths(processed_data, paths.join_paths),
+        load=JoinPlanner.load
+    )
+
 def analyze_data_patterns(
     processed_data: Dict[str, Any],
-    domain_data: Dict[str, Any]
+    domain_data: Dict[str, Any],
+    intermediate_dir: Path = Path("outputs/intermediate"),
+    statistics: Optional[Dict[str, Any]] = None,
+    join_planner: Optional[JoinPlanner] = None,
+    narrate: Optional[bool] = None
 ) -> Dict[str, Any]:
     """
-    Analyze data patterns and relationships using LLM.
+    Analyze data patterns and relationships from the catalog's keys.
+    
+    One-to-many relationships, hierarchies, dependency layers, cycles and
+    key join paths are computed locally (see schema_patterns). With
+    PATTERN_NARRATION=on a small LLM call adds a written summary of the
+    findings under ``narrative``.
     
     Args:
         processed_data (Dict[str, Any]): Processed schema data
-        domain_data (Dict[str, Any]): Domain classification data
+        domain_data (Dict[str, Any]): Domain classification data, given to
+            the narration
+        intermediate_dir (Path): Directory for the analysis results
+        statistics (Optional[Dict[str, Any]]): Catalog statistics summarized
+            into the narration prompt
+        join_planner (Optional[JoinPlanner]): Planner whose hub paths the key
+            paths are counted on, built from the relationships if not given
+        narrate (Optional[bool]): Ask the LLM for a narrative, defaults to
+            PATTERN_NARRATION
         
     Returns:
         Dict[str, Any]: Pattern analysis results
@@ -130,116 +333,369 @@ def analyze_data_patterns(
     print("\n📊 Starting pattern analysis...")
     log_activity("Starting pattern analysis")
     
-    # Combine schema and domain data for context
-    context_data = {
-        "schema": processed_data,
-        "domains": domain_data
-    }
+    with span("analyze_structure") as structure_span:
+        key_paths = int(os.getenv("PATTERN_KEY_PATHS", str(DEFAULT_KEY_PATHS)))
+        pattern_data = analyze_structure(
+            processed_data["schema_data"], processed_data["relationships"], join_planner, key_paths
+        )
+        structure_span.set(rows=pattern_data["summary"]["tables"])
+    summary = pattern_data["summary"]
+    print(f"✅ Found {summary['one_to_many']} one-to-many relationships, {summary['hierarchies']} hierarchies, "
+          f"{summary['cycles']} cycles and {len(pattern_data['key_paths'])} key paths "
+          f"(dependency depth {summary['max_depth']})")
+    log_activity("Analyzed schema structure", **summary)
     
-    # Generate and send prompt for relationship analysis
-    print("📝 Generating relationship analysis prompt...")
-    prompt = generate_relationship_analysis_prompt(context_data)
-    print("🤖 Querying LLM for pattern analysis...")
-    try:
-        response = query_llm(prompt)
-        print("✅ Received LLM response")
-    except Exception as e:
-        print(f"❌ LLM query failed: {str(e)}")
-        raise
+    if narrate is None:
+        narrate = os.getenv("PATTERN_NARRATION", "off").lower() in ("on", "true", "1")
+    if narrate:
+        print("🤖 Querying LLM for a pattern narrative...")
+        with span("prompt.pattern_narration") as prompt_span:
+            prompt = generate_pattern_narration_prompt(pattern_data, domain_data, statistics)
+            prompt_span.set(prompt_chars=len(prompt))
+        try:
+            with usage_context(stage="pattern_analysis"):
+                pattern_data["narrative"] = query_llm(prompt, task="analysis").strip()
+            print("✅ Received LLM response")
+        except Exception as e:
+            # The narrative only describes the computed patterns; keep them without it
+            print(f"⚠️  Pattern narration failed: {str(e)}")
+            log_activity("Pattern narration failed", level="WARNING", error=str(e))
     
-    # Parse and save results
-    print("📊 Processing pattern analysis results...")
-    try:
-        pattern_data = parse_llm_json_response(response)
-        save_intermediate_result(pattern_data, "pattern_analysis.json")
-        print("✅ Saved pattern analysis results")
-    except ValueError as e:
-        print(f"❌ Failed to parse LLM response: {str(e)}")
-        raise
+    save_intermediate_result(pattern_data, "pattern_analysis.json", intermediate_dir)
+    print("✅ Saved pattern analysis results")
     
     return pattern_data
 
+def pattern_inputs(paths: RunPaths) -> List[Path]:
+    """Files the pattern analysis is built from"""
+    return [paths.processed, paths.join_paths, paths.domain, paths.statistics]
+
+def artifact_inputs(key: str, paths: RunPaths) -> List[Path]:
+    """
+    Intermediate files an artifact is generated from.
+    
+    Schema-based artifacts depend on the fingerprint of the tables they
+    depict rather than on the whole catalog, so a new release regenerates
+    only the artifacts its changes touch.
+    """
+    return [paths.domain] if key == "ecosystem_overview" else [paths.artifact_scope(key)]
+
 def generate_artifacts(
     processed_data: Dict[str, Any],
     domain_data: Dict[str, Any],
-    pattern_data: Dict[str, Any]
+    pattern_data: Dict[str, Any],
+    batch_size: Optional[int] = None,
+    manifest: Optional[RunManifest] = None,
+    paths: Optional[RunPaths] = None,
+    search_index: Optional[SearchIndex] = None,
+    join_planner: Optional[JoinPlanner] = None
 ) -> None:
     """
     Generate all visual artifacts using the diagram generator.
     
+    Artifacts the manifest shows as complete, with unchanged inputs and
+    intact files, are skipped. The inputs of a schema-based artifact are the
+    tables in its scope (see ``catalog_diff.ARTIFACT_SCOPES``).
+    
     Args:
         processed_data (Dict[str, Any]): Processed schema data
         domain_data (Dict[str, Any]): Domain classification data
         pattern_data (Dict[str, Any]): Pattern analysis data
+        batch_size (Optional[int]): When set, the schema-based artifacts are
+            requested this many at a time with one shared schema upload per
+            request instead of one call each
+        manifest (Optional[RunManifest]): Run manifest recording the state
+            of every artifact
+        paths (Optional[RunPaths]): Run layout, defaults to outputs/
+        search_index (Optional[SearchIndex]): Catalog search index used to
+            name the most relevant tables in each schema prompt
+        join_planner (Optional[JoinPlanner]): Join paths given to the
+            path diagrams as their join conditions
     """
     print("\n🎨 Starting artifact generation...")
     log_activity("Starting artifact generation")
+    paths = paths or RunPaths()
+    manifest = manifest or RunManifest.open(paths.manifest)
     
     try:
-        generator = DiagramGenerator()
+        generator = DiagramGenerator(paths.final_dir, search_index=search_index, join_planner=join_planner)
+        schema_data = processed_data["schema_data"]
+        write_artifact_scopes(schema_data, domain_data, paths.scopes_dir)
         
         # Generate artifacts in sequence with progress tracking
         artifacts = [
-            ("Ecosystem Overview", lambda: generator.generate_ecosystem_overview(domain_data)),
-            ("Patient Domain", lambda: generator.generate_patient_domain(processed_data["schema_data"])),
-            ("Encounters Domain", lambda: generator.generate_encounters_domain(processed_data["schema_data"])),
-            ("Clinical Documentation", lambda: generator.generate_clinical_documentation(processed_data["schema_data"])),
-            ("Billing Domain", lambda: generator.generate_billing_domain(processed_data["schema_data"])),
-            ("Patient-Encounter Path", lambda: generator.generate_patient_encounter_path(processed_data["schema_data"])),
-            ("Claim-Payment Path", lambda: generator.generate_claim_payment_path(processed_data["schema_data"])),
-            ("Audit & Quality", lambda: generator.generate_audit_quality(processed_data["schema_data"])),
-            ("Patient Timeline", lambda: generator.generate_patient_timeline(processed_data["schema_data"])),
-            ("Relationship Heatmap", lambda: generator.generate_relationship_heatmap(processed_data["schema_data"]))
+            ("ecosystem_overview", lambda: generator.generate_ecosystem_overview(domain_data)),
+            ("patient_domain", lambda: generator.generate_patient_domain(schema_data)),
+            ("encounters_domain", lambda: generator.generate_encounters_domain(schema_data)),
+            ("clinical_documentation", lambda: generator.generate_clinical_documentation(schema_data)),
+            ("billing_domain", lambda: generator.generate_billing_domain(schema_data)),
+            ("patient_encounter_path", lambda: generator.generate_patient_encounter_path(schema_data)),
+            ("claim_payment_path", lambda: generator.generate_claim_payment_path(schema_data)),
+            ("audit_quality", lambda: generator.generate_audit_quality(schema_data)),
+            ("patient_timeline", lambda: generator.generate_patient_timeline(schema_data)),
+            ("relationship_heatmap", lambda: generator.generate_relationship_heatmap(schema_data))
         ]
+        if batch_size:
+            # Only the overview is built from domain data; the rest are batched
+            artifacts = artifacts[:1]
         
-        for i, (name, generator_func) in enumerate(artifacts, 1):
+        for i, (key, generator_func) in enumerate(artifacts, 1):
+            name = ARTIFACTS[key]["name"]
+            if manifest.is_complete("artifacts", key, artifact_inputs(key, paths)):
+                print(f"\n⏭️  Skipping {name} ({i}/10): already generated")
+                continue
             try:
                 print(f"\n📊 Generating {name} ({i}/10)...")
-                generator_func()
+                manifest.start("artifacts", key)
+                with span("artifact", artifact=name), usage_context(stage="artifacts", artifact=name):
+                    generator_func()
+                manifest.complete(
+                    "artifacts", key, [generator.output_dir / ARTIFACTS[key]["filename"]], artifact_inputs(key, paths)
+                )
                 print(f"✅ Generated {name}")
             except Exception as e:
+                manifest.fail("artifacts", key, e)
                 print(f"⚠️  Warning: Failed to generate {name}: {str(e)}")
-                log_activity(f"Failed to generate {name}: {str(e)}\n{traceback.format_exc()}")
+                log_activity(
+                    f"Failed to generate {name}: {str(e)}",
+                    level="ERROR",
+                    traceback=traceback.format_exc()
+                )
                 # Continue with next artifact despite error
                 continue
         
+        if batch_size:
+            pending = [
+                key for key in SCHEMA_ARTIFACTS
+                if not manifest.is_complete("artifacts", key, artifact_inputs(key, paths))
+            ]
+            if len(pending) < len(SCHEMA_ARTIFACTS):
+                print(f"\n⏭️  Skipping {len(SCHEMA_ARTIFACTS) - len(pending)} schema artifacts: already generated")
+            if pending:
+                print(f"\n📊 Generating {len(pending)} schema artifacts in batches of {batch_size}...")
+                for key in pending:
+                    manifest.start("artifacts", key)
+                with usage_context(stage="artifacts", artifact="batch"):
+                    outcome = generator.generate_batch(schema_data, keys=pending, batch_size=batch_size)
+                for key, how in outcome.items():
+                    name = ARTIFACTS[key]["name"]
+                    if how == "failed":
+                        manifest.fail("artifacts", key, RuntimeError("batched generation failed"))
+                        print(f"⚠️  Warning: Failed to generate {name}")
+                    else:
+                        manifest.complete(
+                            "artifacts", key, [generator.output_dir / ARTIFACTS[key]["filename"]],
+                            artifact_inputs(key, paths), produced_by=how
+                        )
+                        print(f"✅ Generated {name} ({how})")
+        
+        failed = manifest.pending("artifacts")
+        if failed:
+            print(f"\n⚠️  {len(failed)} artifact(s) failed; rerun with --resume to retry only those")
         print("\n✅ Completed artifact generation")
-        log_activity("Completed artifact generation")
+        log_activity("Completed artifact generation", failed=len(failed))
         
     except Exception as e:
         error_msg = f"Error in artifact generation: {str(e)}"
         print(f"\n❌ {error_msg}")
-        log_activity(f"{error_msg}\n{traceback.format_exc()}")
+        log_activity(error_msg, level="ERROR", traceback=traceback.format_exc())
+        raise
+
+def run_stage(
+    manifest: RunManifest,
+    name: str,
+    output: Path,
+    depends_on: List[Path],
+    func: Callable[[], Any],
+    load: Optional[Callable[[Path], Any]] = None,
+    extra_outputs: Sequence[Path] = ()
+) -> Any:
+    """
+    Run a pipeline stage, or load its saved result if it is already complete.
+    
+    Args:
+        manifest (RunManifest): Run manifest
+        name (str): Stage name
+        output (Path): Intermediate file the stage writes
+        depends_on (List[Path]): Files the stage is built from
+        func (Callable[[], Any]): Runs the stage and returns its result
+        load (Optional[Callable[[Path], Any]]): Reads a saved result,
+            defaults to parsing the output as JSON
+        extra_outputs (Sequence[Path]): Other files the stage may write;
+            the stage reruns if one of them changes, appears or disappears
+        
+    Returns:
+        Any: The stage result
+    """
+    if manifest.is_complete("stages", name, depends_on):
+        print(f"\n⏭️  Skipping {name}: already complete, loading {output}")
+        log_activity(f"Resumed {name} from {output}")
+        if load is not None:
+            return load(output)
+        with open(output, encoding="utf-8") as f:
+            return json.load(f)
+    
+    manifest.start("stages", name)
+    try:
+        result = func()
+    except Exception as e:
+        manifest.fail("stages", name, e)
         raise
+    manifest.complete("stages", name, [output, *extra_outputs], depends_on)
+    return result
+
+def run_pipeline(
+    paths: Optional[RunPaths] = None,
+    resume: bool = False,
+    batch_size: Optional[int] = None
+) -> RunManifest:
+    """
+    Run every stage for one catalog.
+    
+    Args:
+        paths (Optional[RunPaths]): Catalog and output locations, defaults
+            to data/ and outputs/
+        resume (bool): Redo only the stages and artifacts that failed or are
+            missing in the previous run
+        batch_size (Optional[int]): Schema diagrams per batched request
+        
+    Returns:
+        RunManifest: The run's manifest
+    """
+    paths = paths or RunPaths()
+    manifest = RunManifest.open(paths.manifest, resume=resume)
+    intermediate_dir = paths.intermediate_dir
+    
+    # Process schema metadata
+    processed_data = run_stage(
+        manifest, "process_schema_metadata", paths.processed, [paths.tables_csv, paths.columns_csv],
+        lambda: process_schema_metadata(paths.data_dir, intermediate_dir),
+        load=load_processed_data, extra_outputs=[paths.catalog_store]
+    )
+    
+    # Index table and column descriptions for local search
+    search_index = load_search_index(manifest, paths, processed_data)
+    
+    # Precompute join paths over the foreign key graph
+    join_planner = load_join_paths(manifest, paths, processed_data)
+    
+    # Analyze domains
+    domain_data = run_domain_analysis(manifest, paths, processed_data)
+    
+    # Compute extended statistics
+    statistics = run_stage(
+        manifest, "compute_catalog_statistics", paths.statistics, [paths.processed, paths.domain],
+        lambda: compute_statistics(processed_data, domain_data, intermediate_dir)
+    )
+    
+    # Analyze patterns
+    pattern_data = run_stage(
+        manifest, "analyze_data_patterns", paths.pattern, pattern_inputs(paths),
+        lambda: analyze_data_patterns(processed_data, domain_data, intermediate_dir, statistics, join_planner)
+    )
+    
+    generate_artifacts(
+        processed_data, domain_data, pattern_data, batch_size, manifest, paths, search_index, join_planner
+    )
+    return manifest
 
-def main() -> None:
+def main(argv: Optional[List[str]] = None) -> None:
     """
     Main execution function that orchestrates the entire workflow.
+    
+    Args:
+        argv (Optional[List[str]]): Command-line arguments, defaults to sys.argv
     """
+    parser = argparse.ArgumentParser(description="Extract metadata knowledge and generate diagrams")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Redo only the stages and artifacts that failed or are missing in the last finished run"
+    )
+    parser.add_argument("--data-dir", type=Path, default=Path("data"), help="Directory with the catalog CSVs")
+    parser.add_argument("--output-dir", type=Path, default=Path("outputs"), help="Directory for all outputs")
+    parser.add_argument(
+        "--run-id",
+        help="Name of the new run directory, or with --resume the run to continue (default: the last finished)"
+    )
+    args = parser.parse_args(argv)
+    try:
+        paths = open_run(args.data_dir, args.output_dir, args.run_id, args.resume)
+    except (FileExistsError, FileNotFoundError, RunInProgressError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+    set_default_log_file(paths.activity_log)
+    
     print("\n🚀 Starting metadata knowledge extraction process...")
+    print(f"   Run {paths.run_id} in {paths.run_dir}")
     try:
-        log_activity("Starting metadata knowledge extraction process")
+        log_activity("Starting metadata knowledge extraction process", resume=args.resume, run_id=paths.run_id)
         
-        # Process schema metadata
-        processed_data = process_schema_metadata()
-        
-        # Analyze domains
-        domain_data = analyze_domains(processed_data)
-        
-        # Analyze patterns
-        pattern_data = analyze_data_patterns(processed_data, domain_data)
-        
-        # Generate artifacts
-        generate_artifacts(processed_data, domain_data, pattern_data)
-        
-        print("\n✨ Successfully completed metadata knowledge extraction process!")
-        log_activity("Successfully completed metadata knowledge extraction process")
+        # Generate artifacts batched when DIAGRAM_BATCH_SIZE is set
+        batch_size = int(os.getenv("DIAGRAM_BATCH_SIZE", "0")) or None
+        manifest = run_pipeline(paths, args.resume, batch_size)
+        failed = manifest.pending("artifacts")
+        if failed:
+            # Only complete runs are published, so latest keeps the previous run
+            print(f"\n⚠️  Finished with {len(failed)} failed artifact(s); {paths.output_dir / LATEST} is unchanged")
+            print(f"   Rerun with --resume --run-id {paths.run_id} to retry them")
+            log_activity("Finished with failed artifacts", level="WARNING", run_id=paths.run_id, failed=len(failed))
+        else:
+            paths.publish()
+            print("\n✨ Successfully completed metadata knowledge extraction process!")
+            print(f"   {paths.output_dir / LATEST} -> {paths.run_dir}")
+            log_activity("Successfully completed metadata knowledge extraction process", run_id=paths.run_id)
         
     except Exception as e:
         error_msg = f"Error in main process: {str(e)}"
         print(f"\n❌ {error_msg}")
-        log_activity(f"{error_msg}\n{traceback.format_exc()}")
+        print(f"   Completed steps are recorded; rerun with --resume --run-id {paths.run_id} to continue from here")
+        log_activity(error_msg, level="ERROR", traceback=traceback.format_exc())
         sys.exit(1)
+    finally:
+        report_usage(paths.intermediate_dir)
+        export_trace()
+        paths.finish()
+
+def report_usage(intermediate_dir: Path = Path("outputs/intermediate")) -> None:
+    """
+    Print the run's LLM token, latency and cost breakdown and save it.
+    
+    Args:
+        intermediate_dir (Path): Directory for llm_usage.json
+    """
+    if not usage_ledger.records:
+        return
+    summary = usage_ledger.summary()
+    summary["hedging"] = hedging.snapshot()
+    save_intermediate_result(summary, "llm_usage.json", intermediate_dir)
+    totals = summary["totals"]
+    print(
+        f"\n💰 LLM usage: {totals['calls']} calls, "
+        f"{totals['prompt_tokens']} prompt ({totals['cached_prompt_tokens']} cached) + "
+        f"{totals['completion_tokens']} completion tokens, "
+        f"{totals['latency']:.1f}s, ~${totals['cost']:.4f}"
+    )
+    print(usage_ledger.format_summary())
+    hedges = summary["hedging"]
+    if hedges["hedges_sent"] or hedges["budget_denied"]:
+        print(
+            f"🏁 Hedged requests: {hedges['hedges_sent']} sent for {hedges['requests']} calls, "
+            f"{hedges['hedge_wins']} won by the hedge, {hedges['budget_denied']} denied by budget"
+        )
+
+def export_trace() -> None:
+    """
+    Write the Chrome trace and print the per-stage summary when tracing is on.
+    
+    Tracing is enabled by setting PIPELINE_TRACE to the trace output path.
+    """
+    if not tracer.enabled or not tracer.spans:
+        return
+    trace_path = Path(os.environ["PIPELINE_TRACE"])
+    tracer.export_chrome_trace(trace_path)
+    print(f"\n⏱️  Pipeline trace written to {trace_path}")
+    print(tracer.format_summary())
 
 if __name__ == "__main__":
     main()
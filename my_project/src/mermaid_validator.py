@@ -0,0 +1,377 @@
+import re
+import sys
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+MERMAID_BLOCK_PATTERN = re.compile(r"```mermaid[ \t]*\n(.*?)```", re.DOTALL)
+
+FLOWCHART_DIRECTIONS = ("TB", "TD", "BT", "RL", "LR")
+
+# Diagram types we recognise but do not check beyond their header
+UNCHECKED_TYPES = (
+    "classDiagram", "stateDiagram", "stateDiagram-v2", "gantt", "pie", "journey",
+    "mindmap", "timeline", "gitGraph", "quadrantChart", "requirementDiagram", "C4Context"
+)
+
+# --- erDiagram ---------------------------------------------------------------
+
+ER_ENTITY = r'(?:[A-Za-z_][\w-]*|"[^"\n]*")'
+ER_CARDINALITY = (
+    r"(?:\|o|\|\||\}o|\}\||o\||o\{|\|\{"
+    r"|one or zero|zero or one|one or more|one or many|many\([01]\)|[01]\+|zero or more"
+    r"|zero or many|only one|1)"
+)
+ER_RELATIONSHIP_PATTERN = re.compile(
+    rf"^({ER_ENTITY})(?:\s*\[[^\]\n]*\])?\s*{ER_CARDINALITY}\s*(?:--|\.\.|to|optionally to)\s*{ER_CARDINALITY}"
+    rf"\s*({ER_ENTITY})\s*:\s*(.*)$"
+)
+ER_ENTITY_OPEN_PATTERN = re.compile(rf'^({ER_ENTITY})(?:\s*\["[^"\n]*"\])?\s*\{{\s*$')
+ER_ENTITY_PATTERN = re.compile(rf'^({ER_ENTITY})(?:\s*\["[^"\n]*"\])?(?::::\w+)?$')
+ER_ATTRIBUTE_PATTERN = re.compile(
+    r'^[A-Za-z_][\w\-\[\]()]*\s+\*?[A-Za-z_][\w\-\[\]()]*'
+    r'(?:\s+(?:PK|FK|UK)(?:\s*,\s*(?:PK|FK|UK))*)?(?:\s+"[^"\n]*")?$'
+)
+ER_LABEL_PATTERN = re.compile(r'^(?:"[^"\n]*"|[\w-]+)$')
+
+# --- flowchart / graph -------------------------------------------------------
+
+FLOWCHART_NODE_ID = re.compile(r"[A-Za-z0-9_]+(?:-(?=[A-Za-z0-9_])[A-Za-z0-9_]+)*")
+FLOWCHART_LINK = re.compile(r"[xo<]?(?:--+[-xo>]|==+[=xo>]|-?\.+-[xo>]?)|~~~+")
+FLOWCHART_TEXT_LINK = re.compile(r"(?:--|==|-\.)\s+([^|\n]*?)\s+[xo<]?(?:--+[-xo>]|==+[=xo>]|\.+-[xo>]?)")
+FLOWCHART_CLASS_SUFFIX = re.compile(r":::[\w-]+")
+# Edge ID before a link, as in ``A e1@--> B``
+FLOWCHART_EDGE_ID = re.compile(r"[A-Za-z0-9_]+@(?=[-=.~<xo])")
+
+# Shape openers, longest first, and the closers each accepts
+FLOWCHART_SHAPES: List[Tuple[str, Tuple[str, ...]]] = [
+    ("(((", (")))",)),
+    ("((", ("))",)),
+    ("([", ("])",)),
+    ("[[", ("]]",)),
+    ("[(", (")]",)),
+    ("[/", ("/]", "\\]")),
+    ("[\\", ("\\]", "/]")),
+    ("{{", ("}}",)),
+    ("[", ("]",)),
+    ("(", (")",)),
+    ("{", ("}",)),
+    (">", ("]",)),
+]
+FLOWCHART_LABEL_FORBIDDEN = set('[](){}"')
+
+FLOWCHART_STATEMENT_KEYWORDS = ("classDef", "class", "style", "linkStyle", "click", "accTitle", "accDescr")
+
+# --- sequenceDiagram ---------------------------------------------------------
+
+SEQUENCE_ARROW = r"(?:<<-->>|<<->>|-->>|->>|-->|->|--x|-x|--\)|-\))"
+SEQUENCE_MESSAGE_PATTERN = re.compile(rf"^([^:+\-<>]+?)\s*{SEQUENCE_ARROW}\s*[+-]?\s*([^:]+?)\s*:\s*(.*)$")
+SEQUENCE_PARTICIPANT_PATTERN = re.compile(r"^(?:create\s+)?(?:participant|actor)\s+\S.*$")
+SEQUENCE_NOTE_PATTERN = re.compile(r"^note\s+(?:left of|right of|over)\s+[^:]+:.*$", re.IGNORECASE)
+SEQUENCE_SIMPLE_PATTERN = re.compile(
+    r"^(?:autonumber(?:\s.*)?|title\s*:?\s.*|(?:activate|deactivate|destroy)\s+\S+|links?\s+.*|"
+    r"accTitle\s*:.*|accDescr\s*:.*)$"
+)
+SEQUENCE_BLOCKS = ("loop", "alt", "opt", "par", "critical", "break", "rect", "box")
+SEQUENCE_BLOCK_BRANCHES = {"else": ("alt",), "and": ("par",), "option": ("critical",)}
+
+
+class MermaidSyntaxError(ValueError):
+    """Raised when a diagram fails local Mermaid syntax checking"""
+
+    def __init__(self, message: str, line: Optional[int] = None):
+        self.message = message
+        self.line = line
+        super().__init__(f"line {line}: {message}" if line is not None else message)
+
+
+def _strip_comment(line: str) -> str:
+    """Drop a ``%%`` comment, leaving ``%%{init}%%`` directives to the caller"""
+    index = line.find("%%")
+    return line if index < 0 else line[:index]
+
+
+def _diagram_lines(code: str) -> List[Tuple[int, str]]:
+    """
+    Split diagram code into numbered, stripped statement lines.
+
+    YAML front matter, comments, directives and blank lines are skipped.
+    Line numbers are 1-based within the diagram code.
+    """
+    lines = code.split("\n")
+    result = []
+    index = 0
+    if lines and lines[0].strip() == "---":
+        for index in range(1, len(lines)):
+            if lines[index].strip() == "---":
+                index += 1
+                break
+        else:
+            raise MermaidSyntaxError("front matter opened with '---' is never closed", 1)
+
+    for number, raw in enumerate(lines[index:], index + 1):
+        stripped = raw.strip()
+        if stripped.startswith("%%{") and stripped.endswith("}%%"):
+            continue
+        stripped = _strip_comment(stripped).strip()
+        if stripped:
+            result.append((number, stripped))
+    return result
+
+
+def _check_er_diagram(lines: List[Tuple[int, str]]) -> None:
+    entity_open: Optional[Tuple[int, str]] = None
+    for number, line in lines:
+        if entity_open:
+            if line == "}":
+                entity_open = None
+            elif not ER_ATTRIBUTE_PATTERN.match(line):
+                if "," in line.split()[0]:
+                    raise MermaidSyntaxError(
+                        f"attribute type {line.split()[0]!r} may not contain commas", number
+                    )
+                raise MermaidSyntaxError(
+                    f"invalid attribute {line!r} in entity {entity_open[1]}; "
+                    "expected 'type name [PK|FK|UK] [\"comment\"]'",
+                    number
+                )
+            continue
+
+        match = ER_ENTITY_OPEN_PATTERN.match(line)
+        if match:
+            entity_open = (number, match.group(1))
+            continue
+        match = ER_RELATIONSHIP_PATTERN.match(line)
+        if match:
+            if not ER_LABEL_PATTERN.match(match.group(3).strip()):
+                raise MermaidSyntaxError(
+                    f"relationship label {match.group(3).strip()!r} must be one word or a quoted string",
+                    number
+                )
+            continue
+        if ER_ENTITY_PATTERN.match(line) or line.startswith(("direction ", "style ", "classDef ", "class ")):
+            continue
+        if line.startswith("title"):
+            raise MermaidSyntaxError("erDiagram has no title statement; use front matter 'title:'", number)
+        raise MermaidSyntaxError(f"unrecognised erDiagram statement {line!r}", number)
+
+    if entity_open:
+        raise MermaidSyntaxError(f"entity {entity_open[1]} is never closed with '}}'", entity_open[0])
+
+
+def _scan_node(line: str, pos: int, number: int) -> int:
+    """Parse one flowchart node (id, optional shape and class) and return the end offset"""
+    match = FLOWCHART_NODE_ID.match(line, pos)
+    if not match:
+        raise MermaidSyntaxError(f"expected a node id at {line[pos:pos + 20]!r}", number)
+    node_id = match.group(0)
+    if node_id == "end":
+        raise MermaidSyntaxError("'end' cannot be used as a node id; capitalise it or rename the node", number)
+    pos = match.end()
+
+    if line.startswith("@{", pos):
+        close = line.find("}", pos)
+        if close < 0:
+            raise MermaidSyntaxError(f"unclosed '@{{' shape on node {node_id}", number)
+        pos = close + 1
+    else:
+        for opener, closers in FLOWCHART_SHAPES:
+            if not line.startswith(opener, pos):
+                continue
+            start = pos + len(opener)
+            if line.startswith('"', start):
+                quote_end = line.find('"', start + 1)
+                if quote_end < 0:
+                    raise MermaidSyntaxError(f"unterminated quoted label on node {node_id}", number)
+                label_end = quote_end + 1
+            else:
+                ends = [index for index in (line.find(closer, start) for closer in closers) if index >= 0]
+                if not ends:
+                    raise MermaidSyntaxError(
+                        f"node {node_id} opens with {opener!r} but is never closed with {closers[0]!r}", number
+                    )
+                label_end = min(ends)
+                bad = FLOWCHART_LABEL_FORBIDDEN.intersection(line[start:label_end])
+                if bad:
+                    raise MermaidSyntaxError(
+                        f"label of node {node_id} contains {''.join(sorted(bad))!r}; "
+                        f"wrap the label in double quotes",
+                        number
+                    )
+            closer = next((closer for closer in closers if line.startswith(closer, label_end)), None)
+            if closer is None:
+                raise MermaidSyntaxError(
+                    f"node {node_id} opens with {opener!r} but is never closed with {closers[0]!r}", number
+                )
+            pos = label_end + len(closer)
+            break
+
+    match = FLOWCHART_CLASS_SUFFIX.match(line, pos)
+    return match.end() if match else pos
+
+
+def _skip_space(line: str, pos: int) -> int:
+    while pos < len(line) and line[pos] in " \t":
+        pos += 1
+    return pos
+
+
+def _check_flowchart_statement(line: str, number: int) -> None:
+    """Check a node/edge chain such as ``A[Label] -->|text| B & C e1@--> D``"""
+    pos = _scan_node(line, 0, number)
+    while True:
+        pos = _skip_space(line, pos)
+        if pos >= len(line) or line[pos] == ";":
+            if line[pos + 1:].strip():
+                raise MermaidSyntaxError(f"unexpected text after ';': {line[pos + 1:].strip()!r}", number)
+            return
+        if line[pos] == "&":
+            pos = _scan_node(line, _skip_space(line, pos + 1), number)
+            continue
+
+        edge_id = FLOWCHART_EDGE_ID.match(line, pos)
+        if edge_id:
+            pos = edge_id.end()
+        match = FLOWCHART_TEXT_LINK.match(line, pos) or FLOWCHART_LINK.match(line, pos)
+        if not match:
+            raise MermaidSyntaxError(f"expected a link or end of statement at {line[pos:pos + 20]!r}", number)
+        pos = _skip_space(line, match.end())
+        if line.startswith("|", pos):
+            close = line.find("|", pos + 1)
+            if close < 0:
+                raise MermaidSyntaxError("link text opened with '|' is never closed", number)
+            pos = _skip_space(line, close + 1)
+        if pos >= len(line):
+            raise MermaidSyntaxError("link has no target node", number)
+        pos = _scan_node(line, pos, number)
+
+
+def _check_flowchart(header: str, number: int, lines: List[Tuple[int, str]]) -> None:
+    parts = header.split()
+    if len(parts) > 1 and parts[1].rstrip(";") not in FLOWCHART_DIRECTIONS:
+        raise MermaidSyntaxError(f"unknown direction {parts[1]!r}; use one of {', '.join(FLOWCHART_DIRECTIONS)}", number)
+
+    open_subgraphs: List[int] = []
+    for number, line in lines:
+        keyword = line.split(None, 1)[0].rstrip(";")
+        if keyword == "subgraph":
+            open_subgraphs.append(number)
+        elif keyword == "end":
+            if not open_subgraphs:
+                raise MermaidSyntaxError("'end' without a matching 'subgraph'", number)
+            open_subgraphs.pop()
+        elif keyword == "direction":
+            if len(line.split()) != 2 or line.split()[1] not in FLOWCHART_DIRECTIONS:
+                raise MermaidSyntaxError(f"invalid direction statement {line!r}", number)
+        elif keyword.startswith(FLOWCHART_STATEMENT_KEYWORDS):
+            continue
+        elif keyword == "title":
+            raise MermaidSyntaxError("flowcharts have no title statement; use front matter 'title:'", number)
+        else:
+            _check_flowchart_statement(line, number)
+
+    if open_subgraphs:
+        raise MermaidSyntaxError("'subgraph' is never closed with 'end'", open_subgraphs[-1])
+
+
+def _check_sequence_diagram(lines: List[Tuple[int, str]]) -> None:
+    blocks: List[Tuple[int, str]] = []
+    for number, line in lines:
+        keyword = line.split(None, 1)[0]
+        if keyword in SEQUENCE_BLOCKS:
+            blocks.append((number, keyword))
+        elif keyword == "end":
+            if not blocks:
+                raise MermaidSyntaxError("'end' without an open block", number)
+            blocks.pop()
+        elif keyword in SEQUENCE_BLOCK_BRANCHES:
+            allowed = SEQUENCE_BLOCK_BRANCHES[keyword]
+            if not blocks or blocks[-1][1] not in allowed:
+                raise MermaidSyntaxError(f"'{keyword}' is only valid inside {'/'.join(allowed)}", number)
+        elif not (
+            SEQUENCE_PARTICIPANT_PATTERN.match(line)
+            or SEQUENCE_NOTE_PATTERN.match(line)
+            or SEQUENCE_SIMPLE_PATTERN.match(line)
+            or SEQUENCE_MESSAGE_PATTERN.match(line)
+        ):
+            if re.search(SEQUENCE_ARROW, line) and ":" not in line:
+                raise MermaidSyntaxError(f"message {line!r} needs ': text' after the receiver", number)
+            raise MermaidSyntaxError(f"unrecognised sequenceDiagram statement {line!r}", number)
+
+    if blocks:
+        raise MermaidSyntaxError(f"'{blocks[-1][1]}' block is never closed with 'end'", blocks[-1][0])
+
+
+def validate_mermaid(code: str) -> str:
+    """
+    Check the syntax of one Mermaid diagram.
+
+    ``erDiagram``, ``flowchart``/``graph`` and ``sequenceDiagram`` are checked
+    statement by statement; other known diagram types only have their header
+    checked.
+
+    Args:
+        code (str): Diagram source without the ```mermaid fence
+
+    Returns:
+        str: The diagram type
+
+    Raises:
+        MermaidSyntaxError: If the diagram is invalid
+    """
+    lines = _diagram_lines(code)
+    if not lines:
+        raise MermaidSyntaxError("diagram is empty")
+
+    number, header = lines[0]
+    diagram_type = header.split()[0].rstrip(";")
+    body = lines[1:]
+    if diagram_type == "erDiagram":
+        _check_er_diagram(body)
+    elif diagram_type in ("flowchart", "graph"):
+        _check_flowchart(header, number, body)
+    elif diagram_type == "sequenceDiagram":
+        _check_sequence_diagram(body)
+    elif diagram_type not in UNCHECKED_TYPES:
+        raise MermaidSyntaxError(f"unknown diagram type {diagram_type!r}", number)
+    return diagram_type
+
+
+def validate_diagram(content: str) -> List[str]:
+    """
+    Check every ```mermaid block in an LLM response.
+
+    Args:
+        content (str): Markdown content containing Mermaid blocks
+
+    Returns:
+        List[str]: Diagram types found, in order
+
+    Raises:
+        MermaidSyntaxError: If there is no Mermaid block or a block is
+            invalid; line numbers are relative to the block
+    """
+    blocks = MERMAID_BLOCK_PATTERN.findall(content)
+    if not blocks:
+        raise MermaidSyntaxError("no ```mermaid code block found")
+    types = []
+    for index, block in enumerate(blocks, 1):
+        try:
+            types.append(validate_mermaid(block))
+        except MermaidSyntaxError as e:
+            if len(blocks) > 1:
+                raise MermaidSyntaxError(f"block {index}: {e.message}", e.line) from None
+            raise
+    return types
+
+
+if __name__ == "__main__":
+    # Check saved diagrams: python src/mermaid_validator.py outputs/latest/final/*.md
+    failures = 0
+    for path in sys.argv[1:] or sorted(Path("outputs/latest/final").glob("*.md")):
+        try:
+            validate_diagram(Path(path).read_text(encoding="utf-8"))
+            print(f"✅ {path}")
+        except MermaidSyntaxError as e:
+            failures += 1
+            print(f"❌ {path}: {e}")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,101 @@
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+DEFAULT_MODEL = "anthropic/claude-2"
+
+# Rules are checked in order; the first one whose task list and size bounds
+# match the prompt picks the model. Thresholds are in prompt characters.
+DEFAULT_ROUTING: Dict[str, Any] = {
+    "default_model": DEFAULT_MODEL,
+    "rules": [
+        {
+            "name": "small-diagram",
+            "tasks": ["overview", "diagram"],
+            "max_prompt_chars": 20000,
+            "model": "anthropic/claude-3-haiku"
+        },
+        {
+            "name": "bulk-classification",
+            "tasks": ["classification"],
+            "max_prompt_chars": 400000,
+            "model": "anthropic/claude-3-haiku"
+        },
+        {
+            "name": "catalog-wide",
+            "min_prompt_chars": 400000,
+            "model": "anthropic/claude-3.5-sonnet"
+        }
+    ]
+}
+
+
+class ModelRouter:
+    """
+    Choose a model for a prompt by task type and size.
+
+    Small, simple prompts (an ecosystem overview built from domain names) go
+    to a fast, cheap model; catalog-wide prompts go to a long-context model;
+    anything else uses the default model.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the router.
+
+        Args:
+            config (Optional[Dict[str, Any]]): Routing config with
+                ``default_model`` and an ordered list of ``rules``. Each rule
+                may set ``tasks``, ``min_prompt_chars`` and ``max_prompt_chars``
+                and must set ``model``.
+        """
+        config = config or DEFAULT_ROUTING
+        self.default_model: str = config.get("default_model", DEFAULT_MODEL)
+        self.rules: List[Dict[str, Any]] = list(config.get("rules", []))
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        """
+        Build a router from the environment.
+
+        ``LLM_ROUTING_FILE`` names a JSON routing config. ``LLM_ROUTING=off``
+        disables the rules so every call uses ``LLM_DEFAULT_MODEL`` (or the
+        config's default model).
+
+        Returns:
+            ModelRouter: The configured router
+        """
+        config = dict(DEFAULT_ROUTING)
+        routing_file = os.getenv("LLM_ROUTING_FILE")
+        if routing_file:
+            with open(routing_file, encoding="utf-8") as f:
+                config = json.load(f)
+        if os.getenv("LLM_DEFAULT_MODEL"):
+            config["default_model"] = os.environ["LLM_DEFAULT_MODEL"]
+        if os.getenv("LLM_ROUTING", "").lower() == "off":
+            config["rules"] = []
+        return cls(config)
+
+    def route(self, prompt: str, task: str = "analysis") -> str:
+        """
+        Pick the model for a prompt.
+
+        Args:
+            prompt (str): The full prompt text
+            task (str): Task type, e.g. ``classification``, ``analysis``,
+                ``overview`` or ``diagram``
+
+        Returns:
+            str: Model identifier
+        """
+        size = len(prompt)
+        for rule in self.rules:
+            if "tasks" in rule and task not in rule["tasks"]:
+                continue
+            if size < rule.get("min_prompt_chars", 0):
+                continue
+            if "max_prompt_chars" in rule and size > rule["max_prompt_chars"]:
+                continue
+            return rule["model"]
+        return self.default_model
+
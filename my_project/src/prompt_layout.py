@@ -0,0 +1,274 @@
+import json
+import os
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+# The shared catalog block is fenced by these markers so query_llm can find
+# the cacheable prefix without every caller passing it separately
+CONTEXT_BEGIN = "<catalog_context>\n"
+CONTEXT_END = "\n</catalog_context>\n"
+
+CONTEXT_PREAMBLE = (
+    "You are documenting a healthcare database. The complete schema catalog "
+    "is given below as canonical JSON; the task follows after it. Columns "
+    "that many tables share are defined once under common_columns and listed "
+    "in each table by their @ID.\n"
+)
+
+# A column definition shared by at least this many tables is emitted once
+# under common_columns (COMMON_COLUMN_MIN_TABLES overrides, 0 disables)
+DEFAULT_COMMON_COLUMN_MIN_TABLES = 5
+
+# Stands for the column's own table in a shared self-reference (CONTEXTPARENTCONTEXTID)
+SAME_TABLE = "(same table)"
+
+# Models whose providers only cache when the request carries explicit
+# cache_control breakpoints; OpenAI-family models cache long prefixes on
+# their own and need no hint
+EXPLICIT_CACHE_PREFIXES = ("anthropic/", "google/gemini")
+
+_context_cache: Tuple[Any, Optional[str]] = (None, None)
+
+
+def canonical_json(data: Any) -> str:
+    """
+    Serialize data byte-identically on every call.
+
+    Keys are sorted and separators fixed, so the same catalog always produces
+    the same string regardless of dict insertion order.
+
+    Args:
+        data (Any): JSON-serializable data
+
+    Returns:
+        str: Canonical JSON text
+    """
+    try:
+        return json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    except TypeError:
+        # Keys of mixed types cannot be sorted (csv.DictReader files overflow
+        # fields under a None key); round-trip once so every key is a string
+        data = json.loads(json.dumps(data, default=str))
+        return json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def column_definition(column: Dict[str, Any]) -> Optional[Tuple[Tuple[Any, Any], ...]]:
+    """
+    The part of a column that tables can share, as a hashable key.
+
+    That is every field but the schema and table name, with a reference to
+    the column's own table written as SAME_TABLE. None for rows that cannot
+    be shared (overflow fields under the None key).
+    """
+    if None in column:
+        return None
+    own = (column.get("schema_name"), column.get("table_name"))
+    self_reference = (column.get("references_schema"), column.get("references_table")) == own
+    return tuple(
+        (field, SAME_TABLE if self_reference and field in ("references_schema", "references_table") else value)
+        for field, value in column.items()
+        if field not in ("schema_name", "table_name")
+    )
+
+
+def _sorted_tables(tables: Any) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Tables of a schema by name; catalog stores fetch them in chunks"""
+    names = sorted(tables)
+    if hasattr(tables, "stream"):
+        return tables.stream(names)
+    return ((name, tables[name]) for name in names)
+
+
+def common_columns(schema_data: Dict[str, Any], min_tables: int) -> Dict[Tuple[Tuple[Any, Any], ...], str]:
+    """
+    Column definitions repeated in at least ``min_tables`` tables, with their IDs.
+
+    IDs are ``@`` and the column name, numbered when several shared
+    definitions have the same name, and depend only on the catalog.
+    """
+    counts: Counter = Counter()
+    for tables in schema_data.values():
+        for _, table in tables.items():
+            counts.update({
+                key for key in map(column_definition, table.get("columns", [])) if key is not None
+            })
+    shared = sorted((key for key, count in counts.items() if count >= min_tables), key=canonical_json)
+    names = Counter(dict(key).get("column_name") for key in shared)
+    seen: Counter = Counter()
+    ids = {}
+    for key in shared:
+        name = dict(key).get("column_name")
+        seen[name] += 1
+        ids[key] = f"@{name}" if names[name] == 1 else f"@{name}#{seen[name]}"
+    return ids
+
+
+def catalog_json(schema_data: Dict[str, Any], min_tables: Optional[int] = None) -> str:
+    """
+    Canonical JSON of the catalog with shared column definitions written once.
+
+    Columns whose definition (see ``column_definition``) appears in at least
+    ``min_tables`` tables are replaced by their ID, and the definitions are
+    given under ``common_columns``: ``{"common_columns": {...}, "catalog":
+    {schema: {table: ...}}}``. CONTEXTID, CONTEXTNAME and the audit columns
+    of the athenaOne export are then sent once instead of once per table.
+    Without shared columns the text is ``canonical_json(schema_data)``.
+    Catalog stores are serialized a chunk of tables at a time.
+
+    Args:
+        schema_data (Dict[str, Any]): The structured schema data
+        min_tables (Optional[int]): Tables a definition must appear in to be
+            shared, defaults to COMMON_COLUMN_MIN_TABLES; 0 shares nothing
+
+    Returns:
+        str: Canonical catalog text
+    """
+    if min_tables is None:
+        min_tables = int(os.getenv("COMMON_COLUMN_MIN_TABLES", str(DEFAULT_COMMON_COLUMN_MIN_TABLES)))
+    ids = common_columns(schema_data, min_tables) if min_tables > 0 else {}
+    if not ids and isinstance(schema_data, dict):
+        return canonical_json(schema_data)
+
+    def encode(table: Dict[str, Any]) -> Dict[str, Any]:
+        if not ids:
+            return table
+        columns = [ids.get(column_definition(column)) or column for column in table.get("columns", [])]
+        return {**table, "columns": columns}
+
+    parts = ["{"]
+    for schema_index, schema_name in enumerate(sorted(schema_data)):
+        parts.append(("," if schema_index else "") + canonical_json(schema_name) + ":{")
+        for table_index, (table_name, table) in enumerate(_sorted_tables(schema_data[schema_name])):
+            parts.append(("," if table_index else "") + canonical_json(table_name) + ":" + canonical_json(encode(table)))
+        parts.append("}")
+    parts.append("}")
+    catalog = "".join(parts)
+    if not ids:
+        return catalog
+    definitions = {ids[key]: dict(key) for key in ids}
+    return f'{{"common_columns":{canonical_json(definitions)},"catalog":{catalog}}}'
+
+
+def build_catalog_context(schema_data: Dict[str, Any]) -> str:
+    """
+    Build the shared catalog block that every prompt starts with.
+
+    The result for the most recent catalog object is memoized, so the ten
+    artifact prompts of a run serialize the catalog once.
+
+    Args:
+        schema_data (Dict[str, Any]): The structured schema data
+
+    Returns:
+        str: The fenced, canonical catalog context
+    """
+    global _context_cache
+    cached_data, cached_text = _context_cache
+    if cached_data is schema_data and cached_text is not None:
+        return cached_text
+
+    text = f"{CONTEXT_PREAMBLE}{CONTEXT_BEGIN}{catalog_json(schema_data)}{CONTEXT_END}"
+    _context_cache = (schema_data, text)
+    return text
+
+
+def clear_context_cache() -> None:
+    """Forget the memoized catalog context"""
+    global _context_cache
+    _context_cache = (None, None)
+
+
+def layered_prompt(schema_data: Dict[str, Any], task: str) -> str:
+    """
+    Assemble a prompt with the catalog context first and the task after it.
+
+    Args:
+        schema_data (Dict[str, Any]): The structured schema data
+        task (str): Task-specific instructions and any small extra data
+
+    Returns:
+        str: The full prompt
+    """
+    return f"{build_catalog_context(schema_data)}\n{task.strip()}\n"
+
+
+def split_cached_prefix(prompt: str) -> Tuple[str, str]:
+    """
+    Split a layered prompt into its shared prefix and task suffix.
+
+    Args:
+        prompt (str): A prompt, layered or not
+
+    Returns:
+        Tuple[str, str]: The cacheable prefix (empty if the prompt has no
+            catalog context) and the remainder
+    """
+    if not prompt.startswith(CONTEXT_PREAMBLE + CONTEXT_BEGIN):
+        return "", prompt
+    end = prompt.find(CONTEXT_END)
+    if end < 0:
+        return "", prompt
+    end += len(CONTEXT_END)
+    return prompt[:end], prompt[end:]
+
+
+def supports_cache_control(model: str) -> bool:
+    """
+    Whether to send explicit cache_control breakpoints for a model.
+
+    Controlled by ``PROMPT_CACHE_CONTROL``: ``on``, ``off`` or ``auto``
+    (default, only for providers that need explicit breakpoints).
+    """
+    setting = os.getenv("PROMPT_CACHE_CONTROL", "auto").lower()
+    if setting in ("on", "true", "1"):
+        return True
+    if setting in ("off", "false", "0"):
+        return False
+    return model.startswith(EXPLICIT_CACHE_PREFIXES)
+
+
+def build_messages(prompt: str, model: str) -> List[Dict[str, Any]]:
+    """
+    Build chat messages, marking the catalog prefix as cacheable.
+
+    Args:
+        prompt (str): The full prompt
+        model (str): Target model
+
+    Returns:
+        List[Dict[str, Any]]: Messages for the chat completions API
+    """
+    prefix, suffix = split_cached_prefix(prompt)
+    if not prefix or not supports_cache_control(model):
+        return [{"role": "user", "content": prompt}]
+
+    content: List[Dict[str, Union[str, Dict[str, str]]]] = [
+        {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": suffix},
+    ]
+    return [{"role": "user", "content": content}]
+
+
+def cached_prompt_tokens(usage: Any) -> Optional[int]:
+    """
+    Read the cached share of prompt tokens from a usage object.
+
+    Handles the OpenAI/OpenRouter ``prompt_tokens_details.cached_tokens`` shape
+    and the Anthropic ``cache_read_input_tokens`` shape.
+
+    Args:
+        usage (Any): ``response.usage`` from the API
+
+    Returns:
+        Optional[int]: Cached prompt tokens, or None if not reported
+    """
+    if usage is None:
+        return None
+    details = getattr(usage, "prompt_tokens_details", None)
+    if isinstance(details, dict):
+        cached = details.get("cached_tokens")
+    else:
+        cached = getattr(details, "cached_tokens", None)
+    if cached is None:
+        cached = getattr(usage, "cache_read_input_tokens", None)
+    return cached
@@ -1,12 +1,26 @@
 import os
 import json
-from datetime import datetime
+import threading
+import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
-from openai import OpenAI
-from openai import APITimeoutError, APIError
+from typing import Any, Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 
+from activity_log import get_activity_logger
+from catalog_stats import statistics_summary
+from hedging import HedgeCancelled, HedgingPolicy
+from json_extract import extract_json
+from llm_usage import estimate_tokens, usage_ledger
+from model_routing import ModelRouter
+from prompt_layout import (
+    build_messages,
+    cached_prompt_tokens,
+    canonical_json,
+    layered_prompt
+)
+from run_manifest import atomic_write_json
+from tracing import span
+
 # Load environment variables
 load_dotenv()
 
@@ -14,59 +28,189 @@ load_dotenv()
 OPENAI_API_BASE = os.getenv("OPENAI_API_BASE")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
-# Initialize OpenAI client
-client = OpenAI(
-    api_key=OPENAI_API_KEY,
-    base_url=OPENAI_API_BASE
-)
+# Routing and hedging read their settings from the environment, so build them after .env is loaded
+router = ModelRouter.from_env()
+hedging = HedgingPolicy.from_env()
+
+_client = None
+_client_lock = threading.Lock()
+
+# Bounds in-flight requests across processes in batch mode; None means unbounded
+_llm_slots: Any = None
 
-def log_activity(message: str, log_file: Path = Path("outputs/logs/activity_log.md")) -> None:
+def set_llm_concurrency(slots: Any) -> None:
     """
-    Log an activity with timestamp to the activity log file.
+    Share a concurrency budget for LLM requests.
     
     Args:
-        message (str): The message to log
-        log_file (Path): Path to the log file
+        slots (Any): Semaphore (e.g. multiprocessing.Semaphore) held for the
+            duration of every request, or None to remove the limit
+    """
+    global _llm_slots
+    _llm_slots = slots
+
+def get_client() -> Any:
     """
-    timestamp = datetime.now().isoformat()
-    log_entry = f"## {timestamp}\n{message}\n\n"
+    Get the shared OpenAI client, creating it on first use.
     
-    # Create parent directories if they don't exist
-    log_file.parent.mkdir(parents=True, exist_ok=True)
+    The openai package takes most of a second to import, so it is only
+    loaded once a command actually talks to the LLM.
     
-    with open(log_file, 'a', encoding='utf-8') as f:
-        f.write(log_entry)
+    Returns:
+        OpenAI: The client configured for OpenRouter
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from openai import OpenAI
+                _client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_API_BASE)
+    return _client
+
+def log_activity(
+    message: str,
+    log_file: Optional[Path] = None,
+    level: str = "INFO",
+    **fields: Any
+) -> None:
+    """
+    Log an activity event to the buffered JSONL activity log.
+    
+    Events are flushed to disk in the background; long string fields such as
+    prompts and responses are stored once in the log's blob store and
+    referenced by hash.
+    
+    Args:
+        message (str): The message to log
+        log_file (Optional[Path]): Path to the log file, defaults to
+            outputs/logs/activity_log.jsonl
+        level (str): Event level (DEBUG, INFO, WARNING, ERROR)
+        **fields: Structured attributes to attach to the event
+    """
+    get_activity_logger(log_file).log(message, level=level, **fields)
 
-def save_intermediate_result(data: Any, filename: str) -> None:
+def save_intermediate_result(
+    data: Any,
+    filename: str,
+    output_dir: Path = Path("outputs/intermediate")
+) -> None:
     """
     Save intermediate results to JSON file.
     
     Args:
         data (Any): Data to save
         filename (str): Name of the file to save to
+        output_dir (Path): Directory to save into
     """
-    output_path = Path("outputs/intermediate") / filename
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path = Path(output_dir) / filename
+    # Written atomically so an interrupted run never leaves a truncated file
+    atomic_write_json(output_path, data)
+
+def request_completion(
+    model: str,
+    messages: List[Dict[str, Any]],
+    temperature: float,
+    max_tokens: Optional[int],
+    timeout: float,
+    cancel: Optional[threading.Event] = None
+) -> Tuple[str, Any, float, int]:
+    """
+    Send one chat completion request.
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2)
+    With a cancel event the response is streamed, so an attempt that lost a
+    hedging race can close its connection as soon as it notices; streamed
+    cancellation also stops generation upstream on OpenRouter. The raw
+    response is requested so the client's own transport retries are known.
+    
+    Args:
+        model (str): The model to use
+        messages (List[Dict[str, Any]]): Chat messages
+        temperature (float): Controls randomness in the response
+        max_tokens (Optional[int]): Maximum tokens in the response
+        timeout (float): Timeout in seconds for the API call
+        cancel (Optional[threading.Event]): Set when the request should stop
+        
+    Returns:
+        Tuple[str, Any, float, int]: Response text, usage object (may be
+            None), latency in seconds and retries taken by the client
+        
+    Raises:
+        HedgeCancelled: If the cancel event was set before completion
+    """
+    started = time.perf_counter()
+    if cancel is None:
+        raw = get_client().chat.completions.with_raw_response.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=timeout
+        )
+        response = raw.parse()
+        return (
+            response.choices[0].message.content, getattr(response, "usage", None),
+            time.perf_counter() - started, raw.retries_taken
+        )
+
+    raw = get_client().chat.completions.with_raw_response.create(
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        timeout=timeout,
+        stream=True,
+        stream_options={"include_usage": True}
+    )
+    pieces = []
+    usage = None
+    with raw.parse() as stream:
+        for chunk in stream:
+            if cancel.is_set():
+                raise HedgeCancelled(f"{model} request cancelled")
+            if chunk.choices and chunk.choices[0].delta.content:
+                pieces.append(chunk.choices[0].delta.content)
+            if getattr(chunk, "usage", None) is not None:
+                usage = chunk.usage
+    return "".join(pieces), usage, time.perf_counter() - started, raw.retries_taken
+
+def _token_counts(prompt: str, result: str, usage: Any) -> Tuple[int, int, int, bool]:
+    """Prompt, cached and completion tokens, estimated when the provider omits usage"""
+    prompt_tokens = getattr(usage, "prompt_tokens", None)
+    completion_tokens = getattr(usage, "completion_tokens", None)
+    estimated = prompt_tokens is None or completion_tokens is None
+    if estimated:
+        prompt_tokens = estimate_tokens(prompt)
+        completion_tokens = estimate_tokens(result or "")
+    return prompt_tokens, cached_prompt_tokens(usage) or 0, completion_tokens, estimated
 
 def query_llm(
     prompt: str,
-    model: str = "anthropic/claude-2",  # Updated to use OpenRouter's Claude model
+    model: Optional[str] = None,
     temperature: float = 0.7,
     max_tokens: Optional[int] = None,
-    timeout: float = 60.0
+    timeout: float = 60.0,
+    task: str = "analysis",
+    json_only: bool = True
 ) -> str:
     """
     Query the LLM through OpenRouter API with timeout.
     
+    Token usage, latency and estimated cost of every call are recorded in
+    the process-wide usage ledger under the active usage_context. Calls that
+    run past the model's usual latency are hedged with a duplicate request
+    (see hedging.HedgingPolicy); the first successful response is used.
+    
     Args:
         prompt (str): The prompt to send to the LLM
-        model (str): The model to use
+        model (Optional[str]): The model to use; chosen by the model router
+            from the prompt size and task type when omitted
         temperature (float): Controls randomness in the response
         max_tokens (Optional[int]): Maximum tokens in the response
-        timeout (float): Timeout in seconds for the API call
+        timeout (float): Timeout in seconds for each API request
+        task (str): Task type used for routing and accounting
+            (classification, analysis, overview, diagram)
+        json_only (bool): Append the JSON-only instruction; disable for
+            prompts that ask for Mermaid or other non-JSON output
         
     Returns:
         str: The LLM's response
@@ -76,96 +220,211 @@ def query_llm(
         APIError: If there's an API-related error
         Exception: For other unexpected errors
     """
-    try:
-        # Add explicit instruction for JSON formatting
-        enhanced_prompt = f"{prompt}\n\nIMPORTANT: Return ONLY valid JSON without any additional text or explanation."
+    from openai import APITimeoutError, APIError
+    
+    if model is None:
+        model = router.route(prompt, task)
+    
+    with span("llm.query", model=model, task=task, prompt_chars=len(prompt)) as llm_span:
+        try:
+            # Add explicit instruction for JSON formatting
+            enhanced_prompt = prompt
+            if json_only:
+                enhanced_prompt = f"{prompt}\n\nIMPORTANT: Return ONLY valid JSON without any additional text or explanation."
+            messages = build_messages(enhanced_prompt, model)
         
-        response = client.chat.completions.create(
-            model=model,
-            messages=[{"role": "user", "content": enhanced_prompt}],
-            temperature=temperature,
-            max_tokens=max_tokens,
-            timeout=timeout
-        )
-        result = response.choices[0].message.content
+            def attempt(cancel: Optional[threading.Event]) -> Tuple[str, Any, float, int]:
+                return request_completion(model, messages, temperature, max_tokens, timeout, cancel)
         
-        # Log the interaction
-        log_activity(f"LLM Query:\nPrompt: {prompt}\nResponse: {result}")
+            def record_discarded(outcome: Tuple[str, Any, float, int]) -> None:
+                # A losing attempt that completed anyway is still billed
+                loser, loser_usage, loser_latency, loser_retries = outcome
+                loser_prompt, loser_cached, loser_completion, loser_estimated = _token_counts(
+                    enhanced_prompt, loser, loser_usage
+                )
+                usage_ledger.record(
+                    model, task, loser_prompt, loser_completion, loser_latency,
+                    estimated=loser_estimated, cached_prompt_tokens=loser_cached, retries=loser_retries,
+                    hedge="discarded"
+                )
         
-        return result
+            # Every attempt holds a shared slot while it runs; queueing for one is not timed
+            (result, usage, latency, retries), winner = hedging.run(
+                model, attempt, on_discard=record_discarded, gate=_llm_slots
+            )
+            
+            prompt_tokens, cached_tokens, completion_tokens, estimated = _token_counts(
+                enhanced_prompt, result, usage
+            )
+            record = usage_ledger.record(
+                model, task, prompt_tokens, completion_tokens, latency,
+                estimated=estimated, cached_prompt_tokens=cached_tokens, retries=retries, hedge=winner
+            )
+            llm_span.set(
+                response_chars=len(result or ""),
+                prompt_tokens=prompt_tokens,
+                cached_prompt_tokens=cached_tokens,
+                completion_tokens=completion_tokens,
+                cost=record["cost"] or 0.0,
+                retries=retries,
+                hedge_won=int(winner == "hedge")
+            )
+        
+            # Log the interaction; prompt and response bodies go to the blob store
+            log_activity(
+                "LLM query",
+                model=model,
+                task=task,
+                stage=record["stage"],
+                artifact=record["artifact"],
+                prompt_tokens=prompt_tokens,
+                cached_prompt_tokens=cached_tokens,
+                completion_tokens=completion_tokens,
+                latency=round(latency, 3),
+                cost=record["cost"],
+                winner=winner,
+                prompt=prompt,
+                response=result
+            )
+        
+            return result
     
-    except APITimeoutError:
-        error_msg = f"LLM query timed out after {timeout} seconds"
-        log_activity(error_msg)
-        raise APITimeoutError(error_msg)
+        # The SDK errors need the original request/response to construct, so
+        # they are logged and re-raised as-is
+        except APITimeoutError:
+            error_msg = f"LLM query timed out after {timeout} seconds"
+            log_activity(error_msg, level="ERROR", model=model)
+            raise
     
-    except APIError as e:
-        error_msg = f"OpenAI API error: {str(e)}"
-        log_activity(error_msg)
-        raise APIError(error_msg)
+        except APIError as e:
+            error_msg = f"OpenAI API error: {str(e)}"
+            log_activity(error_msg, level="ERROR", model=model)
+            raise
     
-    except Exception as e:
-        error_msg = f"Unexpected error in LLM query: {str(e)}"
-        log_activity(error_msg)
-        raise
+        except Exception as e:
+            error_msg = f"Unexpected error in LLM query: {str(e)}"
+            log_activity(error_msg, level="ERROR", model=model)
+            raise
 
-def generate_domain_classification_prompt(schema_data: Dict[str, Any]) -> str:
+def generate_domain_classification_prompt(
+    processed_data: Dict[str, Any],
+    tables: Optional[List[str]] = None,
+    known_domains: Optional[Dict[str, List[str]]] = None
+) -> str:
     """
     Generate a prompt for domain classification.
     
+    The catalog comes first as the shared, cacheable context; relationships,
+    statistics and instructions follow it.
+    
     Args:
-        schema_data (Dict[str, Any]): The schema data to analyze
+        processed_data (Dict[str, Any]): Processed schema data with
+            "schema_data", "relationships" and "statistics"
+        tables (Optional[List[str]]): ``SCHEMA.TABLE`` keys to classify;
+            only these are sent, defaults to the whole catalog
+        known_domains (Optional[Dict[str, List[str]]]): Domains already
+            assigned to the other tables, with example tables, so the
+            answer reuses their names
         
     Returns:
         str: The formatted prompt
     """
-    return f"""
-    Analyze this database schema structure and identify conceptual domains:
-    {json.dumps(schema_data, indent=2)}
+    schema_data = processed_data["schema_data"]
+    relationships = processed_data.get("relationships", {})
+    statistics = processed_data.get("statistics", {})
+    known_section = ""
+    if tables is not None:
+        selected = set(tables)
+        schema_data = {
+            schema_name: {
+                table_name: table_data for table_name, table_data in schema_tables.items()
+                if f"{schema_name}.{table_name}" in selected
+            }
+            for schema_name, schema_tables in schema_data.items()
+        }
+        schema_data = {schema_name: tables for schema_name, tables in schema_data.items() if tables}
+        relationships = {key: value for key, value in relationships.items() if key in selected}
+        statistics = {key: value for key, value in statistics.items() if key in selected}
+    if known_domains:
+        known_section = f"""
+The other tables of the database are already classified. Reuse these domain
+names (shown with example tables) where they fit, and add new domains only
+for tables that fit none of them:
+{canonical_json(known_domains)}
+"""
+    return layered_prompt(schema_data, f"""
+Table relationships:
+{canonical_json(relationships)}
 
-    Group the tables into logical domains (e.g., Patients, Encounters, Billing).
-    Consider:
-    1. Table relationships and dependencies
-    2. Common business processes
-    3. Data flow patterns
+Table statistics:
+{canonical_json(statistics)}
+{known_section}
+Analyze this database schema structure and identify conceptual domains.
 
-    Return a JSON object with:
-    1. "domains": List of identified domains
-    2. "table_mappings": Map of tables to domains
-    3. "relationships": Key relationships between domains
+Group the tables into logical domains (e.g., Patients, Encounters, Billing).
+Consider:
+1. Table relationships and dependencies
+2. Common business processes
+3. Data flow patterns
 
-    Format the response as valid JSON.
-    """
+Return a JSON object with:
+1. "domains": List of identified domains
+2. "table_mappings": Map of tables to domains
+3. "relationships": Key relationships between domains
 
-def generate_relationship_analysis_prompt(schema_data: Dict[str, Any]) -> str:
+Format the response as valid JSON.
+""")
+
+def generate_pattern_narration_prompt(
+    pattern_data: Dict[str, Any],
+    domain_data: Optional[Dict[str, Any]] = None,
+    statistics: Optional[Dict[str, Any]] = None
+) -> str:
     """
-    Generate a prompt for analyzing relationships between tables.
+    Generate a prompt asking for a short write-up of the structural analysis.
+    
+    The patterns themselves are computed locally (schema_patterns); only
+    their summary, the hub tables, key paths and hierarchy columns are
+    sent, not the catalog, so the prompt stays small at any catalog size.
     
     Args:
-        schema_data (Dict[str, Any]): The schema data to analyze
+        pattern_data (Dict[str, Any]): Result of schema_patterns.analyze_structure
+        domain_data (Optional[Dict[str, Any]]): Domain classification data
+        statistics (Optional[Dict[str, Any]]): Catalog statistics; only the
+            totals, domain rollups and hub tables are included
         
     Returns:
         str: The formatted prompt
     """
+    hubs = next((p["tables"] for p in pattern_data["patterns"] if p["type"] == "hub"), [])
+    cycles = next((p["components"] for p in pattern_data["patterns"] if p["type"] == "cycle"), [])
+    hierarchy_columns: Dict[str, int] = {}
+    for hierarchy in pattern_data["hierarchies"]:
+        hierarchy_columns[hierarchy["column"]] = hierarchy_columns.get(hierarchy["column"], 0) + 1
+    findings = {
+        "summary": pattern_data["summary"],
+        "hub_tables": hubs,
+        "key_paths": [{"tables": path["tables"], "frequency": path["frequency"]} for path in pattern_data["key_paths"]],
+        "hierarchy_columns": hierarchy_columns,
+        "largest_cycles": [cycle[:10] for cycle in cycles[:5]],
+        "domains": (domain_data or {}).get("domains", []),
+    }
+    statistics_section = f"""
+Catalog statistics (domain rollups and most referenced tables):
+{canonical_json(statistics_summary(statistics))}
+""" if statistics else ""
     return f"""
-    Analyze the relationships in this database schema:
-    {json.dumps(schema_data, indent=2)}
-
-    Identify:
-    1. Key data flow patterns
-    2. One-to-many relationships
-    3. Hierarchical structures
-    4. Common query paths
-
-    Return a JSON object with:
-    1. "patterns": Common data access patterns
-    2. "hierarchies": Identified hierarchical structures
-    3. "key_paths": Important query paths through the schema
-
-    Format the response as valid JSON.
-    """
+The structure of a healthcare database has been analyzed from its primary and
+foreign keys. The findings are exact:
+{canonical_json(findings)}
+{statistics_section}
+Write a short narrative (at most 300 words, Markdown) for data analysts: the
+central tables, how one-to-many chains and hierarchies organize the data, which
+join paths matter most and what the cycles and dependency depth imply for
+querying. Do not restate every number and do not invent tables.
+"""
 
-def parse_llm_json_response(response: str) -> Dict[str, Any]:
+def parse_llm_json_response(response: str) -> Any:
     """
     Parse JSON from LLM response, handling potential formatting issues.
     
@@ -173,7 +432,7 @@ def parse_llm_json_response(response: str) -> Dict[str, Any]:
         response (str): The LLM's response
         
     Returns:
-        Dict[str, Any]: Parsed JSON data
+        Any: Parsed JSON data (an object or a top-level array)
         
     Raises:
         ValueError: If JSON parsing fails
@@ -184,22 +443,6 @@ def parse_llm_json_response(response: str) -> Dict[str, Any]:
     except json.JSONDecodeError:
         pass
     
-    # Try to extract JSON from markdown code blocks
-    import re
-    json_match = re.search(r'```(?:json)?\s*(.*?)\s*```', response, re.DOTALL)
-    if json_match:
-        try:
-            return json.loads(json_match.group(1))
-        except json.JSONDecodeError:
-            pass
-    
-    # Try to find any JSON-like structure in the text
-    # This looks for content between curly braces, including nested structures
-    json_match = re.search(r'\{(?:[^{}]|(?R))*\}', response, re.DOTALL)
-    if json_match:
-        try:
-            return json.loads(json_match.group(0))
-        except json.JSONDecodeError:
-            pass
-    
-    raise ValueError("Could not find valid JSON in response: No JSON or code block found")
+    # Fall back to a linear scan for the largest embedded object or array.
+    # This covers markdown code blocks, surrounding prose and truncated output.
+    return extract_json(response)
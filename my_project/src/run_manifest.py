@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_MANIFEST = Path("outputs/run_manifest.json")
+MANIFEST_VERSION = 1
+
+
+def _atomic_write(path: Path, content: Any, mode: str, **open_args: Any) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, mode, **open_args) as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """
+    Write a text file so readers only ever see the old or the complete new content.
+
+    The data goes to a temporary file in the same directory, is flushed to
+    disk and then renamed over the target.
+
+    Args:
+        path (Path): Destination file
+        text (str): Content to write
+    """
+    _atomic_write(path, text, "w", encoding="utf-8")
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write a binary file atomically, like atomic_write_text"""
+    _atomic_write(path, data, "wb")
+
+
+def atomic_write_json(path: Path, data: Any) -> None:
+    """Write data as indented JSON with atomic_write_text"""
+    atomic_write_text(path, json.dumps(data, indent=2))
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class RunManifest:
+    """
+    Completion state and outputs of every pipeline stage and artifact.
+
+    Each entry records its status, the files it wrote with their hashes, and
+    the hashes of the files it was built from. An entry counts as complete
+    on resume only if its outputs are still intact and its inputs have not
+    changed since, so a rerun upstream stage invalidates everything built
+    from it.
+    """
+
+    def __init__(self, path: Path = DEFAULT_MANIFEST, data: Optional[Dict[str, Any]] = None):
+        self.path = Path(path)
+        self.data = data or {
+            "version": MANIFEST_VERSION,
+            "started_at": datetime.now().isoformat(),
+            "stages": {},
+            "artifacts": {}
+        }
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, path: Path = DEFAULT_MANIFEST, resume: bool = False) -> "RunManifest":
+        """
+        Start a new manifest, or continue the existing one when resuming.
+
+        Args:
+            path (Path): Manifest location
+            resume (bool): Keep the recorded state of a previous run
+
+        Returns:
+            RunManifest: The manifest; a new run's manifest is written immediately
+        """
+        path = Path(path)
+        if resume and path.exists():
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                data["resumed_at"] = datetime.now().isoformat()
+                manifest = cls(path, data)
+                manifest.save()
+                return manifest
+        manifest = cls(path)
+        manifest.save()
+        return manifest
+
+    def _digest(self, path: Path) -> Optional[str]:
+        """Cached content hash of a file, or None if it is missing"""
+        try:
+            stat = Path(path).stat()
+        except FileNotFoundError:
+            return None
+        key = (str(Path(path).absolute()), stat.st_mtime_ns, stat.st_size)
+        if key not in self._digests:
+            self._digests[key] = file_digest(path)
+        return self._digests[key]
+
+    def entry(self, kind: str, name: str) -> Dict[str, Any]:
+        return self.data[kind].get(name, {})
+
+    def is_complete(self, kind: str, name: str, depends_on: Optional[List[Path]] = None) -> bool:
+        """
+        Whether an entry can be skipped on resume.
+
+        Args:
+            kind (str): ``stages`` or ``artifacts``
+            name (str): Stage or artifact name
+            depends_on (Optional[List[Path]]): Files the entry is built from
+
+        Returns:
+            bool: True if it completed, its outputs are unchanged and its
+                inputs still match
+        """
+        entry = self.entry(kind, name)
+        if entry.get("status") != "complete":
+            return False
+        for output, digest in entry.get("outputs", {}).items():
+            if self._digest(Path(output)) != digest:
+                return False
+        expected = {str(path): self._digest(path) for path in depends_on or []}
+        return entry.get("depends_on", {}) == expected
+
+    def start(self, kind: str, name: str) -> None:
+        self._update(kind, name, status="running", started_at=datetime.now().isoformat())
+
+    def complete(
+        self,
+        kind: str,
+        name: str,
+        outputs: List[Path],
+        depends_on: Optional[List[Path]] = None,
+        **extra: Any
+    ) -> None:
+        """
+        Record an entry as complete.
+
+        Args:
+            kind (str): ``stages`` or ``artifacts``
+            name (str): Stage or artifact name
+            outputs (List[Path]): Files the entry wrote
+            depends_on (Optional[List[Path]]): Files the entry was built from
+            **extra: Additional attributes stored with the entry
+        """
+        self._update(
+            kind, name,
+            status="complete",
+            completed_at=datetime.now().isoformat(),
+            outputs={str(path): self._digest(path) for path in outputs},
+            depends_on={str(path): self._digest(path) for path in depends_on or []},
+            error=None,
+            **extra
+        )
+
+    def fail(self, kind: str, name: str, error: BaseException) -> None:
+        self._update(kind, name, status="failed", failed_at=datetime.now().isoformat(), error=str(error))
+
+    def reset(self, kind: str, names: Optional[List[str]] = None) -> None:
+        """
+        Forget recorded entries so they are redone.
+
+        Args:
+            kind (str): ``stages`` or ``artifacts``
+            names (Optional[List[str]]): Entries to forget, defaults to all
+        """
+        with self._lock:
+            for name in list(self.data[kind]) if names is None else names:
+                self.data[kind].pop(name, None)
+            atomic_write_json(self.path, self.data)
+
+    def pending(self, kind: str) -> List[str]:
+        """Names of entries that are not complete"""
+        return [name for name, entry in self.data[kind].items() if entry.get("status") != "complete"]
+
+    def _update(self, kind: str, name: str, **fields: Any) -> None:
+        with self._lock:
+            self.data[kind].setdefault(name, {}).update(fields)
+            self.data["updated_at"] = datetime.now().isoformat()
+            atomic_write_json(self.path, self.data)
+
+    def save(self) -> None:
+        with self._lock:
+            atomic_write_json(self.path, self.data)
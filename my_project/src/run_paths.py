@@ -0,0 +1,360 @@
+import json
+import os
+import secrets
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from run_manifest import RunManifest, atomic_write_json, atomic_write_text
+
+# Runs live in <output_dir>/runs/<run id>; <output_dir>/latest points at the
+# last one that finished
+RUNS_DIR = "runs"
+LATEST = "latest"
+# Written into a run directory when the process working on the run exits
+FINISHED = "finished"
+
+
+def new_run_id() -> str:
+    """Sortable UTC start time plus a random suffix, e.g. 20261019T081502Z-3f9a1c"""
+    return f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}-{secrets.token_hex(3)}"
+
+
+def check_run_id(run_id: str) -> str:
+    """Return run_id if it can name a run directory, else raise ValueError"""
+    if not run_id or run_id.startswith(".") or Path(run_id).name != run_id:
+        raise ValueError(f"Invalid run ID {run_id!r}: use a plain directory name")
+    return run_id
+
+
+class RunInProgressError(Exception):
+    """A run has no finished marker, so another process may still be working on it"""
+
+    def __init__(self, paths: "RunPaths"):
+        super().__init__(
+            f"Run {paths.run_id} is still in progress in another process; if that process was killed, "
+            f"create {paths.run_dir / FINISHED} and try again"
+        )
+
+
+def _link_or_copy(source: str, target: str) -> None:
+    """Hard link a file, copying it where links are not supported"""
+    if source.endswith(".db"):
+        # SQLite files are written in place, so a link would share later writes
+        shutil.copy2(source, target)
+        return
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+class RunPaths:
+    """
+    Input and output locations of one pipeline run.
+
+    With a run ID, the run's intermediate results, diagrams, logs and
+    manifest go to ``<output_dir>/runs/<run id>/``, so any number of runs can
+    share an output directory; ``<output_dir>/latest`` is switched to a run
+    once it finishes. Without one, the run writes straight into
+    ``output_dir`` (the layout before run directories).
+    """
+
+    def __init__(self, data_dir: Path = Path("data"), output_dir: Path = Path("outputs"), run_id: Optional[str] = None):
+        """
+        Initialize the run layout.
+
+        Args:
+            data_dir (Path): Directory containing schema_tables.csv and
+                schema_columns.csv
+            output_dir (Path): Root of the run directories and the latest
+                pointer
+            run_id (Optional[str]): Run directory name under
+                ``<output_dir>/runs``
+        """
+        self.data_dir = Path(data_dir)
+        self.output_dir = Path(output_dir)
+        self.run_id = check_run_id(run_id) if run_id is not None else None
+
+    @classmethod
+    def create(cls, data_dir: Path, output_dir: Path, run_id: Optional[str] = None) -> "RunPaths":
+        """
+        Start a new run directory.
+
+        Args:
+            data_dir (Path): Catalog directory
+            output_dir (Path): Root of the run directories
+            run_id (Optional[str]): Name of the run, generated if not given
+
+        Returns:
+            RunPaths: The new run
+
+        Raises:
+            FileExistsError: If a run with the given ID already exists
+        """
+        runs_dir = Path(output_dir) / RUNS_DIR
+        runs_dir.mkdir(parents=True, exist_ok=True)
+        while True:
+            paths = cls(data_dir, output_dir, run_id or new_run_id())
+            try:
+                # Claiming the directory is atomic, so concurrent runs never share one
+                paths.run_dir.mkdir()
+                return paths
+            except FileExistsError:
+                if run_id:
+                    raise FileExistsError(f"Run {run_id} already exists in {runs_dir}") from None
+
+    @classmethod
+    def latest(cls, data_dir: Path, output_dir: Path) -> Optional["RunPaths"]:
+        """The run the latest pointer refers to, or None if no run has finished"""
+        pointer = Path(output_dir) / LATEST
+        try:
+            target = os.readlink(pointer) if pointer.is_symlink() else pointer.read_text(encoding="utf-8").strip()
+        except (FileNotFoundError, IsADirectoryError):
+            return None
+        paths = cls(data_dir, output_dir, Path(target).name)
+        return paths if paths.run_dir.is_dir() else None
+
+    @classmethod
+    def claim_last_finished(cls, data_dir: Path, output_dir: Path) -> Optional["RunPaths"]:
+        """
+        Take up the most recently finished run again, e.g. to resume it.
+
+        Runs still being worked on have no finished marker and are skipped,
+        as are runs that were claimed by another process first.
+
+        Returns:
+            Optional[RunPaths]: The claimed run, or None if no run has finished
+        """
+        runs_dir = Path(output_dir) / RUNS_DIR
+        if not runs_dir.is_dir():
+            return None
+        finished = []
+        for path in runs_dir.iterdir():
+            try:
+                finished.append((path.joinpath(FINISHED).stat().st_mtime_ns, path.name))
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+        for _, name in sorted(finished, reverse=True):
+            if name.startswith("."):
+                continue
+            paths = cls(data_dir, output_dir, name)
+            if paths.claim():
+                return paths
+        return None
+
+    def claim(self) -> bool:
+        """
+        Mark the run as being worked on again.
+
+        Removing the finished marker is atomic, so of several processes
+        claiming the same run only one succeeds.
+
+        Returns:
+            bool: Whether the run was finished and is now claimed
+        """
+        try:
+            (self.run_dir / FINISHED).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def finish(self) -> None:
+        """Mark the run as no longer worked on, whether it succeeded or not"""
+        if self.run_id is not None and self.run_dir.is_dir():
+            atomic_write_text(self.run_dir / FINISHED, datetime.now(timezone.utc).isoformat())
+
+    def pending_artifacts(self) -> List[str]:
+        """Artifacts the run's manifest records as failed or unfinished"""
+        if not self.manifest.exists():
+            return []
+        with open(self.manifest, encoding="utf-8") as f:
+            return RunManifest(self.manifest, json.load(f)).pending("artifacts")
+
+    def publish(self) -> bool:
+        """
+        Point ``<output_dir>/latest`` at this run, unless artifacts are pending.
+
+        The pointer is a relative symlink, or a file holding the run ID where
+        symlinks are not available, and is replaced atomically, so readers
+        see either the previous run or this one. A run with failed or
+        unfinished artifacts is never published.
+
+        Returns:
+            bool: Whether latest now points at this run
+        """
+        if self.run_id is None or self.pending_artifacts():
+            return False
+        pointer = self.output_dir / LATEST
+        tmp_path = pointer.with_name(f".{LATEST}.{os.getpid()}.{secrets.token_hex(4)}.tmp")
+        try:
+            os.symlink(Path(RUNS_DIR) / self.run_id, tmp_path, target_is_directory=True)
+        except OSError:
+            tmp_path.write_text(self.run_id, encoding="utf-8")
+        try:
+            os.replace(tmp_path, pointer)
+        finally:
+            if tmp_path.is_symlink() or tmp_path.exists():
+                tmp_path.unlink()
+        return True
+
+    def fork(self, target: "RunPaths") -> None:
+        """
+        Seed another run with this run's intermediate results, diagrams and manifest.
+
+        Files are hard linked where possible. Every artifact is replaced by
+        rename rather than rewritten in place, so later writes in either run
+        never show up in the other; the SQLite catalog store, which is
+        written in place, is copied. Manifest entries are moved to the new
+        run directory so they stay complete there.
+
+        Args:
+            target (RunPaths): The new run
+        """
+        for name in ("intermediate", "final"):
+            source = self.run_dir / name
+            if source.is_dir():
+                shutil.copytree(source, target.run_dir / name, copy_function=_link_or_copy, dirs_exist_ok=True)
+        if not self.manifest.exists():
+            return
+        with open(self.manifest, encoding="utf-8") as f:
+            data = json.load(f)
+        old_root = str(self.run_dir) + os.sep
+        new_root = str(target.run_dir) + os.sep
+
+        def rebase(files: Dict[str, Any]) -> Dict[str, Any]:
+            return {
+                new_root + path[len(old_root):] if path.startswith(old_root) else path: digest
+                for path, digest in files.items()
+            }
+
+        for kind in ("stages", "artifacts"):
+            for entry in data.get(kind, {}).values():
+                for field in ("outputs", "depends_on"):
+                    if field in entry:
+                        entry[field] = rebase(entry[field])
+        data["forked_from"] = self.run_id
+        atomic_write_json(target.manifest, data)
+
+    @property
+    def run_dir(self) -> Path:
+        """Directory holding everything this run writes"""
+        return self.output_dir / RUNS_DIR / self.run_id if self.run_id else self.output_dir
+
+    @property
+    def tables_csv(self) -> Path:
+        return self.data_dir / "schema_tables.csv"
+
+    @property
+    def columns_csv(self) -> Path:
+        return self.data_dir / "schema_columns.csv"
+
+    @property
+    def table_descriptions(self) -> Path:
+        """Optional export with CATEGORY and DataModel per table"""
+        return self.data_dir / "data-view-metadata-tabledescriptions.csv"
+
+    @property
+    def intermediate_dir(self) -> Path:
+        return self.run_dir / "intermediate"
+
+    @property
+    def final_dir(self) -> Path:
+        return self.run_dir / "final"
+
+    @property
+    def logs_dir(self) -> Path:
+        return self.run_dir / "logs"
+
+    @property
+    def manifest(self) -> Path:
+        return self.run_dir / "run_manifest.json"
+
+    @property
+    def activity_log(self) -> Path:
+        return self.logs_dir / "activity_log.jsonl"
+
+    @property
+    def processed(self) -> Path:
+        return self.intermediate_dir / "processed_schema_data.json"
+
+    @property
+    def catalog_store(self) -> Path:
+        """SQLite catalog of the out-of-core mode (CATALOG_STORE=on)"""
+        return self.intermediate_dir / "catalog_store.db"
+
+    @property
+    def domain(self) -> Path:
+        return self.intermediate_dir / "domain_analysis.json"
+
+    @property
+    def domain_classification(self) -> Path:
+        return self.intermediate_dir / "domain_classification.json"
+
+    @property
+    def statistics(self) -> Path:
+        return self.intermediate_dir / "catalog_statistics.json"
+
+    @property
+    def pattern(self) -> Path:
+        return self.intermediate_dir / "pattern_analysis.json"
+
+    @property
+    def search_index(self) -> Path:
+        return self.intermediate_dir / "search_index.npz"
+
+    @property
+    def join_paths(self) -> Path:
+        return self.intermediate_dir / "join_paths.json"
+
+    @property
+    def release_diff(self) -> Path:
+        return self.intermediate_dir / "release_diff.json"
+
+    @property
+    def scopes_dir(self) -> Path:
+        return self.intermediate_dir / "artifact_scopes"
+
+    def artifact_scope(self, key: str) -> Path:
+        return self.scopes_dir / f"{key}.json"
+
+    def __repr__(self) -> str:
+        return (
+            f"RunPaths(data_dir={str(self.data_dir)!r}, output_dir={str(self.output_dir)!r}, "
+            f"run_id={self.run_id!r})"
+        )
+
+
+def open_run(data_dir: Path, output_dir: Path, run_id: Optional[str] = None, resume: bool = False) -> RunPaths:
+    """
+    The run a pipeline invocation writes to.
+
+    Args:
+        data_dir (Path): Catalog directory
+        output_dir (Path): Root of the run directories
+        run_id (Optional[str]): Run to create, or with ``resume`` the run to
+            continue
+        resume (bool): Continue an existing run, by default the most
+            recently finished one (runs still in progress are never picked);
+            a new run is started if there is none
+
+    Returns:
+        RunPaths: The run; call ``finish`` on it when done
+
+    Raises:
+        FileNotFoundError: If the run to resume does not exist
+        RunInProgressError: If the run to resume has not finished
+    """
+    if resume:
+        if run_id:
+            paths = RunPaths(data_dir, output_dir, run_id)
+            if not paths.run_dir.is_dir():
+                raise FileNotFoundError(f"Run {run_id} not found in {paths.output_dir / RUNS_DIR}")
+            if not paths.claim():
+                raise RunInProgressError(paths)
+            return paths
+        previous = RunPaths.claim_last_finished(data_dir, output_dir)
+        if previous is not None:
+            return previous
+    return RunPaths.create(data_dir, output_dir, run_id)
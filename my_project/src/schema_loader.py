@@ -1,6 +1,21 @@
 import csv
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import TYPE_CHECKING, Dict, Iterator, List, Any, Optional, Set, Tuple
+
+from csv_chunks import parse_chunk, split_csv
+
+if TYPE_CHECKING:
+    from catalog_store import SQLiteCatalog
+
+# Below this size the process start-up costs more than parallel parsing saves
+MIN_PARALLEL_BYTES = 32 * 1024 * 1024
+
+TABLE_REQUIRED_FIELDS = ['schema_name', 'table_name']
+COLUMN_REQUIRED_FIELDS = ['schema_name', 'table_name', 'column_name']
 
 class SchemaLoadError(Exception):
     """Custom exception for schema loading errors"""
@@ -18,12 +33,60 @@ def validate_csv_headers(reader: csv.DictReader, required_fields: List[str], fil
     Raises:
         SchemaLoadError: If required headers are missing
     """
-    missing_fields = [field for field in required_fields if field not in reader.fieldnames]
+    _check_headers(reader.fieldnames, required_fields, file_path)
+
+def _check_headers(fieldnames: List[str], required_fields: List[str], file_path: str) -> None:
+    missing_fields = [field for field in required_fields if field not in fieldnames]
     if missing_fields:
         raise SchemaLoadError(
             f"Missing required fields in {file_path}: {', '.join(missing_fields)}"
         )
 
+def _check_row(row: Dict[str, Any], required_fields: List[str], file_path: Path) -> None:
+    """Raise SchemaLoadError if a required field of the row is empty"""
+    if not all(row.get(field) for field in required_fields):
+        raise SchemaLoadError(
+            f"Missing values for required fields in {file_path}, "
+            f"row: {row}"
+        )
+
+def _read_rows(file_path: Path, required_fields: List[str]) -> List[Dict[str, Any]]:
+    """
+    Read and validate every row of a CSV file.
+    
+    Values are dictionary-encoded: equal values share one string object, so
+    the schema and table names, types, flags and descriptions that repeat
+    on every table (CONTEXTID, CONTEXTNAME, audit columns) are held once.
+    """
+    rows = []
+    shared: Dict[str, str] = {}
+    intern = shared.setdefault
+    with open(file_path, 'r', newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        validate_csv_headers(reader, required_fields, str(file_path))
+        for row in reader:
+            # Validate required fields have values
+            _check_row(row, required_fields, file_path)
+            for field, value in row.items():
+                if isinstance(value, str):
+                    row[field] = intern(value, value)
+            rows.append(row)
+    return rows
+
+def _structure_tables(tables: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Create the schema and table structure with descriptions and empty column lists"""
+    schema_dict: Dict[str, Dict[str, Any]] = {}
+    for t in tables:
+        schema_name = t['schema_name']
+        table_name = t['table_name']
+        if schema_name not in schema_dict:
+            schema_dict[schema_name] = {}
+        schema_dict[schema_name][table_name] = {
+            'description': t.get('table_description', ''),
+            'columns': []
+        }
+    return schema_dict
+
 def load_schema_data(tables_file: Path, columns_file: Path) -> Dict[str, Dict[str, Any]]:
     """
     Load schema metadata from CSV files and structure it into a nested dictionary.
@@ -41,60 +104,19 @@ def load_schema_data(tables_file: Path, columns_file: Path) -> Dict[str, Dict[st
     Raises:
         SchemaLoadError: If there are issues with CSV files or data validation
     """
-    # Required fields for validation
-    table_required_fields = ['schema_name', 'table_name']
-    column_required_fields = ['schema_name', 'table_name', 'column_name']
-    
     try:
-        # Load tables
-        tables = []
-        with open(tables_file, 'r', newline='', encoding='utf-8-sig') as f:
-            reader = csv.DictReader(f)
-            validate_csv_headers(reader, table_required_fields, str(tables_file))
-            for row in reader:
-                # Validate required fields have values
-                if not all(row.get(field) for field in table_required_fields):
-                    raise SchemaLoadError(
-                        f"Missing values for required fields in {tables_file}, "
-                        f"row: {row}"
-                    )
-                tables.append(row)
-
+        tables = _read_rows(tables_file, TABLE_REQUIRED_FIELDS)
         if not tables:
             raise SchemaLoadError(f"No data found in tables file: {tables_file}")
 
-        # Load columns
-        columns = []
-        with open(columns_file, 'r', newline='', encoding='utf-8-sig') as f:
-            reader = csv.DictReader(f)
-            validate_csv_headers(reader, column_required_fields, str(columns_file))
-            for row in reader:
-                # Validate required fields have values
-                if not all(row.get(field) for field in column_required_fields):
-                    raise SchemaLoadError(
-                        f"Missing values for required fields in {columns_file}, "
-                        f"row: {row}"
-                    )
-                columns.append(row)
-
+        columns = _read_rows(columns_file, COLUMN_REQUIRED_FIELDS)
         if not columns:
             raise SchemaLoadError(f"No data found in columns file: {columns_file}")
 
         # Structure data by schema and table
-        schema_dict: Dict[str, Dict[str, Any]] = {}
-        
-        # First pass: Create schema and table structure with descriptions
-        for t in tables:
-            schema_name = t['schema_name']
-            table_name = t['table_name']
-            if schema_name not in schema_dict:
-                schema_dict[schema_name] = {}
-            schema_dict[schema_name][table_name] = {
-                'description': t.get('table_description', ''),
-                'columns': []
-            }
+        schema_dict = _structure_tables(tables)
 
-        # Second pass: Add columns to their respective tables
+        # Add columns to their respective tables
         orphaned_columns = []
         for c in columns:
             schema_name = c['schema_name']
@@ -120,6 +142,122 @@ def load_schema_data(tables_file: Path, columns_file: Path) -> Dict[str, Dict[st
     except UnicodeDecodeError as e:
         raise SchemaLoadError(f"File encoding error: {str(e)}")
 
+# Table keys of the catalog being loaded, set once per worker process
+_worker_table_keys: Set[Tuple[str, str]] = set()
+
+def _init_column_worker(table_keys: Set[Tuple[str, str]]) -> None:
+    global _worker_table_keys
+    _worker_table_keys = table_keys
+
+def _load_column_chunk(
+    columns_file: Path,
+    start: int,
+    end: int,
+    fieldnames: List[str]
+) -> Tuple[Dict[Tuple[str, str], List[Dict[str, Any]]], List[str], int]:
+    """
+    Parse and group one byte range of the columns file in a worker process.
+    
+    Returns:
+        Tuple: Columns grouped by (schema, table) in file order, orphaned
+            column names in file order, and the number of rows parsed
+    """
+    groups: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    orphaned_columns = []
+    rows = parse_chunk(columns_file, start, end, fieldnames)
+    for c in rows:
+        _check_row(c, COLUMN_REQUIRED_FIELDS, columns_file)
+        key = (c['schema_name'], c['table_name'])
+        if key in _worker_table_keys:
+            groups.setdefault(key, []).append(c)
+        else:
+            orphaned_columns.append(f"{key[0]}.{key[1]}.{c['column_name']}")
+    return groups, orphaned_columns, len(rows)
+
+def load_schema_data_parallel(
+    tables_file: Path,
+    columns_file: Path,
+    workers: Optional[int] = None,
+    min_parallel_bytes: int = MIN_PARALLEL_BYTES
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Load schema metadata like load_schema_data, parsing the columns file in parallel.
+    
+    The columns file is split into byte ranges on record boundaries outside
+    quoted fields (see csv_chunks.split_csv). Worker processes parse the
+    ranges and group their rows by table, and the partial results are merged
+    in file order, so the result and any SchemaLoadError are the same as
+    load_schema_data's. The tables file, one row per table, is read serially.
+    
+    Args:
+        tables_file (Path): Path to the CSV file containing table metadata
+        columns_file (Path): Path to the CSV file containing column metadata
+        workers (Optional[int]): Worker processes, defaults to the CPU count
+        min_parallel_bytes (int): Columns files smaller than this are parsed
+            serially
+    
+    Returns:
+        Dict[str, Dict[str, Any]]: Same structure as load_schema_data
+            
+    Raises:
+        SchemaLoadError: If there are issues with CSV files or data validation
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or Path(columns_file).stat().st_size < min_parallel_bytes:
+        return load_schema_data(tables_file, columns_file)
+
+    try:
+        tables = _read_rows(tables_file, TABLE_REQUIRED_FIELDS)
+        if not tables:
+            raise SchemaLoadError(f"No data found in tables file: {tables_file}")
+        schema_dict = _structure_tables(tables)
+
+        # A few chunks per worker so one slow chunk does not hold up the rest
+        fieldnames, ranges = split_csv(columns_file, workers * 4)
+        if fieldnames is None:
+            return load_schema_data(tables_file, columns_file)
+        _check_headers(fieldnames, COLUMN_REQUIRED_FIELDS, str(columns_file))
+
+        table_keys = {(schema, table) for schema, tables in schema_dict.items() for table in tables}
+        # Spawn rather than fork: the caller may already run logger threads
+        context = multiprocessing.get_context("spawn")
+        orphaned_columns = []
+        total_rows = 0
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(ranges)) or 1, mp_context=context,
+            initializer=_init_column_worker, initargs=(table_keys,)
+        ) as pool:
+            # map yields in chunk order, so the first error raised is the first in the file
+            for groups, orphans, count in pool.map(
+                _load_column_chunk,
+                [columns_file] * len(ranges),
+                [start for start, _ in ranges],
+                [end for _, end in ranges],
+                [fieldnames] * len(ranges)
+            ):
+                for (schema_name, table_name), columns in groups.items():
+                    schema_dict[schema_name][table_name]['columns'].extend(columns)
+                orphaned_columns.extend(orphans)
+                total_rows += count
+
+        if not total_rows:
+            raise SchemaLoadError(f"No data found in columns file: {columns_file}")
+        if orphaned_columns:
+            raise SchemaLoadError(
+                "Found columns referencing non-existent tables:\n" +
+                "\n".join(orphaned_columns)
+            )
+
+        return schema_dict
+
+    except BrokenProcessPool:
+        # Workers could not start (e.g. no importable __main__); parse serially
+        return load_schema_data(tables_file, columns_file)
+    except csv.Error as e:
+        raise SchemaLoadError(f"CSV parsing error: {str(e)}")
+    except UnicodeDecodeError as e:
+        raise SchemaLoadError(f"File encoding error: {str(e)}")
+
 def analyze_relationships(schema_dict: Dict[str, Dict[str, Any]]) -> Dict[str, List[Dict[str, str]]]:
     """
     Analyze relationships between tables based on foreign key information.
@@ -194,3 +332,121 @@ def get_table_statistics(schema_dict: Dict[str, Dict[str, Any]]) -> Dict[str, Di
             }
     
     return stats
+
+# Rows written to the catalog store per executemany call
+STORE_BATCH_ROWS = 2_000
+
+def _stream_rows(file_path: Path, required_fields: List[str]) -> Iterator[List[Dict[str, Any]]]:
+    """Validated rows of a CSV file, a batch at a time"""
+    with open(file_path, 'r', newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        validate_csv_headers(reader, required_fields, str(file_path))
+        batch = []
+        for row in reader:
+            _check_row(row, required_fields, file_path)
+            batch.append(row)
+            if len(batch) == STORE_BATCH_ROWS:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+def stream_schema_data(tables_file: Path, columns_file: Path, db_path: Path) -> "SQLiteCatalog":
+    """
+    Load schema metadata into a SQLite catalog store instead of memory.
+    
+    Rows are streamed from the CSV files into the ``tables`` and ``columns``
+    tables of the metadata server's schema in one transaction, so memory
+    use does not grow with the catalog and a failed load leaves the store
+    as it was. Tables missing from the files are removed; the categories
+    and data models of the remaining tables are kept. The result reads like
+    load_schema_data's dict (see catalog_store.SQLiteCatalog), and the
+    metadata server can serve the same file.
+    
+    Args:
+        tables_file (Path): Path to the CSV file containing table metadata
+        columns_file (Path): Path to the CSV file containing column metadata
+        db_path (Path): SQLite file to load into, created if missing
+    
+    Returns:
+        SQLiteCatalog: Read-only view of the loaded catalog
+            
+    Raises:
+        SchemaLoadError: If there are issues with CSV files or data validation
+    """
+    from catalog_store import SQLiteCatalog
+    from sqlite_mcp_server import SQLiteMetadataServer
+
+    server = SQLiteMetadataServer(str(db_path))
+    conn = server.conn
+    try:
+        with conn:
+            # Reinserting tables keeps them in file order; classifications survive the reload
+            conn.execute("DROP TABLE IF EXISTS temp.kept_tables")
+            conn.execute("""
+                CREATE TEMP TABLE kept_tables AS
+                SELECT schema_name, table_name, category, data_model FROM tables
+                WHERE category IS NOT NULL OR data_model IS NOT NULL
+            """)
+            conn.execute("DELETE FROM columns")
+            conn.execute("DELETE FROM tables")
+
+            table_rows = 0
+            for batch in _stream_rows(tables_file, TABLE_REQUIRED_FIELDS):
+                conn.executemany("""
+                    INSERT INTO tables (schema_name, table_name, description) VALUES (?, ?, ?)
+                    ON CONFLICT (schema_name, table_name) DO UPDATE SET description = excluded.description
+                """, [(t['schema_name'], t['table_name'], t.get('table_description', '')) for t in batch])
+                table_rows += len(batch)
+            if not table_rows:
+                raise SchemaLoadError(f"No data found in tables file: {tables_file}")
+
+            column_rows = 0
+            for batch in _stream_rows(columns_file, COLUMN_REQUIRED_FIELDS):
+                conn.executemany(
+                    "INSERT OR REPLACE INTO columns VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(
+                        c['schema_name'], c['table_name'], c['column_name'], c.get('data_type'),
+                        c.get('is_primary_key') == 'true', c.get('is_foreign_key') == 'true',
+                        c.get('references_schema') or None, c.get('references_table') or None,
+                        c.get('references_column') or None, c.get('description')
+                    ) for c in batch]
+                )
+                column_rows += len(batch)
+            if not column_rows:
+                raise SchemaLoadError(f"No data found in columns file: {columns_file}")
+
+            orphaned_columns = [f"{row[0]}.{row[1]}.{row[2]}" for row in conn.execute("""
+                SELECT c.schema_name, c.table_name, c.column_name FROM columns c
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM tables t WHERE t.schema_name = c.schema_name AND t.table_name = c.table_name
+                )
+                ORDER BY c.rowid
+            """)]
+            if orphaned_columns:
+                raise SchemaLoadError(
+                    "Found columns referencing non-existent tables:\n" +
+                    "\n".join(orphaned_columns)
+                )
+
+            conn.execute("""
+                UPDATE tables SET category = k.category, data_model = k.data_model
+                FROM kept_tables k
+                WHERE tables.schema_name = k.schema_name AND tables.table_name = k.table_name
+            """)
+            conn.execute("""
+                DELETE FROM table_domains WHERE NOT EXISTS (
+                    SELECT 1 FROM tables t
+                    WHERE t.schema_name = table_domains.schema_name AND t.table_name = table_domains.table_name
+                )
+            """)
+            conn.execute("DROP TABLE kept_tables")
+            server.refresh_materialized()
+    except csv.Error as e:
+        raise SchemaLoadError(f"CSV parsing error: {str(e)}")
+    except UnicodeDecodeError as e:
+        raise SchemaLoadError(f"File encoding error: {str(e)}")
+    finally:
+        conn.close()
+
+    return SQLiteCatalog(Path(db_path))
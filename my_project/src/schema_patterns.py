@@ -0,0 +1,260 @@
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set
+
+from join_paths import JoinPlanner
+
+# Multi-hop sub-paths reported as key paths, and the longest counted
+DEFAULT_KEY_PATHS = 20
+MAX_KEY_PATH_HOPS = 3
+# Most referenced tables listed under the hub pattern
+HUB_TABLES = 10
+
+
+def _primary_keys(schema_data: Dict[str, Dict[str, Any]]) -> Dict[str, Set[str]]:
+    """Primary key columns of every table"""
+    return {
+        f"{schema_name}.{table_name}": {
+            column["column_name"] for column in table["columns"] if column.get("is_primary_key") == "true"
+        }
+        for schema_name, tables in schema_data.items()
+        for table_name, table in tables.items()
+    }
+
+
+def _strongly_connected(tables: List[str], parents: Dict[str, List[str]]) -> List[List[str]]:
+    """
+    Strongly connected components of the child -> parent graph (Tarjan).
+
+    Iterative, so long reference chains cannot exhaust the stack. Components
+    come out in reverse topological order: every component a table
+    references is emitted before the table's own.
+    """
+    index: Dict[str, int] = {}
+    low: Dict[str, int] = {}
+    stack: List[str] = []
+    on_stack: Set[str] = set()
+    components = []
+    for root in tables:
+        if root in index:
+            continue
+        work = [(root, iter(parents.get(root, ())))]
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            table, neighbours = work[-1]
+            for parent in neighbours:
+                if parent not in index:
+                    index[parent] = low[parent] = len(index)
+                    stack.append(parent)
+                    on_stack.add(parent)
+                    work.append((parent, iter(parents.get(parent, ()))))
+                    break
+                if parent in on_stack:
+                    low[table] = min(low[table], index[parent])
+            else:
+                work.pop()
+                if work:
+                    low[work[-1][0]] = min(low[work[-1][0]], low[table])
+                if low[table] == index[table]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == table:
+                            break
+                    components.append(sorted(component))
+    return components
+
+
+def _frequent_paths(planner: JoinPlanner, count: int, max_hops: int) -> List[Dict[str, Any]]:
+    """
+    Multi-hop foreign key chains shared by the most hub shortest paths.
+
+    Every precomputed shortest path from a hub table is cut into its
+    contiguous runs of 2 to ``max_hops`` joins that all follow their foreign
+    keys the same way (child to parent to grandparent, or back down), so
+    each run is a chain of lookups rather than a detour through whichever
+    child table happens to reference both ends. A run's frequency is the
+    number of hub-to-table paths it lies on; a run and its reverse count as
+    one chain.
+    """
+    frequency: Counter = Counter()
+    for hub, targets in planner.hub_paths.items():
+        for edges in targets.values():
+            if len(edges) < 2:
+                continue
+            # Whether each join goes from the foreign key table to the referenced one
+            upward = []
+            table = hub
+            for edge in edges:
+                fk_table, _, ref_table, _ = planner.edges[edge]
+                upward.append(table == fk_table)
+                table = ref_table if table == fk_table else fk_table
+            for hops in range(2, min(max_hops, len(edges)) + 1):
+                for start in range(len(edges) - hops + 1):
+                    if len(set(upward[start:start + hops])) > 1:
+                        continue
+                    run = tuple(edges[start:start + hops])
+                    frequency[min(run, run[::-1])] += 1
+
+    key_paths = []
+    for run, seen in sorted(frequency.items(), key=lambda item: (-item[1], item[0]))[:count]:
+        # Written from the child end: each join's referenced table has the next foreign key
+        if planner.edges[run[0]][2] != planner.edges[run[1]][0]:
+            run = run[::-1]
+        source = planner.edges[run[0]][0]
+        key_paths.append({**planner.describe(source, list(run)), "frequency": seen})
+    return key_paths
+
+
+def analyze_structure(
+    schema_data: Dict[str, Dict[str, Any]],
+    relationships: Dict[str, List[Dict[str, str]]],
+    join_planner: Optional[JoinPlanner] = None,
+    key_paths: int = DEFAULT_KEY_PATHS
+) -> Dict[str, Any]:
+    """
+    Find the structural patterns of the catalog from its keys alone.
+
+    Foreign keys are classified by cardinality: one-to-one when the foreign
+    key column is the whole primary key of its table, one-to-many when it
+    references a primary key column, and unknown otherwise (a reference to
+    a non-key column). Tables whose primary key includes foreign keys to
+    two or more other tables are association (many-to-many) tables. Foreign
+    keys to their own table are hierarchies. Strongly connected components
+    of more than one table are reference cycles, and layering the graph of
+    components gives each table its dependency depth (0: references no
+    other table). Key paths are the most frequent multi-hop join chains
+    (see ``_frequent_paths``). No LLM is involved and the result is the
+    same on every run.
+
+    Args:
+        schema_data (Dict[str, Dict[str, Any]]): The structured schema data
+        relationships (Dict[str, List[Dict[str, str]]]): Foreign keys per
+            table, from ``schema_loader.analyze_relationships``
+        join_planner (Optional[JoinPlanner]): Planner with hub paths, built
+            from the relationships if not given
+        key_paths (int): Multi-hop paths to report
+
+    Returns:
+        Dict[str, Any]: ``patterns``, ``hierarchies`` and ``key_paths``, the
+            structure of the LLM pattern analysis, plus a ``summary`` of counts
+    """
+    primary_keys = _primary_keys(schema_data)
+    tables = sorted(relationships)
+    parents: Dict[str, List[str]] = {table: [] for table in tables}
+    references_in: Counter = Counter()
+    cardinality: Dict[str, List[Dict[str, str]]] = {"one_to_many": [], "one_to_one": [], "unknown": []}
+    hierarchies = []
+    association = []
+
+    for table in tables:
+        keys = primary_keys.get(table, set())
+        linked = set()
+        for reference in relationships[table]:
+            parent = f"{reference['to_schema']}.{reference['to_table']}"
+            if parent == table:
+                hierarchies.append({
+                    "table": table, "column": reference["from_column"], "parent_column": reference["to_column"]
+                })
+                continue
+            if parent not in parents[table]:
+                parents[table].append(parent)
+            references_in[parent] += 1
+            edge = {
+                "parent": parent, "parent_column": reference["to_column"],
+                "child": table, "child_column": reference["from_column"],
+            }
+            if keys == {reference["from_column"]}:
+                cardinality["one_to_one"].append(edge)
+            elif reference["to_column"] in primary_keys.get(parent, set()):
+                cardinality["one_to_many"].append(edge)
+            else:
+                cardinality["unknown"].append(edge)
+            if reference["from_column"] in keys:
+                linked.add(parent)
+        if len(linked) >= 2:
+            association.append({"table": table, "links": sorted(linked)})
+
+    components = _strongly_connected(tables, parents)
+    component_of = {table: number for number, component in enumerate(components) for table in component}
+    depth: Dict[int, int] = {}
+    for number, component in enumerate(components):
+        # Referenced components come first, so their depth is already known
+        depth[number] = max(
+            (depth[component_of[parent]] + 1 for table in component for parent in parents[table]
+             if component_of[parent] != number),
+            default=0
+        )
+    layers: Dict[int, List[str]] = {}
+    for table in tables:
+        layers.setdefault(depth[component_of[table]], []).append(table)
+    cycles = sorted((component for component in components if len(component) > 1), key=lambda c: (-len(c), c))
+
+    hubs = sorted(references_in.items(), key=lambda item: (-item[1], item[0]))[:HUB_TABLES]
+    patterns: List[Dict[str, Any]] = [{
+        "name": "Hub tables",
+        "type": "hub",
+        "description": "Tables referenced by the most foreign keys; most joins pass through them",
+        "tables": [{"table": table, "references_in": count, "references_out": len(parents[table])}
+                   for table, count in hubs],
+    }]
+    for kind, name, description in [
+        ("one_to_many", "One-to-many relationships", "Child rows reference the primary key of one parent row"),
+        ("one_to_one", "One-to-one extensions", "The foreign key is the child table's whole primary key"),
+        ("unknown", "Non-key references", "The referenced column is not a primary key; cardinality is unknown"),
+    ]:
+        if cardinality[kind]:
+            edges = sorted(cardinality[kind], key=lambda e: (e["parent"], e["child"], e["child_column"]))
+            patterns.append({
+                "name": name, "type": kind, "description": description,
+                "count": len(edges), "relationships": edges,
+            })
+    if association:
+        patterns.append({
+            "name": "Association tables",
+            "type": "many_to_many",
+            "description": "Primary keys made of foreign keys to several tables link those tables many-to-many",
+            "count": len(association),
+            "tables": association,
+        })
+    patterns.append({
+        "name": "Dependency layers",
+        "type": "layering",
+        "description": "Depth 0 tables reference no other table; each table is one deeper than its deepest parent",
+        "depth": max(layers, default=0),
+        "layers": [{"depth": level, "tables": layers[level]} for level in sorted(layers)],
+    })
+    if cycles:
+        patterns.append({
+            "name": "Reference cycles",
+            "type": "cycle",
+            "description": "Tables that reference each other directly or through other tables",
+            "count": len(cycles),
+            "components": cycles,
+        })
+
+    if join_planner is None:
+        join_planner = JoinPlanner.from_relationships(relationships)
+        join_planner.precompute_hubs()
+    frequent = _frequent_paths(join_planner, key_paths, MAX_KEY_PATH_HOPS)
+
+    return {
+        "patterns": patterns,
+        "hierarchies": hierarchies,
+        "key_paths": frequent,
+        "summary": {
+            "tables": len(tables),
+            "foreign_keys": sum(len(refs) for refs in relationships.values()),
+            "one_to_many": len(cardinality["one_to_many"]),
+            "one_to_one": len(cardinality["one_to_one"]),
+            "unknown_cardinality": len(cardinality["unknown"]),
+            "association_tables": len(association),
+            "hierarchies": len(hierarchies),
+            "cycles": len(cycles),
+            "max_depth": max(layers, default=0),
+            "standalone_tables": sum(1 for table in tables if not parents[table] and not references_in[table]),
+        },
+    }
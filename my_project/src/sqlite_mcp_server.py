@@ -1,15 +1,63 @@
 #!/usr/bin/env node
+import base64
+import csv
+import os
 import sqlite3
-import pandas as pd
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple
 import json
 
+# List methods return pages of at most this many rows (SERVER_PAGE_SIZE
+# overrides the default); callers follow next_cursor for the rest
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+TABLE_FIELDS = ("schema", "name", "description", "category", "data_model")
+COLUMN_FIELDS = ("name", "type", "is_primary_key", "is_foreign_key", "references", "description")
+RELATED_FIELDS = ("table", "via_column", "relationships")
+
+
+def encode_cursor(key: Sequence[Any]) -> str:
+    """Opaque cursor for the sort key of the last row of a page"""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Sort key encoded in a cursor.
+    
+    Raises:
+        ValueError: If the cursor was not produced by ``encode_cursor`` for a
+            key of this size
+    """
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    if not isinstance(key, list) or len(key) != size:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return key
+
+
+def truncate_text(text: Optional[str], max_length: Optional[int]) -> Optional[str]:
+    """Shorten text to at most max_length characters, marking the cut with an ellipsis"""
+    if text is None or max_length is None or len(text) <= max_length:
+        return text
+    return text[:max(max_length - 1, 0)] + "…"
+
+
+def project(row: Dict[str, Any], fields: Optional[Tuple[str, ...]]) -> Dict[str, Any]:
+    """Keep only the requested fields of a result row"""
+    return row if fields is None else {field: row[field] for field in fields}
+
+
 class SQLiteMetadataServer:
     def __init__(self, db_path: str = "schema_metadata.db"):
         """Initialize the SQLite server with schema metadata"""
         self.db_path = db_path
         self.conn = None
+        self.search_index = None
+        self.join_planner = None
         self.setup_database()
 
     def setup_database(self) -> None:
@@ -55,126 +103,496 @@ class SQLiteMetadataServer:
             FOREIGN KEY (schema_name, table_name) REFERENCES tables(schema_name, table_name)
         );
 
+        CREATE TABLE IF NOT EXISTS table_statistics (
+            schema_name TEXT,
+            table_name TEXT,
+            domain_name TEXT,
+            total_columns INTEGER,
+            primary_keys INTEGER,
+            foreign_keys INTEGER,
+            described_columns INTEGER,
+            description_coverage REAL,
+            max_varchar_width INTEGER,
+            max_numeric_precision INTEGER,
+            max_numeric_scale INTEGER,
+            fk_out INTEGER,
+            fk_in INTEGER,
+            data_types TEXT,
+            PRIMARY KEY (schema_name, table_name)
+        );
+
+        CREATE TABLE IF NOT EXISTS domain_statistics (
+            domain_name TEXT PRIMARY KEY,
+            statistics TEXT
+        );
+
         -- Indexes for performance
         CREATE INDEX IF NOT EXISTS idx_tables_category ON tables(category);
         CREATE INDEX IF NOT EXISTS idx_tables_data_model ON tables(data_model);
         CREATE INDEX IF NOT EXISTS idx_columns_refs ON columns(references_schema, references_table);
+        CREATE INDEX IF NOT EXISTS idx_table_statistics_name ON table_statistics(table_name);
+        -- Keyset pagination: columns of a table in load order (rowid), tables of a domain by key
+        CREATE INDEX IF NOT EXISTS idx_columns_table ON columns(table_name);
+        CREATE INDEX IF NOT EXISTS idx_table_domains_domain ON table_domains(domain_name, schema_name, table_name);
         """)
         
-        # Create views for common queries
+        # Relationship, degree and domain membership tables are materialized
+        # rather than views; loads refresh them in their own transaction. Older
+        # databases had views under the first and last names.
+        views = {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'view'")}
+        for view in views & {"table_relationships", "domain_tables"}:
+            self.conn.execute(f"DROP VIEW {view}")
         self.conn.executescript("""
-        -- View for table relationships
-        CREATE VIEW IF NOT EXISTS table_relationships AS
-        SELECT 
-            c.schema_name,
-            c.table_name,
-            c.column_name,
-            c.references_schema,
-            c.references_table,
-            c.references_column,
-            t1.category as from_category,
-            t2.category as to_category
-        FROM columns c
-        JOIN tables t1 ON c.schema_name = t1.schema_name AND c.table_name = t1.table_name
-        LEFT JOIN tables t2 ON c.references_schema = t2.schema_name AND c.references_table = t2.table_name
-        WHERE c.is_foreign_key = 1;
-
-        -- View for domain-based table grouping
-        CREATE VIEW IF NOT EXISTS domain_tables AS
-        SELECT 
-            d.domain_name,
-            d.description as domain_description,
-            t.schema_name,
-            t.table_name,
-            t.description as table_description,
-            t.category
-        FROM domains d
-        JOIN table_domains td ON d.domain_name = td.domain_name
-        JOIN tables t ON td.schema_name = t.schema_name AND td.table_name = t.table_name;
+        -- Foreign key edges with the categories at both ends
+        CREATE TABLE IF NOT EXISTS table_relationships (
+            schema_name TEXT,
+            table_name TEXT,
+            column_name TEXT,
+            references_schema TEXT,
+            references_table TEXT,
+            references_column TEXT,
+            from_category TEXT,
+            to_category TEXT,
+            PRIMARY KEY (schema_name, table_name, column_name)
+        );
+
+        -- Foreign keys from and to every table
+        CREATE TABLE IF NOT EXISTS table_degree (
+            schema_name TEXT,
+            table_name TEXT,
+            fk_out INTEGER,
+            fk_in INTEGER,
+            total INTEGER,
+            PRIMARY KEY (schema_name, table_name)
+        );
+
+        -- Tables of each domain
+        CREATE TABLE IF NOT EXISTS domain_tables (
+            domain_name TEXT,
+            domain_description TEXT,
+            schema_name TEXT,
+            table_name TEXT,
+            table_description TEXT,
+            category TEXT,
+            data_model TEXT,
+            PRIMARY KEY (domain_name, schema_name, table_name)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_table_relationships_from ON table_relationships(table_name);
+        CREATE INDEX IF NOT EXISTS idx_table_relationships_to ON table_relationships(references_table);
+        CREATE INDEX IF NOT EXISTS idx_table_relationships_to_key
+            ON table_relationships(references_schema, references_table);
+        CREATE INDEX IF NOT EXISTS idx_table_degree_total ON table_degree(total DESC, table_name);
+        CREATE TEMP TABLE IF NOT EXISTS refresh_tables (
+            schema_name TEXT, table_name TEXT, PRIMARY KEY (schema_name, table_name)
+        );
+        CREATE TEMP TABLE IF NOT EXISTS refresh_degree (
+            schema_name TEXT, table_name TEXT, PRIMARY KEY (schema_name, table_name)
+        );
+        """)
+        if views:
+            with self.conn:
+                self.refresh_materialized()
+
+    def refresh_materialized(self, tables: Optional[Iterable[str]] = None) -> None:
+        """
+        Rebuild the relationship, degree and domain membership tables.
+        
+        Runs inside the caller's transaction, so readers see the loaded rows
+        and their materialized tables change together.
+        
+        Args:
+            tables (Optional[Iterable[str]]): ``SCHEMA.TABLE`` keys whose rows
+                changed; only their edges and memberships, and the degrees of
+                the tables they reference before and after the change, are
+                rebuilt. None rebuilds everything.
+        """
+        conn = self.conn
+        
+        def scoped(keys: str, schema_column: str = "schema_name", table_column: str = "table_name") -> str:
+            if tables is None:
+                return "1"
+            return f"({schema_column}, {table_column}) IN (SELECT schema_name, table_name FROM {keys})"
+        
+        if tables is not None:
+            conn.execute("DELETE FROM refresh_tables")
+            conn.execute("DELETE FROM refresh_degree")
+            conn.executemany(
+                "INSERT OR IGNORE INTO refresh_tables VALUES (?, ?)",
+                (tuple(table_key.split(".", 1)) for table_key in tables)
+            )
+            # Degrees of the tables they reference change with their edges:
+            # the old edges are still materialized, the new ones are in columns
+            conn.execute(f"""
+                INSERT OR IGNORE INTO refresh_degree
+                SELECT schema_name, table_name FROM refresh_tables
+                UNION SELECT references_schema, references_table FROM table_relationships
+                WHERE {scoped("refresh_tables")}
+                UNION SELECT references_schema, references_table FROM columns
+                WHERE is_foreign_key = 1 AND references_table IS NOT NULL AND {scoped("refresh_tables")}
+            """)
+        conn.execute(f"DELETE FROM table_relationships WHERE {scoped('refresh_tables')}")
+        conn.execute(f"DELETE FROM table_degree WHERE {scoped('refresh_degree')}")
+        conn.execute(f"DELETE FROM domain_tables WHERE {scoped('refresh_tables')}")
+        if tables is not None:
+            # Edges into removed or reloaded tables keep a current category
+            conn.execute(f"""
+                UPDATE table_relationships
+                SET to_category = (
+                    SELECT category FROM tables t
+                    WHERE t.schema_name = references_schema AND t.table_name = references_table
+                )
+                WHERE {scoped("refresh_tables", "references_schema", "references_table")}
+            """)
+        
+        conn.execute(f"""
+            INSERT INTO table_relationships
+            SELECT c.schema_name, c.table_name, c.column_name,
+                   c.references_schema, c.references_table, c.references_column,
+                   t1.category, t2.category
+            FROM columns c
+            JOIN tables t1 ON c.schema_name = t1.schema_name AND c.table_name = t1.table_name
+            LEFT JOIN tables t2 ON c.references_schema = t2.schema_name AND c.references_table = t2.table_name
+            WHERE c.is_foreign_key = 1 AND {scoped("refresh_tables", "c.schema_name", "c.table_name")}
+        """)
+        conn.execute(f"""
+            INSERT INTO table_degree
+            WITH names AS (
+                SELECT schema_name, table_name FROM tables WHERE {scoped("refresh_degree")}
+                UNION SELECT schema_name, table_name FROM columns WHERE {scoped("refresh_degree")}
+            ),
+            outgoing AS (
+                SELECT schema_name, table_name, COUNT(*) AS n FROM columns
+                WHERE is_foreign_key = 1 AND {scoped("refresh_degree")}
+                GROUP BY schema_name, table_name
+            ),
+            incoming AS (
+                SELECT references_schema AS schema_name, references_table AS table_name, COUNT(*) AS n
+                FROM columns
+                WHERE is_foreign_key = 1 AND references_table IS NOT NULL
+                  AND {scoped("refresh_degree", "references_schema", "references_table")}
+                GROUP BY references_schema, references_table
+            )
+            SELECT names.schema_name, names.table_name,
+                   COALESCE(outgoing.n, 0), COALESCE(incoming.n, 0),
+                   COALESCE(outgoing.n, 0) + COALESCE(incoming.n, 0)
+            FROM names
+            LEFT JOIN outgoing ON outgoing.schema_name = names.schema_name AND outgoing.table_name = names.table_name
+            LEFT JOIN incoming ON incoming.schema_name = names.schema_name AND incoming.table_name = names.table_name
+        """)
+        conn.execute(f"""
+            INSERT INTO domain_tables
+            SELECT d.domain_name, d.description, t.schema_name, t.table_name, t.description, t.category, t.data_model
+            FROM domains d
+            JOIN table_domains td ON d.domain_name = td.domain_name
+            JOIN tables t ON td.schema_name = t.schema_name AND td.table_name = t.table_name
+            WHERE {scoped("refresh_tables", "t.schema_name", "t.table_name")}
         """)
 
     def load_metadata(self, table_descriptions_path: Path) -> None:
-        """Load metadata from CSV file"""
-        df = pd.read_csv(table_descriptions_path)
-        
-        # Insert into tables table
-        df.to_sql('tables', self.conn, if_exists='replace', index=False,
-                  dtype={
-                      'schema_name': 'TEXT',
-                      'table_name': 'TEXT',
-                      'description': 'TEXT',
-                      'category': 'TEXT',
-                      'data_model': 'TEXT'
-                  })
-        
-        # Extract and insert domains based on categories
-        domains = df['category'].unique()
-        domains_data = [(d, f"Tables related to {d}") for d in domains if pd.notna(d)]
-        
-        self.conn.executemany(
-            "INSERT OR REPLACE INTO domains (domain_name, description) VALUES (?, ?)",
-            domains_data
-        )
+        """
+        Load table descriptions, categories and data models from the
+        table descriptions CSV (data-view-metadata-tabledescriptions.csv).
         
-        # Create domain mappings
-        domain_mappings = []
-        for _, row in df.iterrows():
-            if pd.notna(row['category']):
-                domain_mappings.append((
-                    row['SCHEMANAME'],
-                    row['TABLE NAME'],
-                    row['category']
-                ))
-        
-        self.conn.executemany(
-            """INSERT OR REPLACE INTO table_domains 
-               (schema_name, table_name, domain_name) VALUES (?, ?, ?)""",
-            domain_mappings
-        )
+        Each category becomes a domain. Tables, domains and the materialized
+        tables are updated in one transaction.
+        """
+        rows = []
+        with open(table_descriptions_path, newline="", encoding="utf-8-sig") as f:
+            for row in csv.DictReader(f):
+                schema_name = (row.get("SCHEMANAME") or "").strip()
+                table_name = (row.get("TABLE NAME") or "").strip()
+                if schema_name and table_name:
+                    rows.append((
+                        schema_name, table_name, row.get("TABLE DESCRIPTION") or None,
+                        (row.get("CATEGORY") or "").strip() or None, (row.get("DataModel") or "").strip() or None
+                    ))
+        
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO tables (schema_name, table_name, description, category, data_model)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (schema_name, table_name) DO UPDATE SET
+                    description = excluded.description,
+                    category = excluded.category,
+                    data_model = excluded.data_model
+            """, rows)
+            
+            # Extract and insert domains based on categories
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO domains (domain_name, description) VALUES (?, ?)",
+                [(category, f"Tables related to {category}") for category in sorted({row[3] for row in rows} - {None})]
+            )
+            
+            # Create domain mappings
+            self.conn.executemany(
+                "DELETE FROM table_domains WHERE schema_name = ? AND table_name = ?",
+                [row[:2] for row in rows]
+            )
+            self.conn.executemany(
+                """INSERT OR REPLACE INTO table_domains 
+                   (schema_name, table_name, domain_name) VALUES (?, ?, ?)""",
+                [(row[0], row[1], row[3]) for row in rows if row[3]]
+            )
+            self.refresh_materialized()
 
-    def get_table_info(self, table_name: str) -> Dict[str, Any]:
-        """Get detailed information about a specific table"""
+    def load_schema(self, schema_data: Dict[str, Dict[str, Any]], tables: Optional[Iterable[str]] = None) -> None:
+        """
+        Load tables and columns from a catalog in schema loader form.
+        
+        Descriptions replace those of existing tables; categories and data
+        models from ``load_metadata`` are kept.
+        
+        Args:
+            schema_data (Dict[str, Dict[str, Any]]): ``schema_data`` of
+                processed_schema_data.json
+            tables (Optional[Iterable[str]]): Delta load: only these
+                ``SCHEMA.TABLE`` keys are replaced, and those missing from
+                schema_data are removed (e.g. the added, removed and changed
+                tables of a release diff). None replaces every table.
+        """
+        if tables is None:
+            keys = [f"{schema_name}.{table_name}" for schema_name, names in schema_data.items() for table_name in names]
+        else:
+            keys = list(tables)
+        
+        with self.conn:
+            if tables is None:
+                self.conn.execute("DELETE FROM columns")
+            for table_key in keys:
+                schema_name, table_name = table_key.split(".", 1)
+                if tables is not None:
+                    self.conn.execute(
+                        "DELETE FROM columns WHERE schema_name = ? AND table_name = ?", (schema_name, table_name)
+                    )
+                table_data = schema_data.get(schema_name, {}).get(table_name)
+                if table_data is None:
+                    self.conn.execute(
+                        "DELETE FROM table_domains WHERE schema_name = ? AND table_name = ?", (schema_name, table_name)
+                    )
+                    self.conn.execute(
+                        "DELETE FROM tables WHERE schema_name = ? AND table_name = ?", (schema_name, table_name)
+                    )
+                    continue
+                self.conn.execute("""
+                    INSERT INTO tables (schema_name, table_name, description) VALUES (?, ?, ?)
+                    ON CONFLICT (schema_name, table_name) DO UPDATE SET description = excluded.description
+                """, (schema_name, table_name, table_data.get("description")))
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO columns VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(
+                        schema_name, table_name, column["column_name"], column.get("data_type"),
+                        column.get("is_primary_key") == "true", column.get("is_foreign_key") == "true",
+                        column.get("references_schema") or None, column.get("references_table") or None,
+                        column.get("references_column") or None, column.get("description")
+                    ) for column in table_data.get("columns", [])]
+                )
+            self.refresh_materialized(None if tables is None else keys)
+
+    def load_statistics(self, statistics_path: Path) -> None:
+        """Load catalog statistics written by the pipeline (catalog_statistics.json)"""
+        with open(statistics_path, encoding="utf-8") as f:
+            statistics = json.load(f)
+        
+        table_rows = []
+        for table_key, stats in statistics["tables"].items():
+            schema_name, table_name = table_key.split(".", 1)
+            table_rows.append((
+                schema_name, table_name, stats["domain"],
+                stats["total_columns"], stats["primary_keys"], stats["foreign_keys"],
+                stats["described_columns"], stats["description_coverage"],
+                stats["max_varchar_width"], stats["max_numeric_precision"], stats["max_numeric_scale"],
+                stats["fk_out"], stats["fk_in"], json.dumps(stats["data_types"])
+            ))
+        
+        with self.conn:
+            self.conn.execute("DELETE FROM table_statistics")
+            self.conn.execute("DELETE FROM domain_statistics")
+            self.conn.executemany(
+                "INSERT INTO table_statistics VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                table_rows
+            )
+            self.conn.executemany(
+                "INSERT INTO domain_statistics (domain_name, statistics) VALUES (?, ?)",
+                [(domain, json.dumps(stats)) for domain, stats in statistics["domains"].items()]
+            )
+
+    def get_table_statistics(self, table_name: str) -> Dict[str, Any]:
+        """Get column, key, type and FK degree statistics for a table"""
         cursor = self.conn.cursor()
         
-        # Get table details
         cursor.execute("""
+            SELECT * FROM table_statistics
+            WHERE table_name = ?
+        """, (table_name,))
+        
+        row = cursor.fetchone()
+        if not row:
+            return {}
+        
+        stats = dict(zip([column[0] for column in cursor.description], row))
+        stats["data_types"] = json.loads(stats["data_types"])
+        return stats
+
+    def get_domain_statistics(self, domain: Optional[str] = None) -> Dict[str, Any]:
+        """Get per-domain rollups, for one domain or all of them"""
+        cursor = self.conn.cursor()
+        
+        if domain is None:
+            cursor.execute("SELECT domain_name, statistics FROM domain_statistics ORDER BY domain_name")
+        else:
+            cursor.execute("SELECT domain_name, statistics FROM domain_statistics WHERE domain_name = ?", (domain,))
+        
+        return {row[0]: json.loads(row[1]) for row in cursor.fetchall()}
+
+    def load_search_index(self, index_path: Path) -> None:
+        """Load the catalog search index written by the pipeline (search_index.npz)"""
+        # Imports NumPy, so only when search is served
+        from vector_index import SearchIndex
+        self.search_index = SearchIndex.load(index_path)
+
+    def semantic_search(self, query: str, k: int = 10, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Find the tables and columns whose names and descriptions best match free text"""
+        if self.search_index is None:
+            raise ValueError("No search index loaded; call load_search_index first")
+        return self.search_index.search(query, k, kind=kind)
+
+    def load_join_paths(self, join_paths_path: Path) -> None:
+        """Load the join graph and hub paths written by the pipeline (join_paths.json)"""
+        from join_paths import JoinPlanner
+        self.join_planner = JoinPlanner.load(join_paths_path)
+
+    def find_join_paths(
+        self,
+        from_table: str,
+        to_table: str,
+        k: int = 3,
+        max_hops: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        The k shortest join paths between two tables, with their join columns.
+        
+        Tables are ``SCHEMA.TABLE`` or bare names. A path starting or ending
+        at a hub table comes from the precomputed paths; others are searched
+        in the foreign key graph.
+        """
+        if self.join_planner is None:
+            raise ValueError("No join paths loaded; call load_join_paths first")
+        return self.join_planner.k_shortest_paths(from_table, to_table, k, max_hops)
+
+    @staticmethod
+    def _page_size(limit: Optional[int]) -> int:
+        if limit is None:
+            limit = int(os.getenv("SERVER_PAGE_SIZE", str(DEFAULT_PAGE_SIZE)))
+        if limit < 1:
+            raise ValueError(f"limit must be at least 1, got {limit}")
+        return min(limit, MAX_PAGE_SIZE)
+
+    @staticmethod
+    def _fields(fields: Optional[Sequence[str]], allowed: Tuple[str, ...]) -> Optional[Tuple[str, ...]]:
+        if fields is None:
+            return None
+        unknown = [field for field in fields if field not in allowed]
+        if unknown:
+            raise ValueError(f"Unknown field(s) {', '.join(unknown)}; choose from {', '.join(allowed)}")
+        return tuple(fields)
+
+    def _table_page(
+        self,
+        where: str,
+        params: Tuple[Any, ...],
+        limit: Optional[int],
+        cursor: Optional[str],
+        fields: Optional[Sequence[str]],
+        max_description: Optional[int],
+        source: str = "tables",
+        description_column: str = "description"
+    ) -> Dict[str, Any]:
+        """
+        One page of tables in (schema, table) order.
+        
+        The page starts after the cursor's key (keyset pagination), so every
+        page costs the same however deep the caller has paged, and one extra
+        row is read to know whether there is a next page.
+        """
+        limit = self._page_size(limit)
+        fields = self._fields(fields, TABLE_FIELDS)
+        if cursor is not None:
+            where += " AND (schema_name, table_name) > (?, ?)"
+            params += tuple(decode_cursor(cursor, 2))
+        rows = self.conn.execute(f"""
+            SELECT schema_name, table_name, {description_column}, category, data_model
+            FROM {source}
+            WHERE {where}
+            ORDER BY schema_name, table_name
+            LIMIT ?
+        """, params + (limit + 1,)).fetchall()
+        
+        tables = [project({
+            "schema": row[0],
+            "name": row[1],
+            "description": truncate_text(row[2], max_description),
+            "category": row[3],
+            "data_model": row[4]
+        }, fields) for row in rows[:limit]]
+        next_cursor = encode_cursor(rows[limit - 1][:2]) if len(rows) > limit else None
+        return {"tables": tables, "next_cursor": next_cursor}
+
+    def get_table_info(
+        self,
+        table_name: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+        max_description: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Get detailed information about a specific table.
+        
+        Columns are paged in load order: ``limit`` columns per call (default
+        SERVER_PAGE_SIZE or 100), continuing from ``cursor`` (the previous
+        page's ``next_cursor``, None on the last page). ``fields`` keeps only
+        those column fields (see COLUMN_FIELDS) and ``max_description``
+        shortens the table and column descriptions. The table's foreign keys
+        are paged separately by ``get_related_tables``.
+        """
+        cursor_key = decode_cursor(cursor, 1) if cursor is not None else None
+        limit = self._page_size(limit)
+        fields = self._fields(fields, COLUMN_FIELDS)
+        db_cursor = self.conn.cursor()
+        
+        # Get table details
+        db_cursor.execute("""
             SELECT schema_name, table_name, description, category, data_model
             FROM tables 
             WHERE table_name = ?
         """, (table_name,))
         
-        table_info = cursor.fetchone()
+        table_info = db_cursor.fetchone()
         if not table_info:
             return {}
             
-        # Get columns
-        cursor.execute("""
+        # Get one page of columns
+        db_cursor.execute("""
             SELECT column_name, data_type, is_primary_key, is_foreign_key,
-                   references_schema, references_table, references_column, description
-            FROM columns
-            WHERE table_name = ?
-        """, (table_name,))
-        
-        columns = cursor.fetchall()
-        
-        # Get relationships
-        cursor.execute("""
-            SELECT DISTINCT references_table, column_name
+                   references_schema, references_table, references_column, description, rowid
             FROM columns
-            WHERE table_name = ? AND is_foreign_key = 1
-        """, (table_name,))
+            WHERE table_name = ? AND rowid > ?
+            ORDER BY rowid
+            LIMIT ?
+        """, (table_name, cursor_key[0] if cursor_key else -1, limit + 1))
         
-        relationships = cursor.fetchall()
+        columns = db_cursor.fetchall()
         
         return {
             "table": {
                 "schema": table_info[0],
                 "name": table_info[1],
-                "description": table_info[2],
+                "description": truncate_text(table_info[2], max_description),
                 "category": table_info[3],
                 "data_model": table_info[4]
             },
-            "columns": [{
+            "columns": [project({
                 "name": col[0],
                 "type": col[1],
                 "is_primary_key": col[2],
@@ -184,139 +602,166 @@ class SQLiteMetadataServer:
                     "table": col[5],
                     "column": col[6]
                 } if col[3] else None,
-                "description": col[7]
-            } for col in columns],
-            "relationships": [{
-                "referenced_table": rel[0],
-                "via_column": rel[1]
-            } for rel in relationships]
+                "description": truncate_text(col[7], max_description)
+            }, fields) for col in columns[:limit]],
+            "next_cursor": encode_cursor([columns[limit - 1][8]]) if len(columns) > limit else None
         }
 
-    def get_domain_tables(self, domain: str) -> List[Dict[str, Any]]:
-        """Get tables in a specific domain"""
-        cursor = self.conn.cursor()
+    def get_domain_tables(
+        self,
+        domain: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+        max_description: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Get tables in a specific domain, one page at a time.
         
-        cursor.execute("""
-            SELECT t.schema_name, t.table_name, t.description, t.category, t.data_model
-            FROM tables t
-            JOIN table_domains td ON t.schema_name = td.schema_name 
-                AND t.table_name = td.table_name
-            WHERE td.domain_name = ?
-        """, (domain,))
-        
-        return [{
-            "schema": row[0],
-            "name": row[1],
-            "description": row[2],
-            "category": row[3],
-            "data_model": row[4]
-        } for row in cursor.fetchall()]
+        Returns ``tables`` (at most ``limit``, default SERVER_PAGE_SIZE or
+        100, ordered by schema and name) and ``next_cursor`` to pass back for
+        the next page (None on the last). ``fields`` keeps only those table
+        fields (see TABLE_FIELDS); ``max_description`` shortens descriptions.
+        """
+        return self._table_page(
+            "domain_name = ?", (domain,), limit, cursor, fields, max_description,
+            source="domain_tables", description_column="table_description"
+        )
 
-    def search_tables(self, pattern: str) -> List[Dict[str, Any]]:
-        """Search for tables matching a pattern"""
-        cursor = self.conn.cursor()
+    def search_tables(
+        self,
+        pattern: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+        max_description: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Search for tables whose name or description contains a pattern.
         
-        cursor.execute("""
-            SELECT schema_name, table_name, description, category
-            FROM tables
-            WHERE table_name LIKE ? OR description LIKE ?
-        """, (f"%{pattern}%", f"%{pattern}%"))
+        Paged like ``get_domain_tables``.
+        """
+        return self._table_page(
+            "(table_name LIKE ? OR description LIKE ?)", (f"%{pattern}%", f"%{pattern}%"),
+            limit, cursor, fields, max_description
+        )
+
+    def _relationship_page(
+        self,
+        table: str,
+        limit: int,
+        cursor_key: Optional[List[Any]]
+    ) -> Tuple[List[Tuple[int, str, str]], Optional[str]]:
+        """
+        One page of a table's foreign keys, outgoing before incoming.
         
-        return [{
-            "schema": row[0],
-            "name": row[1],
-            "description": row[2],
-            "category": row[3]
-        } for row in cursor.fetchall()]
+        Rows are (direction, related table, column) with direction 0 for
+        outgoing and 1 for incoming, in keyset order after ``cursor_key``.
+        """
+        where, params = "", (table, table)
+        if cursor_key is not None:
+            where = "WHERE (direction, related, via_column) > (?, ?, ?)"
+            params += tuple(cursor_key)
+        rows = self.conn.execute(f"""
+            SELECT direction, related, via_column FROM (
+                SELECT DISTINCT 0 AS direction, references_table AS related, column_name AS via_column
+                FROM table_relationships
+                WHERE table_name = ?
+                UNION ALL
+                SELECT DISTINCT 1, table_name, column_name
+                FROM table_relationships
+                WHERE references_table = ?
+            )
+            {where}
+            ORDER BY direction, related, via_column
+            LIMIT ?
+        """, params + (limit + 1,)).fetchall()
+        next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+        return rows[:limit], next_cursor
 
-    def get_related_tables(self, table_name: str, depth: int = 1) -> Dict[str, Any]:
-        """Get tables directly related to a given table"""
-        cursor = self.conn.cursor()
+    def get_related_tables(
+        self,
+        table_name: str,
+        depth: int = 1,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Get tables related to a given table, up to ``depth`` foreign keys away.
         
-        def get_relationships(table: str, current_depth: int, visited: set) -> Dict[str, Any]:
+        A response holds at most ``limit`` foreign keys in all (default
+        SERVER_PAGE_SIZE or 100), outgoing before incoming, filled depth
+        first. Every table lists its own ``next_cursor`` (None once all its
+        foreign keys are listed); pass it back with that table's name to get
+        the rest, including the tables the limit left unexpanded.
+        ``cursor`` continues the top level. ``fields`` keeps only those
+        fields of each entry (see RELATED_FIELDS).
+        """
+        budget = [self._page_size(limit)]
+        fields = self._fields(fields, RELATED_FIELDS)
+        
+        def get_relationships(table: str, current_depth: int, visited: set, cursor_key: Optional[List[Any]] = None) -> Dict[str, Any]:
             if current_depth > depth or table in visited:
                 return {}
+            if not budget[0]:
+                # Nothing listed yet, so the cursor starts before the first foreign key
+                return {"outgoing": [], "incoming": [], "next_cursor": encode_cursor(cursor_key or [-1, "", ""])}
                 
             visited.add(table)
-            
-            # Get outgoing relationships (foreign keys from this table)
-            cursor.execute("""
-                SELECT DISTINCT references_table, column_name
-                FROM columns
-                WHERE table_name = ? AND is_foreign_key = 1
-            """, (table,))
-            outgoing = cursor.fetchall()
-            
-            # Get incoming relationships (foreign keys to this table)
-            cursor.execute("""
-                SELECT DISTINCT table_name, column_name
-                FROM columns
-                WHERE references_table = ? AND is_foreign_key = 1
-            """, (table,))
-            incoming = cursor.fetchall()
-            
-            result = {
-                "outgoing": [{
-                    "table": rel[0],
-                    "via_column": rel[1],
-                    "relationships": get_relationships(rel[0], current_depth + 1, visited)
-                } for rel in outgoing],
-                "incoming": [{
-                    "table": rel[0],
-                    "via_column": rel[1],
-                    "relationships": get_relationships(rel[0], current_depth + 1, visited)
-                } for rel in incoming]
-            }
-            
+            rows, next_cursor = self._relationship_page(table, budget[0], cursor_key)
+            budget[0] -= len(rows)
+            result = {"outgoing": [], "incoming": [], "next_cursor": next_cursor}
+            for direction, related, via_column in rows:
+                result["incoming" if direction else "outgoing"].append(project({
+                    "table": related,
+                    "via_column": via_column,
+                    "relationships": get_relationships(related, current_depth + 1, visited)
+                }, fields))
             return result
             
-        return get_relationships(table_name, 1, set())
+        return get_relationships(table_name, 1, set(), decode_cursor(cursor, 3) if cursor is not None else None)
 
-    def analyze_table_usage(self) -> Dict[str, Any]:
-        """Analyze table relationships and usage patterns"""
-        cursor = self.conn.cursor()
+    def analyze_table_usage(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Analyze table relationships and usage patterns.
+        
+        Returns the ten most connected tables and one page of tables without
+        foreign keys (``limit`` names, default SERVER_PAGE_SIZE or 100, in
+        name order); ``next_cursor`` continues the isolated tables.
+        """
+        limit = self._page_size(limit)
+        cursor_key = decode_cursor(cursor, 2) if cursor is not None else None
+        db_cursor = self.conn.cursor()
         
         # Get tables with most relationships
-        cursor.execute("""
-            WITH relationship_counts AS (
-                SELECT table_name, COUNT(*) as ref_count
-                FROM columns
-                WHERE is_foreign_key = 1
-                GROUP BY table_name
-                
-                UNION ALL
-                
-                SELECT references_table as table_name, COUNT(*) as ref_count
-                FROM columns
-                WHERE is_foreign_key = 1 AND references_table IS NOT NULL
-                GROUP BY references_table
-            )
-            SELECT table_name, SUM(ref_count) as total_relationships
-            FROM relationship_counts
-            GROUP BY table_name
-            ORDER BY total_relationships DESC
+        db_cursor.execute("""
+            SELECT table_name, total
+            FROM table_degree
+            WHERE total > 0
+            ORDER BY total DESC, table_name
             LIMIT 10
         """)
         
         central_tables = [{
             "table": row[0],
             "relationship_count": row[1]
-        } for row in cursor.fetchall()]
-        
-        # Get isolated tables (no relationships)
-        cursor.execute("""
-            SELECT t.table_name
-            FROM tables t
-            LEFT JOIN columns c1 ON t.table_name = c1.table_name AND c1.is_foreign_key = 1
-            LEFT JOIN columns c2 ON t.table_name = c2.references_table
-            WHERE c1.table_name IS NULL AND c2.table_name IS NULL
-        """)
+        } for row in db_cursor.fetchall()]
         
-        isolated_tables = [row[0] for row in cursor.fetchall()]
+        # Get one page of isolated tables (no relationships)
+        db_cursor.execute(f"""
+            SELECT table_name, schema_name
+            FROM table_degree
+            WHERE total = 0{" AND (table_name, schema_name) > (?, ?)" if cursor_key else ""}
+            ORDER BY table_name, schema_name
+            LIMIT ?
+        """, tuple(cursor_key or ()) + (limit + 1,))
+        rows = db_cursor.fetchall()
         
         return {
             "central_tables": central_tables,
-            "isolated_tables": isolated_tables
+            "isolated_tables": [row[0] for row in rows[:limit]],
+            "next_cursor": encode_cursor(rows[limit - 1]) if len(rows) > limit else None
         }
 
 if __name__ == "__main__":
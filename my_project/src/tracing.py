@@ -0,0 +1,207 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from run_manifest import atomic_write_text
+
+
+class Span:
+    """A timed region of the pipeline with free-form attributes"""
+
+    __slots__ = ("name", "attributes", "start_ns", "end_ns", "thread_id", "parent", "_tracer")
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any]):
+        self._tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = 0
+        self.end_ns = 0
+        self.thread_id = 0
+        self.parent: Optional[str] = None
+
+    def set(self, **attributes: Any) -> "Span":
+        """Attach or overwrite attributes (bytes, rows, tokens, ...)"""
+        self.attributes.update(attributes)
+        return self
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def __enter__(self) -> "Span":
+        stack = self._tracer._stack()
+        self.parent = stack[-1].name if stack else None
+        stack.append(self)
+        self.thread_id = threading.get_ident()
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        self._tracer._stack().pop()
+        self._tracer._record(self)
+
+
+class _NoopSpan:
+    """Shared span returned while tracing is disabled; every call is a no-op"""
+
+    __slots__ = ()
+
+    def set(self, **attributes: Any) -> "_NoopSpan":
+        return self
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """
+    Collects spans in memory and exports them as Chrome trace events.
+
+    When disabled, ``span()`` returns a shared no-op object, so instrumented
+    code pays one attribute check per span and allocates nothing.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.spans: List[Span] = []
+        self._origin_ns = time.perf_counter_ns()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def span(self, name: str, **attributes: Any):
+        """
+        Open a span; use as a context manager.
+
+        Args:
+            name (str): Span name, e.g. ``load_schema_data`` or ``llm.query``
+            **attributes: Initial attributes
+
+        Returns:
+            A context manager yielding an object with ``set(**attributes)``
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        return Span(self, name, attributes)
+
+    def reset(self) -> None:
+        """Discard recorded spans and restart the trace clock"""
+        with self._lock:
+            self.spans = []
+            self._origin_ns = time.perf_counter_ns()
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """
+        Convert recorded spans to the Chrome trace-event format.
+
+        The result loads in chrome://tracing or https://ui.perfetto.dev.
+
+        Returns:
+            Dict[str, Any]: A trace document with complete ("X") events; the
+                enclosing span's name is in each event's ``parent`` argument
+        """
+        pid = os.getpid()
+        events = [{
+            "name": span.name,
+            "cat": span.name.split(".")[0],
+            "ph": "X",
+            "ts": (span.start_ns - self._origin_ns) / 1000,
+            "dur": (span.end_ns - span.start_ns) / 1000,
+            "pid": pid,
+            "tid": span.thread_id,
+            "args": {**span.attributes, "parent": span.parent} if span.parent else span.attributes
+        } for span in self.spans]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: Path) -> None:
+        """
+        Write the Chrome trace-event JSON to a file.
+
+        Args:
+            path (Path): Destination file
+        """
+        atomic_write_text(path, json.dumps(self.to_chrome_trace(), default=str))
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        Aggregate spans by name.
+
+        Numeric attributes are summed per name, so totals such as prompt
+        characters or tokens per stage come out directly.
+
+        Returns:
+            List[Dict[str, Any]]: One row per span name, slowest total first
+        """
+        rows: Dict[str, Dict[str, Any]] = {}
+        totals: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        for span in self.spans:
+            row = rows.setdefault(span.name, {
+                "name": span.name, "count": 0, "total_ms": 0.0, "max_ms": 0.0
+            })
+            row["count"] += 1
+            row["total_ms"] += span.duration_ms
+            row["max_ms"] = max(row["max_ms"], span.duration_ms)
+            for key, value in span.attributes.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    totals[span.name][key] += value
+
+        for name, row in rows.items():
+            row["mean_ms"] = row["total_ms"] / row["count"]
+            row["attributes"] = dict(totals[name])
+        return sorted(rows.values(), key=lambda row: row["total_ms"], reverse=True)
+
+    def format_summary(self) -> str:
+        """
+        Render the span summary as a fixed-width text table.
+
+        Returns:
+            str: The formatted table
+        """
+        lines = [f"{'span':<32} {'count':>6} {'total ms':>11} {'mean ms':>10} {'max ms':>10}  attributes"]
+        for row in self.summary():
+            attributes = ", ".join(
+                f"{key}={value:g}" for key, value in sorted(row["attributes"].items())
+            )
+            lines.append(
+                f"{row['name']:<32} {row['count']:>6} {row['total_ms']:>11.1f} "
+                f"{row['mean_ms']:>10.1f} {row['max_ms']:>10.1f}  {attributes}"
+            )
+        return "\n".join(lines)
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _record(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+
+# Process-wide tracer; enabled by setting PIPELINE_TRACE to an output path
+tracer = Tracer(enabled=bool(os.getenv("PIPELINE_TRACE")))
+
+
+def span(name: str, **attributes: Any):
+    """Open a span on the process-wide tracer"""
+    if not tracer.enabled:
+        return _NOOP_SPAN
+    return Span(tracer, name, attributes)
+
+
+def enable_tracing(enabled: bool = True) -> None:
+    """Turn the process-wide tracer on or off"""
+    tracer.enabled = enabled